@@ -0,0 +1,76 @@
+import sys
+import json
+import statistics
+
+
+def _medians(document: dict) -> dict:
+    """
+    Median wall time and peak memory of every (rows, columns, component, method) in a results document.
+    """
+    grouped = {}
+    for case in document['cases']:
+        for record in case['results']:
+            if 'error' in record:
+                continue
+            key = (case['rows'], case['columns'], record['component'], record['method'])
+            grouped.setdefault(key, []).append(record)
+    return {
+        key: {
+            'wall_time': statistics.median(record['wall_time'] for record in records),
+            'peak_memory': max((record['peak_memory'] or 0) for record in records),
+        }
+        for key, records in grouped.items()
+    }
+
+
+def compare(baseline: dict, candidate: dict) -> list:
+    """
+    Compares two results documents written by `run_benchmarks.py`.
+
+    Returns:
+    --------
+    list of dict
+        {'rows', 'columns', 'component', 'method', 'baseline', 'candidate', 'ratio', 'memory_ratio'}
+        for every measurement present in both documents. Ratios above 1 are regressions.
+    """
+    old, new = _medians(baseline), _medians(candidate)
+    rows = []
+    for key in sorted(set(old) & set(new), key=str):
+        before, after = old[key], new[key]
+        rows.append({
+            'rows': key[0], 'columns': key[1], 'component': key[2], 'method': key[3],
+            'baseline': before['wall_time'], 'candidate': after['wall_time'],
+            'ratio': after['wall_time'] / before['wall_time'] if before['wall_time'] else float('inf'),
+            'memory_ratio': after['peak_memory'] / before['peak_memory'] if before['peak_memory'] else None,
+        })
+    return rows
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument('baseline')
+    parser.add_argument('candidate')
+    parser.add_argument('--fail-above', type=float, default=None,
+                        help="Exit with status 1 if any wall time ratio exceeds this value, e.g. 1.2.")
+    args = parser.parse_args(argv)
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.candidate) as file:
+        candidate = json.load(file)
+
+    rows = compare(baseline, candidate)
+    print(f"{'case':>14}  {'stage':<28} {'baseline':>10} {'candidate':>10} {'ratio':>7} {'memory':>7}")
+    for row in rows:
+        memory = f"{row['memory_ratio']:.2f}" if row['memory_ratio'] is not None else '-'
+        print(f"{row['rows']:>9}x{row['columns']:<4}  {row['component'] + '.' + row['method']:<28} "
+              f"{row['baseline']:>10.4f} {row['candidate']:>10.4f} {row['ratio']:>7.2f} {memory:>7}")
+    if args.fail_above is not None and any(row['ratio'] > args.fail_above for row in rows):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Column templates shaped like Data/weather_classification_data.csv
+NUMERIC_TEMPLATES = {
+    'Temperature': lambda rng, n: np.round(rng.normal(19.0, 17.0, n)),
+    'Humidity': lambda rng, n: np.round(np.clip(rng.normal(68.0, 20.0, n), 20, 109)),
+    'Wind Speed': lambda rng, n: np.round(rng.exponential(9.5, n) * 2) / 2,
+    'Precipitation (%)': lambda rng, n: np.round(rng.uniform(0, 109, n)),
+    'Atmospheric Pressure': lambda rng, n: np.round(rng.normal(1005.0, 37.0, n), 2),
+    'UV Index': lambda rng, n: np.round(rng.exponential(4.0, n)).clip(0, 14),
+    'Visibility (km)': lambda rng, n: np.round(rng.gamma(2.0, 2.7, n) * 2) / 2,
+}
+CATEGORICAL_TEMPLATES = {
+    'Cloud Cover': ['overcast', 'partly cloudy', 'clear', 'cloudy'],
+    'Season': ['Winter', 'Spring', 'Autumn', 'Summer'],
+    'Location': ['inland', 'mountain', 'coastal'],
+}
+TARGET_COLUMN = 'WeatherType'
+TARGET_VALUES = ['Rainy', 'Cloudy', 'Sunny', 'Snowy']
+
+
+def column_templates(columns: int) -> list:
+    """
+    (name, template) pairs of the generated feature columns, cycling over the
+    templates with a numeric suffix once they are used up. The target column is
+    not included.
+    """
+    templates = list(NUMERIC_TEMPLATES) + list(CATEGORICAL_TEMPLATES)
+    pairs = []
+    for i in range(columns):
+        base = templates[i % len(templates)]
+        pairs.append((base if i < len(templates) else f"{base}_{i // len(templates)}", base))
+    return pairs
+
+
+def generate(rows: int, columns: int = 10, null_rate: float = 0.001, outlier_rate: float = 0.01, seed: int = 0) -> pd.DataFrame:
+    """
+    Generates a synthetic DataFrame shaped like the weather classification data.
+
+    Parameters:
+    -----------
+    rows : int
+        Number of rows.
+    columns : int, default=10
+        Number of feature columns; the target column comes on top. Numeric and
+        categorical templates are cycled in the proportion of the original data.
+    null_rate : float, default=0.001
+        Fraction of missing values in every feature column.
+    outlier_rate : float, default=0.01
+        Fraction of numeric values replaced by values far outside the column's range.
+    seed : int, default=0
+        Seed of the random generator.
+
+    Returns:
+    --------
+    pd.DataFrame
+    """
+    rng = np.random.default_rng(seed)
+    data = {}
+    for name, base in column_templates(columns):
+        if base in NUMERIC_TEMPLATES:
+            values = NUMERIC_TEMPLATES[base](rng, rows).astype(np.float64)
+            outliers = rng.random(rows) < outlier_rate
+            spread = np.nanstd(values) or 1.0
+            values[outliers] = np.nanmean(values) + rng.choice([-1, 1], outliers.sum()) * rng.uniform(4, 8, outliers.sum()) * spread
+            values[rng.random(rows) < null_rate] = np.nan
+        else:
+            categories = np.array(CATEGORICAL_TEMPLATES[base], dtype=object)
+            values = categories[rng.integers(0, len(categories), rows)]
+            values[rng.random(rows) < null_rate] = np.nan
+        data[name] = values
+    target = np.array(TARGET_VALUES, dtype=object)[rng.integers(0, len(TARGET_VALUES), rows)]
+    target[rng.random(rows) < null_rate] = np.nan
+    data[TARGET_COLUMN] = target
+    return pd.DataFrame(data)
+
+
+def write_csv(path: str, rows: int, columns: int = 10, null_rate: float = 0.001, outlier_rate: float = 0.01,
+              seed: int = 0, chunk_rows: int = 1_000_000) -> str:
+    """
+    Writes a generated dataset to CSV in chunks of `chunk_rows`, so 10M row files
+    can be produced without holding them in memory. Returns `path`.
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    for index, start in enumerate(range(0, rows, chunk_rows)):
+        chunk = generate(min(chunk_rows, rows - start), columns, null_rate, outlier_rate, seed=seed + index)
+        chunk.to_csv(path, mode='w' if index == 0 else 'a', header=index == 0, index=False)
+    return path
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Generate a synthetic dataset shaped like the weather data.")
+    parser.add_argument('path')
+    parser.add_argument('--rows', type=int, default=10_000)
+    parser.add_argument('--columns', type=int, default=10)
+    parser.add_argument('--null-rate', type=float, default=0.001)
+    parser.add_argument('--outlier-rate', type=float, default=0.01)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+    print(write_csv(args.path, args.rows, args.columns, args.null_rate, args.outlier_rate, args.seed))
@@ -0,0 +1,74 @@
+import os
+import sys
+import json
+import time
+import subprocess
+import statistics
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC = os.path.join(ROOT, 'src')
+
+# Dependencies that must not be imported just by importing the pipeline
+HEAVY_MODULES = ('sklearn', 'scipy', 'fitter', 'nltk', 'matplotlib', 'chardet')
+
+_PROBE = """
+import sys, time, json
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'seconds': elapsed, 'loaded': sorted(m for m in {heavy!r} if m in sys.modules)}}))
+"""
+
+
+def measure(module: str = 'pipeline', repeat: int = 5) -> dict:
+    """
+    Imports `module` in `repeat` fresh interpreters and reports the import time and the heavy modules it loaded.
+
+    Returns:
+    --------
+    dict
+        {'module', 'repeat', 'median_seconds', 'min_seconds', 'runs', 'heavy_modules_loaded'}
+    """
+    runs, loaded = [], []
+    env = {**os.environ, 'PYTHONPATH': SRC + os.pathsep + os.environ.get('PYTHONPATH', '')}
+    for _ in range(repeat):
+        output = subprocess.run([sys.executable, '-c', _PROBE.format(module=module, heavy=HEAVY_MODULES)],
+                                capture_output=True, text=True, env=env, check=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        runs.append(result['seconds'])
+        loaded = result['loaded']
+    return {
+        'module': module,
+        'repeat': repeat,
+        'median_seconds': statistics.median(runs),
+        'min_seconds': min(runs),
+        'runs': runs,
+        'heavy_modules_loaded': loaded,
+    }
+
+
+def main(argv=None) -> int:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Measure how long importing the pipeline takes.")
+    parser.add_argument('--module', default='pipeline')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--max-seconds', type=float, default=None, help="Exit with status 1 if the median is slower.")
+    parser.add_argument('--output', default=None, help="Write the result as JSON to this path.")
+    args = parser.parse_args(argv)
+
+    result = measure(args.module, args.repeat)
+    result['timestamp'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    print(f"import {result['module']}: median {result['median_seconds']:.3f}s, min {result['min_seconds']:.3f}s")
+    print(f"heavy modules loaded: {', '.join(result['heavy_modules_loaded']) or 'none'}")
+    if args.output:
+        os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+        with open(args.output, 'w') as file:
+            json.dump(result, file, indent=2)
+    if result['heavy_modules_loaded'] or (args.max_seconds is not None and result['median_seconds'] > args.max_seconds):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+import os
+import sys
+import json
+import time
+import platform
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, 'src'))
+
+import numpy as np
+import pandas as pd
+import sklearn
+from loader import Loader
+from analyzer import Analyzer
+from cleaner import Cleaner
+from text_processor import TextProcessor
+from outlier import Outlier
+from imputer import Imputer
+from normalize import Normalizer
+from pipeline import Lazy_Prep
+from Utilities.instrumentation import StageProfiler
+from generator import write_csv, TARGET_COLUMN
+
+RESULTS_VERSION = 1
+
+# Components in pipeline order; each one is fed the output of the previous one
+COMPONENTS = {
+    'Cleaner': lambda metadata: Cleaner(metadata),
+    'TextProcessor': lambda metadata: TextProcessor(metadata=metadata),
+    'Outlier': lambda metadata: Outlier(metadata=metadata),
+    'Imputer': lambda metadata: Imputer(metadata=metadata),
+    'Normalizer': lambda metadata: Normalizer(metadata=metadata),
+}
+
+
+def environment() -> dict:
+    """
+    Details of the machine and library versions, stored with every result file.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        commit = ''
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'sklearn': sklearn.__version__,
+    }
+
+
+def _call(profiler: StageProfiler, results: list, component: str, method: str, func, data=None):
+    """
+    Runs one measured call. Failures are recorded instead of aborting the run.
+    """
+    try:
+        result = profiler.call(component, method, func, data)
+        results.append(profiler.records[-1])
+        return result
+    except Exception as e:
+        results.append({'component': component, 'method': method, 'error': f"{type(e).__name__}: {e}"})
+        return None
+
+
+def run_case(path: str, components: list, repeat: int = 1, memory: bool = True, full_pipeline: bool = True) -> list:
+    """
+    Times and memory-profiles every selected component and the full `Lazy_Prep` on one file.
+
+    Components run in pipeline order on the output of the previous one. Each is
+    measured with `fit_transform` on fresh state and with `transform` on the
+    fitted state. Loading and analysis are measured first since every
+    component needs their metadata.
+
+    Returns:
+    --------
+    list of dict
+        One `StageProfiler` record per call plus the 'repeat' index, or
+        {'component', 'method', 'error'} for calls that failed.
+    """
+    results = []
+    profiler = StageProfiler(memory=memory)
+    for index in range(repeat):
+        profiler.begin(os.path.basename(path))
+        start = len(results)
+        metadata = {'target_column': TARGET_COLUMN}
+        raw = _call(profiler, results, 'Loader', 'transform', Loader(path, metadata).transform)
+        _call(profiler, results, 'Analyzer', 'analyze', Analyzer(metadata).analyze, raw)
+        df = raw
+        for name in components:
+            if df is None:
+                break
+            component = COMPONENTS[name](metadata)
+            if hasattr(component, 'fit_transform'):
+                output = _call(profiler, results, name, 'fit_transform', component.fit_transform, df.copy())
+                _call(profiler, results, name, 'transform', component.transform, df.copy())
+            else:
+                output = _call(profiler, results, name, 'transform', component.transform, df.copy())
+            df = output
+        if full_pipeline:
+            prep = Lazy_Prep(path, target_column=TARGET_COLUMN)
+            _call(profiler, results, 'Lazy_Prep', 'fit', prep.fit)
+            if raw is not None:
+                _call(profiler, results, 'Lazy_Prep', 'transform', prep.transform, raw.copy())
+        profiler.end()
+        for record in results[start:]:
+            record['repeat'] = index
+    return results
+
+
+def run(sizes: list, columns: list, components: list, repeat: int = 1, null_rate: float = 0.001, outlier_rate: float = 0.01,
+        data_dir: str = os.path.join(ROOT, 'benchmarks', 'data'), memory: bool = True, full_pipeline: bool = True) -> dict:
+    """
+    Runs every (rows, columns) case and returns the results document written by `main`:
+    {'version', 'environment', 'parameters', 'cases': [{'rows', 'columns', 'results'}]}.
+    Generated files are kept in `data_dir` and reused by later runs.
+    """
+    cases = []
+    for n_columns in columns:
+        for rows in sizes:
+            path = os.path.join(data_dir, f"synthetic_{rows}x{n_columns}_n{null_rate}_o{outlier_rate}.csv")
+            if not os.path.isfile(path):
+                write_csv(path, rows, n_columns, null_rate, outlier_rate)
+            print(f"Running {rows} rows x {n_columns} columns")
+            results = run_case(path, components, repeat=repeat, memory=memory, full_pipeline=full_pipeline)
+            for record in results:
+                if 'error' in record:
+                    print(f"  {record['component']}.{record['method']}: {record['error']}")
+                else:
+                    print(f"  {record['component']}.{record['method']}: {record['wall_time']:.4f}s")
+            cases.append({'rows': rows, 'columns': n_columns, 'results': results})
+    return {
+        'version': RESULTS_VERSION,
+        'environment': environment(),
+        'parameters': {'repeat': repeat, 'null_rate': null_rate, 'outlier_rate': outlier_rate,
+                       'components': components, 'memory': memory},
+        'cases': cases
+    }
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Benchmark every preprocessing component on synthetic data.")
+    parser.add_argument('--rows', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--columns', type=int, nargs='+', default=[10])
+    parser.add_argument('--components', nargs='+', default=list(COMPONENTS), choices=list(COMPONENTS))
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--null-rate', type=float, default=0.001)
+    parser.add_argument('--outlier-rate', type=float, default=0.01)
+    parser.add_argument('--no-memory', action='store_true', help="Skip tracemalloc, which slows allocation-heavy stages.")
+    parser.add_argument('--no-pipeline', action='store_true', help="Skip the full Lazy_Prep run.")
+    parser.add_argument('--data-dir', default=os.path.join(ROOT, 'benchmarks', 'data'))
+    parser.add_argument('--output', default=os.path.join(ROOT, 'benchmarks', 'results', f"{time.strftime('%Y%m%d-%H%M%S')}.json"))
+    args = parser.parse_args(argv)
+
+    document = run(args.rows, args.columns, args.components, repeat=args.repeat, null_rate=args.null_rate,
+                   outlier_rate=args.outlier_rate, data_dir=args.data_dir, memory=not args.no_memory,
+                   full_pipeline=not args.no_pipeline)
+    os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+    with open(args.output, 'w') as file:
+        json.dump(document, file, indent=2, default=str)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+import os
+import json
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+from typing import Optional
+from Utilities.logger import setup_logger
+
+try:
+    import pyarrow.feather as feather
+except ImportError:         # pragma: no cover - pyarrow is optional
+    feather = None
+
+logger = setup_logger(log_file='pipeline.log', __name__=__name__)
+
+CACHE_VERSION = 1
+
+
+def file_fingerprint(path: str, full_hash: bool = False, block_size: int = 1 << 20) -> dict:
+    """
+    Builds a fingerprint of a file from its path, size, modification time and content.
+
+    Parameters:
+    -----------
+    path : str
+        File to fingerprint.
+    full_hash : bool, default=False
+        Hash the whole file. By default only the first, middle and last
+        `block_size` bytes are hashed, which is cheap even for very large files
+        while still catching edits that keep size and mtime unchanged.
+    block_size : int, default=1 MiB
+        Size of each hashed block when `full_hash` is False.
+
+    Returns:
+    --------
+    dict
+        {'path', 'size', 'mtime_ns', 'content_hash'}
+    """
+    stat = os.stat(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as file:
+        if full_hash or stat.st_size <= 3 * block_size:
+            for block in iter(lambda: file.read(block_size), b''):
+                digest.update(block)
+        else:
+            for offset in (0, stat.st_size // 2, stat.st_size - block_size):
+                file.seek(offset)
+                digest.update(file.read(block_size))
+    return {
+        'path': os.path.abspath(path),
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'content_hash': digest.hexdigest()
+    }
+
+
+def table_to_frame(table) -> pd.DataFrame:
+    """
+    Converts a cached Arrow table to the DataFrame `read_csv` would return.
+
+    Arrow turns missing values of object columns into None; they are put back
+    as NaN so cached and fresh loads compare equal.
+    """
+    df = table.to_pandas(split_blocks=True)
+    for col in df.select_dtypes(include=['object']).columns:
+        values = df[col].to_numpy()
+        missing = pd.isna(values)
+        if missing.any():
+            values = values.copy()
+            values[missing] = np.nan
+            df[col] = values
+    return df
+
+
+class FrameCache:
+    """
+    On-disk columnar cache of loaded DataFrames.
+
+    Each entry is an uncompressed Arrow IPC (Feather v2) file plus a small JSON
+    sidecar holding the source fingerprint and loader details (format, encoding).
+    Entries are keyed by the source file fingerprint, so any change to the
+    file's path, size, mtime or content produces a miss. Cached tables are read
+    memory-mapped, which avoids text parsing and lets the OS page columns in
+    on demand. When the cache grows beyond `max_bytes`, the least recently used
+    entries are evicted.
+
+    Parameters:
+    -----------
+    cache_dir : str
+        Directory that holds the cache entries.
+    max_bytes : int, default=2 GiB
+        Upper bound on the total size of cached tables.
+    full_hash : bool, default=False
+        Passed to `file_fingerprint`.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 2 * 1024 ** 3, full_hash: bool = False):
+        if feather is None:
+            raise ImportError("FrameCache requires 'pyarrow'. Install it with `pip install pyarrow`.")
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.full_hash = full_hash
+
+    def _paths(self, key: str):
+        base = os.path.join(self.cache_dir, key)
+        return base + '.feather', base + '.json'
+
+    def key(self, path: str) -> str:
+        """
+        Returns the cache key of the current state of `path`.
+        """
+        fingerprint = file_fingerprint(path, full_hash=self.full_hash)
+        raw = json.dumps({'version': CACHE_VERSION, **fingerprint}, sort_keys=True)
+        return hashlib.blake2b(raw.encode('utf-8'), digest_size=16).hexdigest()
+
+    def info(self, key: str) -> Optional[dict]:
+        """
+        Returns the stored loader details of an entry, or None on a miss.
+        """
+        table_path, info_path = self._paths(key)
+        if not (os.path.isfile(table_path) and os.path.isfile(info_path)):
+            return None
+        try:
+            with open(info_path, 'r') as file:
+                return json.load(file)
+        except (OSError, ValueError):
+            logger.warning(f"Corrupt cache entry {key}, ignoring it.")
+            return None
+
+    def read_table(self, key: str):
+        """
+        Opens a cached entry as a memory-mapped Arrow table and marks it as recently used.
+        """
+        table_path, _ = self._paths(key)
+        table = feather.read_table(table_path, memory_map=True)     #type: ignore
+        os.utime(table_path)
+        return table
+
+    def load(self, key: str) -> pd.DataFrame:
+        """
+        Loads a cached entry as a DataFrame.
+        """
+        logger.info(f"Loading DataFrame from columnar cache entry {key}")
+        return table_to_frame(self.read_table(key))
+
+    def store(self, key: str, df: pd.DataFrame, info: dict) -> bool:
+        """
+        Writes a DataFrame to the cache and evicts old entries if needed.
+
+        Returns:
+        --------
+        bool
+            True if the entry was written, False if the frame could not be cached.
+        """
+        table_path, info_path = self._paths(key)
+        tmp_path = table_path + '.tmp'
+        try:
+            feather.write_feather(df, tmp_path, compression='uncompressed')     #type: ignore
+            os.replace(tmp_path, table_path)
+            with open(info_path, 'w') as file:
+                json.dump({**info, 'created': time.time()}, file)
+        except Exception as e:
+            logger.warning(f"Could not write cache entry {key}: {e}")
+            for path in (tmp_path, table_path, info_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            return False
+        logger.info(f"Stored DataFrame with shape {df.shape} in columnar cache entry {key}")
+        self._evict(keep=key)
+        return True
+
+    def _evict(self, keep: str = ''):
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if name.endswith('.feather'):
+                path = os.path.join(self.cache_dir, name)
+                stat = os.stat(path)
+                entries.append((stat.st_mtime, stat.st_size, name[:-len('.feather')]))
+        total = sum(size for _, size, _ in entries)
+        for _, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            for path in self._paths(key):
+                if os.path.exists(path):
+                    os.remove(path)
+            total -= size
+            logger.info(f"Evicted columnar cache entry {key} ({size} bytes)")
+
+
+class AnalysisCache:
+    """
+    Persistent cache of per-column distribution analysis results.
+
+    Entries are keyed by engine, column name and dtype and hold the quantile
+    fingerprint of the sample the result was fitted on. A lookup hits when the
+    new fingerprint is within `tolerance` of the stored one, measured relative
+    to the stored column's spread, so a daily drop with the same schema and
+    nearly the same distributions reuses the previous choice. The cache is a
+    single JSON file; the least recently used entries are evicted beyond
+    `max_entries`.
+
+    Parameters:
+    -----------
+    path : str
+        JSON file backing the cache.
+    max_entries : int, default=1000
+        Maximum number of stored column results.
+    tolerance : float, default=0.05
+        Maximum relative fingerprint drift for a hit.
+    """
+    QUANTILES = (0.01, 0.05, 0.25, 0.5, 0.75, 0.95, 0.99)
+
+    def __init__(self, path: str, max_entries: int = 1000, tolerance: float = 0.05):
+        self.path = path
+        self.max_entries = max_entries
+        self.tolerance = tolerance
+        self.entries = {}
+        if os.path.isfile(path):
+            try:
+                with open(path, 'r') as file:
+                    stored = json.load(file)
+                if stored.get('version') == CACHE_VERSION:
+                    self.entries = stored.get('entries', {})
+            except (OSError, ValueError):
+                logger.warning(f"Could not read analysis cache {path}, starting empty.")
+
+    def fingerprint(self, sample: np.ndarray) -> list:
+        """
+        Returns a cheap sketch of a numeric sample: a few of its quantiles.
+        """
+        if len(sample) == 0:
+            return []
+        return [float(value) for value in np.quantile(sample, self.QUANTILES)]
+
+    def get(self, key: str, fingerprint: list) -> Optional[dict]:
+        """
+        Returns the cached result for `key` if its fingerprint is close enough, else None.
+        """
+        entry = self.entries.get(key)
+        if entry is None or not fingerprint or len(entry['fingerprint']) != len(fingerprint):
+            return None
+        stored = np.asarray(entry['fingerprint'])
+        spread = stored[-1] - stored[0]
+        if spread <= 0:
+            spread = max(abs(stored[len(stored) // 2]), 1.0)
+        drift = np.max(np.abs(np.asarray(fingerprint) - stored)) / spread
+        if drift > self.tolerance:
+            logger.info(f"Analysis cache entry {key} drifted by {drift:.3f}, refitting.")
+            return None
+        entry['last_used'] = time.time()
+        return entry['result']
+
+    def put(self, key: str, fingerprint: list, result: dict):
+        """
+        Stores the result for `key`, replacing any previous entry.
+        """
+        self.entries[key] = {'fingerprint': fingerprint, 'result': result, 'last_used': time.time()}
+        if len(self.entries) > self.max_entries:
+            by_age = sorted(self.entries, key=lambda k: self.entries[k]['last_used'])
+            for old_key in by_age[:len(self.entries) - self.max_entries]:
+                del self.entries[old_key]
+
+    def save(self):
+        """
+        Writes the cache to disk atomically.
+        """
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as file:
+            json.dump({'version': CACHE_VERSION, 'entries': self.entries}, file, default=float)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,151 @@
+import numpy as np
+from scipy import stats
+
+# Normal quantile used by the three-parameter lognormal quantile estimator
+_Z95 = stats.norm.ppf(0.95)
+
+
+def _row_stats(samples: np.ndarray) -> dict:
+    """
+    Computes the per-row moments and quantiles every estimator needs, in one pass.
+    Rows are columns of the original table, padded with NaN.
+    """
+    count = np.sum(~np.isnan(samples), axis=1)
+    mean = np.nanmean(samples, axis=1)
+    std = np.nanstd(samples, axis=1)
+    centered = samples - mean[:, None]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        skew = np.nanmean(centered ** 3, axis=1) / std ** 3
+    q05, q25, q50, q75, q95 = np.nanquantile(samples, [0.05, 0.25, 0.5, 0.75, 0.95], axis=1)
+    return {
+        'count': count, 'mean': mean, 'std': std, 'skew': skew,
+        'min': np.nanmin(samples, axis=1), 'max': np.nanmax(samples, axis=1),
+        'q05': q05, 'q25': q25, 'median': q50, 'q75': q75, 'q95': q95
+    }
+
+
+def _estimate_parameters(samples: np.ndarray, s: dict) -> dict:
+    """
+    Closed-form (moment, quantile or maximum likelihood) estimates for every family.
+    Returns {family: (shape_names, shapes, loc, scale)} with one value per row.
+    Invalid estimates are left as NaN and score as the worst fit.
+    """
+    value_range = s['max'] - s['min']
+    gap = value_range / np.maximum(s['count'], 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # Gamma by the method of moments; only defined for right-skewed data
+        gamma_a = np.where(s['skew'] > 0, 4.0 / s['skew'] ** 2, np.nan)
+        gamma_scale = s['std'] * s['skew'] / 2.0
+        gamma_loc = s['mean'] - gamma_a * gamma_scale
+
+        # Rayleigh by the method of moments
+        rayleigh_scale = s['std'] / np.sqrt((4.0 - np.pi) / 2.0)
+        rayleigh_loc = s['mean'] - rayleigh_scale * np.sqrt(np.pi / 2.0)
+
+        # Three-parameter lognormal from the 5th, 50th and 95th percentiles
+        denominator = 2.0 * s['median'] - s['q05'] - s['q95']
+        lognorm_loc = np.where(denominator < 0, (s['median'] ** 2 - s['q05'] * s['q95']) / denominator, np.nan)
+        lognorm_loc = np.where(lognorm_loc < s['min'], lognorm_loc, np.nan)
+        lognorm_scale = s['median'] - lognorm_loc
+        lognorm_s = (np.log(s['q95'] - lognorm_loc) - np.log(lognorm_scale)) / _Z95
+
+        # Exponential power by matching the quartiles: ((x - loc) / scale) ** b = log(1 - log(1 - p))
+        exponpow_loc = s['min'] - gap
+        l25 = np.log(np.log(1.0 - np.log(0.75)))
+        l75 = np.log(np.log(1.0 - np.log(0.25)))
+        log25 = np.log(s['q25'] - exponpow_loc)
+        log75 = np.log(s['q75'] - exponpow_loc)
+        exponpow_b = (l75 - l25) / (log75 - log25)
+        exponpow_scale = np.exp(log25 - l25 / exponpow_b)
+
+        # Power law on [loc, loc + scale], maximum likelihood for the exponent
+        powerlaw_loc = s['min'] - gap
+        powerlaw_scale = value_range + 2.0 * gap
+        log_u = np.log((samples - powerlaw_loc[:, None]) / powerlaw_scale[:, None])
+        powerlaw_a = -s['count'] / np.nansum(log_u, axis=1)
+
+    # Ordered from the simplest family to the most flexible one, see `fit_distributions`
+    return {
+        'norm': ((), (), s['mean'], s['std']),
+        'uniform': ((), (), s['min'], value_range),
+        'expon': ((), (), s['min'], s['mean'] - s['min']),
+        'cauchy': ((), (), s['median'], (s['q75'] - s['q25']) / 2.0),
+        'rayleigh': ((), (), rayleigh_loc, rayleigh_scale),
+        'gamma': (('a',), (gamma_a,), gamma_loc, gamma_scale),
+        'chi2': (('df',), (2.0 * gamma_a,), gamma_loc, gamma_scale / 2.0),
+        'lognorm': (('s',), (lognorm_s,), lognorm_loc, lognorm_scale),
+        'exponpow': (('b',), (exponpow_b,), exponpow_loc, exponpow_scale),
+        'powerlaw': (('a',), (powerlaw_a,), powerlaw_loc, powerlaw_scale),
+    }
+
+
+def fit_distributions(samples: np.ndarray, bins: int = 100, rtol: float = 0.05) -> list:
+    """
+    Picks the best matching distribution family for every row of a sample matrix.
+
+    All rows are scored at once: parameters come from closed-form estimators and
+    the goodness of fit is the sum of squared errors between the normalized
+    histogram and the fitted density at the bin centers, the same criterion
+    Fitter uses with `get_best(method='sumsquare_error')`.
+
+    Parameters:
+    -----------
+    samples : np.ndarray
+        2-D array with one row per column to classify, padded with NaN.
+    bins : int, default=100
+        Number of histogram bins per row.
+    rtol : float, default=0.05
+        Families whose error is within `rtol` of the best one count as a tie,
+        and ties go to the family with the fewest parameters. Without it, the
+        three-parameter families win on sampling noise alone.
+
+    Returns:
+    --------
+    list of dict
+        One {'Distribution': name, 'Parameters': {...}} per row. Rows that cannot
+        be scored (empty or constant) get {'Distribution': 'Fitter Failed', 'Parameters': None},
+        as with the exact engine.
+    """
+    samples = np.atleast_2d(np.asarray(samples, dtype=np.float64))
+    n_rows = samples.shape[0]
+    if samples.shape[1] == 0:
+        return [{"Distribution": "Fitter Failed", "Parameters": None} for _ in range(n_rows)]
+    valid = ~np.isnan(samples)
+    s = _row_stats(samples)
+
+    # Histogram density of every row, computed with a single bincount
+    lower, width = s['min'], (s['max'] - s['min']) / bins
+    with np.errstate(divide='ignore', invalid='ignore'):
+        positions = np.floor((samples - lower[:, None]) / width[:, None])
+    positions = np.clip(np.nan_to_num(positions, nan=0, posinf=0, neginf=0), 0, bins - 1).astype(np.int64)
+    flat = (np.arange(n_rows)[:, None] * bins + positions)[valid]
+    counts = np.bincount(flat, minlength=n_rows * bins).reshape(n_rows, bins)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        density = counts / (s['count'][:, None] * width[:, None])
+    centers = lower[:, None] + width[:, None] * (np.arange(bins) + 0.5)
+
+    estimates = _estimate_parameters(samples, s)
+    names = list(estimates)
+    errors = np.full((len(names), n_rows), np.inf)
+    for i, name in enumerate(names):
+        _, shapes, loc, scale = estimates[name]
+        with np.errstate(all='ignore'):
+            pdf = getattr(stats, name).pdf(centers, *(shape[:, None] for shape in shapes),
+                                           loc=loc[:, None], scale=scale[:, None])
+            sse = np.sum((density - pdf) ** 2, axis=1)
+        ok = np.all(np.isfinite(pdf), axis=1) & np.isfinite(sse) & (scale > 0)
+        errors[i, ok] = sse[ok]
+
+    # First family (in simplicity order) whose error ties with the minimum
+    best = np.argmax(errors <= errors.min(axis=0) * (1.0 + rtol), axis=0)
+    results = []
+    for row in range(n_rows):
+        if not np.isfinite(errors[best[row], row]) or width[row] <= 0:
+            results.append({"Distribution": "Fitter Failed", "Parameters": None})
+            continue
+        name = names[best[row]]
+        shape_names, shapes, loc, scale = estimates[name]
+        params = {shape_name: float(shape[row]) for shape_name, shape in zip(shape_names, shapes)}
+        params.update({'loc': float(loc[row]), 'scale': float(scale[row])})
+        results.append({"Distribution": name, "Parameters": params})
+    return results
@@ -0,0 +1,161 @@
+import os
+import shutil
+import weakref
+import tempfile
+import numpy as np
+from typing import Optional
+from Utilities.logger import setup_logger
+
+logger = setup_logger(log_file='pipeline.log', __name__=__name__)
+
+
+class SpillingHashSet:
+    """
+    Set of 64-bit hashes that moves to disk when it outgrows a memory budget.
+
+    Hashes are kept in memory as one sorted uint64 array, 8 bytes per entry.
+    Once that array exceeds `budget_bytes` it is merged into `partitions` sorted
+    files split by the top bits of the hash and memory is cleared. Lookups map
+    the partition files with `np.memmap` and binary-search them, so they only
+    touch the pages they probe instead of reading whole partitions. Spill files
+    live in a private temporary directory removed by `close` or when the set is
+    garbage collected.
+
+    Parameters:
+    -----------
+    budget_bytes : int, default=64 MiB
+        Memory the in-memory part may use before it is spilled.
+    spill_dir : str, optional
+        Parent directory of the spill files, the system temp directory by default.
+    partitions : int, default=64
+        Number of spill files, a power of two.
+    """
+
+    def __init__(self, budget_bytes: int = 64 * 2 ** 20, spill_dir: Optional[str] = None, partitions: int = 64):
+        if partitions < 1 or partitions & (partitions - 1):
+            raise ValueError("partitions must be a power of two")
+        self.budget_bytes = budget_bytes
+        self.spill_dir = spill_dir
+        self.partitions = partitions
+        self._shift = np.uint64(64 - partitions.bit_length() + 1)
+        self._memory = np.empty(0, dtype=np.uint64)
+        self._spilled = np.zeros(partitions, dtype=np.int64)
+        self._directory = None
+        self._finalizer = None
+
+    def __len__(self) -> int:
+        return len(self._memory) + int(self._spilled.sum())
+
+    @property
+    def spilled(self) -> int:
+        """
+        Number of hashes stored on disk.
+        """
+        return int(self._spilled.sum())
+
+    def _partition(self, hashes: np.ndarray) -> np.ndarray:
+        if self.partitions == 1:
+            return np.zeros(len(hashes), dtype=np.int64)
+        return (hashes >> self._shift).astype(np.int64)
+
+    def _path(self, partition: int) -> str:
+        return os.path.join(self._directory, f'{partition}.bin')  # type: ignore
+
+    def _stored(self, partition: int) -> np.ndarray:
+        """
+        Read-only memory map of the sorted hashes spilled to `partition`.
+        """
+        return np.memmap(self._path(partition), dtype=np.uint64, mode='r', shape=(int(self._spilled[partition]),))
+
+    @staticmethod
+    def _search(stored: np.ndarray, hashes: np.ndarray) -> np.ndarray:
+        index = np.minimum(np.searchsorted(stored, hashes), len(stored) - 1)
+        return stored[index] == hashes
+
+    def _contains(self, hashes: np.ndarray) -> np.ndarray:
+        """
+        Membership of sorted, distinct `hashes`.
+        """
+        found = np.zeros(len(hashes), dtype=bool)
+        if len(self._memory):
+            found = self._search(self._memory, hashes)
+        if self.spilled:
+            partition = self._partition(hashes)
+            bounds = np.searchsorted(partition, np.arange(self.partitions + 1))
+            for part in np.flatnonzero(self._spilled):
+                start, end = bounds[part], bounds[part + 1]
+                if start < end:
+                    found[start:end] |= self._search(self._stored(int(part)), hashes[start:end])
+        return found
+
+    def _merge(self, partition: int, new: np.ndarray):
+        """
+        Merges sorted `new` hashes, none of them stored yet, into the sorted
+        file of `partition`, reading the old file in blocks of `budget_bytes`.
+        """
+        path = self._path(partition)
+        if not self._spilled[partition]:
+            new.tofile(path)
+            return
+        stored = self._stored(partition)
+        # New hashes go before the stored hash at their insertion point
+        position = np.searchsorted(stored, new)
+        block = max(1, self.budget_bytes // 8)
+        with open(path + '.tmp', 'wb') as file:
+            for start in range(0, len(stored), block):
+                end = min(start + block, len(stored))
+                lo, hi = np.searchsorted(position, [start, end if end < len(stored) else end + 1])
+                np.insert(np.asarray(stored[start:end]), position[lo:hi] - start, new[lo:hi]).tofile(file)
+        del stored
+        os.replace(path + '.tmp', path)
+
+    def _spill(self):
+        if self._directory is None:
+            if self.spill_dir:
+                os.makedirs(self.spill_dir, exist_ok=True)
+            self._directory = tempfile.mkdtemp(prefix='hashset-', dir=self.spill_dir)
+            self._finalizer = weakref.finalize(self, shutil.rmtree, self._directory, True)
+        partition = self._partition(self._memory)
+        bounds = np.searchsorted(partition, np.arange(self.partitions + 1))
+        for part in range(self.partitions):
+            start, end = bounds[part], bounds[part + 1]
+            if start == end:
+                continue
+            self._merge(part, self._memory[start:end])
+            self._spilled[part] += end - start
+        logger.info(f"Spilled {len(self._memory)} hashes to {self._directory}, {self.spilled} on disk in total")
+        self._memory = np.empty(0, dtype=np.uint64)
+
+    def add(self, hashes) -> np.ndarray:
+        """
+        Adds a batch of hashes.
+
+        Returns:
+        --------
+        np.ndarray
+            Boolean mask, True where the hash was already in the set or occurred
+            earlier in the batch, so the first occurrence of every hash is False.
+        """
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        unique, first = np.unique(hashes, return_index=True)
+        seen = np.ones(len(hashes), dtype=bool)
+        known = self._contains(unique)
+        seen[first[~known]] = False
+        new = unique[~known]
+        if len(new):
+            # Both arrays are sorted, which the stable sort merges in linear time
+            self._memory = np.sort(np.concatenate([self._memory, new]), kind='stable')
+            if self._memory.nbytes > self.budget_bytes:
+                self._spill()
+        return seen
+
+    def close(self):
+        """
+        Empties the set and deletes its spill files.
+        """
+        self._memory = np.empty(0, dtype=np.uint64)
+        self._spilled[:] = 0
+        if self._finalizer is not None:
+            self._finalizer()
+        self._directory = None
+        self._finalizer = None
@@ -0,0 +1,129 @@
+import time
+import cProfile
+import tracemalloc
+from typing import Callable, Optional
+from Utilities.logger import setup_logger
+
+logger = setup_logger(log_file='pipeline.log', __name__=__name__)
+
+
+def _shape(obj):
+    shape = getattr(obj, 'shape', None)
+    if shape is None:
+        return None, None
+    return shape[0], (shape[1] if len(shape) > 1 else 1)
+
+
+class StageProfiler:
+    """
+    Records the cost of every pipeline stage of a run.
+
+    Each call made through `call` produces one record:
+    {'run', 'component', 'method', 'chunk', 'wall_time', 'cpu_time', 'peak_memory',
+     'rows_in', 'columns_in', 'rows_out', 'columns_out'}.
+    Times are in seconds. `peak_memory` is the highest number of bytes allocated
+    by Python during the stage on top of what was allocated when it started, as
+    traced by tracemalloc, or None when memory tracing is off. Records are kept
+    in `records` and passed to every hook as soon as they are taken.
+
+    Parameters:
+    -----------
+    memory : bool, default=True
+        Trace Python allocations with tracemalloc. Tracing slows allocation-heavy
+        stages down, so turn it off when only timings are needed.
+    hooks : list of callables, optional
+        Called with every record, e.g. to forward it to a metrics system.
+    cprofile_path : str, optional
+        Dump a cProfile of the whole run to this path. The file is readable by
+        `pstats`, snakeviz or flameprof (flame graphs).
+    """
+
+    def __init__(self, memory: bool = True, hooks: Optional[list] = None, cprofile_path: Optional[str] = None):
+        self.memory = memory
+        self.hooks = list(hooks or [])
+        self.cprofile_path = cprofile_path
+        self.records = []
+        self.run = ''
+        self._profile = None
+        self._started_tracing = False
+
+    def add_hook(self, hook: Callable[[dict], None]):
+        """
+        Registers a callable that receives every record.
+        """
+        self.hooks.append(hook)
+
+    def begin(self, run: str):
+        """
+        Starts a run: clears the records and starts tracing and cProfile if enabled.
+        """
+        self.run = run
+        self.records = []
+        if self.memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+        if self.cprofile_path:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def end(self) -> list:
+        """
+        Ends the run, writes the cProfile dump if enabled and returns the records.
+        """
+        if self._profile is not None:
+            self._profile.disable()
+            self._profile.dump_stats(self.cprofile_path)
+            logger.info(f"cProfile of run '{self.run}' written to {self.cprofile_path}")
+            self._profile = None
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+        return self.records
+
+    def call(self, component: str, method: str, func: Callable, data=None, chunk: Optional[int] = None):
+        """
+        Runs `func(data)` (or `func()` when `data` is None) and records its cost.
+        """
+        rows_in, columns_in = _shape(data)
+        tracing = self.memory and tracemalloc.is_tracing()
+        if tracing:
+            tracemalloc.reset_peak()
+            memory_start = tracemalloc.get_traced_memory()[0]
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        result = func() if data is None else func(data)
+        wall_time, cpu_time = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        rows_out, columns_out = _shape(result)
+        record = {
+            'run': self.run,
+            'component': component,
+            'method': method,
+            'chunk': chunk,
+            'wall_time': wall_time,
+            'cpu_time': cpu_time,
+            'peak_memory': tracemalloc.get_traced_memory()[1] - memory_start if tracing else None,
+            'rows_in': rows_in,
+            'columns_in': columns_in,
+            'rows_out': rows_out,
+            'columns_out': columns_out
+        }
+        self.records.append(record)
+        logger.info(f"Profile {component}.{method}: {wall_time:.4f}s wall, {cpu_time:.4f}s cpu, "
+                    f"peak memory {record['peak_memory']}, shape ({rows_in}, {columns_in}) -> ({rows_out}, {columns_out})")
+        for hook in self.hooks:
+            hook(record)
+        return result
+
+    def summary(self) -> dict:
+        """
+        Totals of the current records per component and method.
+        """
+        totals = {}
+        for record in self.records:
+            key = f"{record['component']}.{record['method']}"
+            total = totals.setdefault(key, {'calls': 0, 'wall_time': 0.0, 'cpu_time': 0.0, 'peak_memory': None})
+            total['calls'] += 1
+            total['wall_time'] += record['wall_time']
+            total['cpu_time'] += record['cpu_time']
+            if record['peak_memory'] is not None:
+                total['peak_memory'] = max(total['peak_memory'] or 0, record['peak_memory'])
+        return totals
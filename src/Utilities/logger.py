@@ -22,8 +22,8 @@ def setup_logger(log_dir='Logs', log_file='pipeline.log', __name__=__name__):
     logger.setLevel(logging.INFO)
 
     formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')    
-    # Configure file handler
-    file_handler = logging.FileHandler(os.path.join(log_dir, log_file))
+    # Configure file handler; the file is opened on the first record, not at import time
+    file_handler = logging.FileHandler(os.path.join(log_dir, log_file), delay=True)
     file_handler.setFormatter(formatter)
     
     if not logger.handlers:
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+from typing import Optional
+from Utilities.logger import setup_logger
+
+logger = setup_logger(log_file='pipeline.log', __name__=__name__)
+
+
+class MemoryBudgetExceeded(MemoryError):
+    """
+    Raised when the pipeline's data outgrows its configured memory budget.
+    """
+
+    def __init__(self, stage: str, used: int, budget: int):
+        self.stage = stage
+        self.used = used
+        self.budget = budget
+        super().__init__(f"{stage} needs {used} bytes, which exceeds the memory budget of {budget} bytes.")
+
+
+def _is_mapped(values) -> bool:
+    base = values
+    while base is not None:
+        if isinstance(base, np.memmap):
+            return True
+        base = getattr(base, 'base', None)
+    return False
+
+
+def resident_bytes(df: pd.DataFrame) -> int:
+    """
+    Bytes a DataFrame holds in memory, counting strings in object columns but
+    not columns backed by memory-mapped files.
+    """
+    total = int(df.index.memory_usage(deep=True))
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, np.dtype) and series.dtype.kind in 'biuf' and _is_mapped(series.to_numpy()):
+            continue
+        total += int(series.memory_usage(index=False, deep=True))
+    return total
+
+
+def spill(df: pd.DataFrame, spill_dir: Optional[str] = None) -> pd.DataFrame:
+    """
+    Moves the numeric columns of a DataFrame to memory-mapped files so the OS can
+    page them out, and returns a frame around them. Files are unlinked right away
+    and disappear when the frame is released.
+    """
+    spill_dir = spill_dir or tempfile.gettempdir()
+    os.makedirs(spill_dir, exist_ok=True)
+    columns, moved = {}, []
+    for col in df.columns:
+        series = df[col]
+        values = series.to_numpy()
+        if not isinstance(series.dtype, np.dtype) or series.dtype.kind not in 'biuf' or _is_mapped(values) or values.size == 0:
+            columns[col] = series
+            continue
+        handle, path = tempfile.mkstemp(dir=spill_dir, suffix='.spill')
+        os.close(handle)
+        mapped = np.memmap(path, dtype=values.dtype, mode='w+', shape=values.shape)
+        mapped[:] = values
+        mapped.flush()
+        os.remove(path)
+        columns[col] = pd.Series(mapped, index=df.index, name=col, copy=False)
+        moved.append(col)
+    logger.info(f"Spilled {len(moved)} numeric columns to memory-mapped files in {spill_dir}")
+    return pd.DataFrame(columns, index=df.index, copy=False)
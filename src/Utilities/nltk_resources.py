@@ -0,0 +1,118 @@
+import os
+import threading
+from typing import Optional
+from Utilities.logger import setup_logger
+
+logger = setup_logger(log_file='pipeline.log', __name__=__name__)
+
+# Environment variable holding the local NLTK data directory
+DATA_DIR_ENV = 'DATA_PREPROCESSOR_NLTK_DATA'
+
+# Resource -> NLTK packages that can provide it, with the path `nltk.data.find` looks up.
+# Newer NLTK releases tokenize with 'punkt_tab', older ones with 'punkt'.
+RESOURCES = {
+    'tokenizer': [('punkt_tab', 'tokenizers/punkt_tab/english/'), ('punkt', 'tokenizers/punkt/english.pickle')],
+    'stopwords': [('stopwords', 'corpora/stopwords')],
+    'wordnet': [('wordnet', 'corpora/wordnet')],
+}
+
+
+class NLTKResources:
+    """
+    Process-wide, offline-first access to the NLTK data the TextProcessor needs.
+
+    Nothing is looked up until a resource is first used, and each one is checked
+    once per process. Resources are searched in `data_dir` first, then in NLTK's
+    default locations. The network is only used when `allow_download` is True or
+    `download` is called explicitly; otherwise a missing resource raises a
+    LookupError explaining how to seed it.
+
+    Parameters:
+    -----------
+    data_dir : str, optional
+        Local directory with pre-seeded NLTK data. Defaults to the
+        DATA_PREPROCESSOR_NLTK_DATA environment variable.
+    allow_download : bool, default=False
+        Download missing resources into `data_dir` on first use.
+    """
+
+    def __init__(self, data_dir: Optional[str] = None, allow_download: bool = False):
+        self._lock = threading.Lock()
+        self._available = set()
+        self._stop_words = {}
+        self.data_dir = None
+        self.allow_download = allow_download
+        self.configure(data_dir=data_dir or os.environ.get(DATA_DIR_ENV))
+
+    def configure(self, data_dir: Optional[str] = None, allow_download: Optional[bool] = None):
+        """
+        Changes the local data directory and download policy. Resources already
+        found stay loaded.
+        """
+        if allow_download is not None:
+            self.allow_download = allow_download
+        if data_dir and data_dir != self.data_dir:
+            import nltk
+            self.data_dir = data_dir
+            if data_dir not in nltk.data.path:
+                nltk.data.path.insert(0, data_dir)
+            logger.info(f"NLTK data directory set to {data_dir}")
+
+    def _find(self, resource: str) -> bool:
+        import nltk
+        for _, path in RESOURCES[resource]:
+            try:
+                nltk.data.find(path)
+                return True
+            except LookupError:
+                continue
+        return False
+
+    def download(self, *resources: str):
+        """
+        Downloads resources into `data_dir` (or NLTK's default directory). This is the only network access.
+        """
+        import nltk
+        for resource in resources or tuple(RESOURCES):
+            for package, _ in RESOURCES[resource]:
+                logger.info(f"Downloading NLTK package '{package}'")
+                if nltk.download(package, download_dir=self.data_dir, quiet=True):
+                    break
+
+    def ensure(self, *resources: str):
+        """
+        Makes sure resources are available, downloading them only if allowed.
+
+        Raises:
+        -------
+        LookupError
+            If a resource is missing and downloads are not allowed.
+        """
+        with self._lock:
+            for resource in resources:
+                if resource in self._available:
+                    continue
+                if not self._find(resource):
+                    if not self.allow_download:
+                        packages = ', '.join(package for package, _ in RESOURCES[resource])
+                        raise LookupError(
+                            f"NLTK resource '{resource}' ({packages}) was not found locally. Seed it with "
+                            f"`python -m nltk.downloader -d <dir> {RESOURCES[resource][0][0]}` and point "
+                            f"{DATA_DIR_ENV} or `nltk_data_dir` at <dir>, or allow downloads.")
+                    self.download(resource)
+                    if not self._find(resource):
+                        raise LookupError(f"NLTK resource '{resource}' could not be downloaded.")
+                self._available.add(resource)
+
+    def stop_words(self, language: str = 'english') -> frozenset:
+        """
+        Stop words of `language`, loaded once per process.
+        """
+        if language not in self._stop_words:
+            self.ensure('stopwords')
+            from nltk.corpus import stopwords
+            self._stop_words[language] = frozenset(stopwords.words(language))
+        return self._stop_words[language]
+
+
+resources = NLTKResources()
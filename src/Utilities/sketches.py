@@ -0,0 +1,524 @@
+import numpy as np
+import pandas as pd
+from typing import Optional
+
+
+def hash_values(series: pd.Series) -> np.ndarray:
+    """
+    64-bit hash of every non-null value of a column. Numbers are hashed as float64,
+    so 1 and 1.0 read from different chunks hash alike.
+    """
+    series = series.dropna()
+    if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+        return pd.util.hash_array(series.to_numpy(dtype=np.float64) + 0.0)
+    return pd.util.hash_pandas_object(series, index=False).to_numpy()
+
+
+class RunningMoments:
+    """
+    Count, null count, mean, variance, minimum and maximum of a numeric stream.
+    Batches are combined with Chan's parallel update, so merging is exact.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.nulls = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+
+    def _combine(self, count: int, mean: float, m2: float):
+        total = self.count + count
+        if not count:
+            return
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+
+    def update(self, values) -> 'RunningMoments':
+        values = np.asarray(values, dtype=np.float64)
+        missing = np.isnan(values)
+        self.nulls += int(missing.sum())
+        values = values[~missing]
+        if len(values):
+            mean = float(values.mean())
+            self._combine(len(values), mean, float(((values - mean) ** 2).sum()))
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+        return self
+
+    def merge(self, other: 'RunningMoments') -> 'RunningMoments':
+        self.nulls += other.nulls
+        self._combine(other.count, other.mean, other.m2)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def variance(self, ddof: int = 1) -> float:
+        return self.m2 / (self.count - ddof) if self.count > ddof else np.nan
+
+    def std(self, ddof: int = 1) -> float:
+        return float(np.sqrt(self.variance(ddof)))
+
+
+class ReservoirSample:
+    """
+    Uniform random sample of at most `size` values of a stream (Algorithm R).
+
+    Parameters:
+    -----------
+    size : int, default=1500
+        Number of values kept, the sample size the Analyzer fits distributions on.
+    seed : int, optional
+        Seed of the random generator, for reproducible samples.
+    """
+
+    def __init__(self, size: int = 1500, seed: Optional[int] = None):
+        self.size = size
+        self.count = 0
+        self.values = np.empty(0, dtype=np.float64)
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, values) -> 'ReservoirSample':
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        free = min(self.size - len(self.values), len(values))
+        if free > 0:
+            self.values = np.concatenate([self.values, values[:free]])
+        rest = values[free:]
+        if len(rest):
+            # Item t of the stream (1-based) replaces a random slot with probability size / t
+            positions = self.count + free + 1 + np.arange(len(rest))
+            slots = (self._rng.random(len(rest)) * positions).astype(np.int64)
+            chosen = slots < self.size
+            slots, rest = slots[chosen], rest[chosen]
+            # Later items overwrite earlier ones in the same slot
+            last = len(slots) - 1 - np.unique(slots[::-1], return_index=True)[1]
+            self.values[slots[last]] = rest[last]
+        self.count += len(values)
+        return self
+
+    def merge(self, other: 'ReservoirSample') -> 'ReservoirSample':
+        """
+        Combines two samples into a uniform sample of both streams: the number of
+        values taken from each side is hypergeometric in the two stream counts.
+        """
+        size = min(self.size, self.count + other.count)
+        if self.count and other.count and len(self.values) + len(other.values) > size:
+            mine = int(self._rng.hypergeometric(self.count, other.count, size))
+            mine = min(max(mine, size - len(other.values)), len(self.values))
+            self.values = np.concatenate([self._rng.choice(self.values, mine, replace=False),
+                                          self._rng.choice(other.values, size - mine, replace=False)])
+        else:
+            self.values = np.concatenate([self.values, other.values])[:size]
+        self.count += other.count
+        return self
+
+
+class KLLSketch:
+    """
+    Quantile sketch of a numeric stream (Karnin, Lang and Liberty).
+
+    Values enter level 0. A level over its capacity is sorted and every other
+    value, from a random offset, is promoted to the next level with twice the
+    weight. Capacities shrink by 2/3 per level below the top one, so memory is
+    O(k log(n / k)) and the rank error about 1.7 / k. Until the first
+    compaction the sketch is exact.
+
+    Parameters:
+    -----------
+    k : int, default=200
+        Accuracy parameter, the capacity of the top level.
+    seed : int, optional
+        Seed of the compaction offsets.
+    """
+
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        self.k = k
+        self.count = 0
+        self.min = np.inf
+        self.max = -np.inf
+        self.levels = [np.empty(0, dtype=np.float64)]
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def exact(self) -> bool:
+        return len(self.levels) == 1
+
+    def _capacity(self, level: int) -> int:
+        return max(2, int(np.ceil(self.k * (2 / 3) ** (len(self.levels) - level - 1))))
+
+    def _compress(self):
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0, dtype=np.float64))
+                items = np.sort(items)
+                # An odd item out stays at this level
+                kept, items = items[len(items) - len(items) % 2:], items[:len(items) - len(items) % 2]
+                promoted = items[int(self._rng.integers(2))::2]
+                self.levels[level] = kept
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+            level += 1
+
+    def update(self, values) -> 'KLLSketch':
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        if len(values):
+            self.count += len(values)
+            self.min = min(self.min, float(values.min()))
+            self.max = max(self.max, float(values.max()))
+            self.levels[0] = np.concatenate([self.levels[0], values])
+            self._compress()
+        return self
+
+    def merge(self, other: 'KLLSketch') -> 'KLLSketch':
+        while len(self.levels) < len(other.levels):
+            self.levels.append(np.empty(0, dtype=np.float64))
+        for level, items in enumerate(other.levels):
+            self.levels[level] = np.concatenate([self.levels[level], items])
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _items(self) -> tuple:
+        """
+        All kept values and their weights, 2 ** level.
+        """
+        weights = np.concatenate([np.full(len(items), 2.0 ** level) for level, items in enumerate(self.levels)])
+        return np.concatenate(self.levels), weights
+
+    def _weighted(self) -> tuple:
+        items, weights = self._items()
+        order = np.argsort(items, kind='stable')
+        return items[order], np.cumsum(weights[order])
+
+    def quantile(self, q):
+        """
+        Approximate quantiles, q in [0, 1]. Exact (linearly interpolated, as pandas) while no compaction happened.
+        """
+        q = np.asarray(q, dtype=np.float64)
+        if not self.count:
+            return np.full(q.shape, np.nan) if q.ndim else np.nan
+        if self.exact:
+            return np.quantile(self.levels[0], q)
+        items, cumulative = self._weighted()
+        index = np.minimum(np.searchsorted(cumulative, q * cumulative[-1], side='left'), len(items) - 1)
+        result = np.where(q <= 0, self.min, np.where(q >= 1, self.max, items[index]))
+        return result if q.ndim else float(result)
+
+    def deviation_quantile(self, center: float, q: float = 0.5) -> float:
+        """
+        Approximate q-quantile of |x - center| over the stream, e.g. the MAD with
+        the median as center and q=0.5. Exact while no compaction happened.
+        """
+        if not self.count:
+            return np.nan
+        if self.exact:
+            return float(np.quantile(np.abs(self.levels[0] - center), q))
+        items, weights = self._items()
+        order = np.argsort(np.abs(items - center), kind='stable')
+        cumulative = np.cumsum(weights[order])
+        index = min(int(np.searchsorted(cumulative, q * cumulative[-1], side='left')), len(items) - 1)
+        return float(np.abs(items[order[index]] - center))
+
+    def winsorized_mean(self, limit: float = 0.05) -> float:
+        """
+        Approximate mean after clipping the lowest and highest `limit` fraction of
+        the stream. Exact, with scipy's `mstats.winsorize` rounding, while no compaction happened.
+        """
+        if not self.count:
+            return np.nan
+        if self.exact:
+            values = np.sort(self.levels[0])
+            n = len(values)
+            low, high = int(limit * n), n - int(limit * n)
+            return float(np.clip(values, values[low], values[high - 1]).mean())
+        lower, upper = self.quantile([limit, 1 - limit])
+        items, weights = self._items()
+        return float(np.average(np.clip(items, lower, upper), weights=weights))
+
+    def rank(self, values):
+        """
+        Approximate fraction of the stream <= each value.
+        """
+        values = np.asarray(values, dtype=np.float64)
+        if not self.count:
+            return np.full(values.shape, np.nan)
+        items, cumulative = self._weighted()
+        index = np.searchsorted(items, values, side='right')
+        return np.where(index > 0, cumulative[np.maximum(index - 1, 0)], 0.0) / cumulative[-1]
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self.levels)
+
+
+class RegressionMoments:
+    """
+    Sufficient statistics of the least-squares regressions of several target
+    columns on the other columns, with gaps in the predictors filled by their
+    means over the whole stream.
+
+    Mean filling needs the means before the rows, so the products are kept
+    split by which side is observed and the means are only plugged in by
+    `solve`: for a mean-filled row x~ = x * m + mu * (1 - m),
+    sum(x~ x~') = A + B mu' + mu B' + C * mu mu', with A = sum((x m)(x m)'),
+    B = sum((x m)(1 - m)') and C = sum((1 - m)(1 - m)'). Updates and merges
+    are exact; memory is O(targets * columns ** 2).
+
+    Parameters:
+    -----------
+    columns : list
+        All numeric columns, predictors and targets.
+    targets : list
+        Columns to regress, each over the rows where it is observed.
+    """
+
+    def __init__(self, columns: list, targets: list):
+        self.columns = list(columns)
+        self.targets = list(targets)
+        size, count = len(self.columns) + 1, len(self.targets)
+        self.sums = np.zeros(len(self.columns))
+        self.counts = np.zeros(len(self.columns), dtype=np.int64)
+        self.rows = np.zeros(count, dtype=np.int64)
+        self.observed = np.zeros((count, size, size))
+        self.mixed = np.zeros((count, size, size))
+        self.missing = np.zeros((count, size, size))
+        self.observed_y = np.zeros((count, size))
+        self.missing_y = np.zeros((count, size))
+
+    def update(self, df: pd.DataFrame) -> 'RegressionMoments':
+        X = df.reindex(columns=self.columns).to_numpy(dtype=np.float64, na_value=np.nan)
+        observed = ~np.isnan(X)
+        X = np.where(observed, X, 0.0)
+        self.sums += X.sum(axis=0)
+        self.counts += observed.sum(axis=0)
+        # A constant column for the intercept, never missing
+        Xc = np.column_stack([np.ones(len(X)), X])
+        gaps = 1.0 - np.column_stack([np.ones(len(X), dtype=bool), observed])
+        for i, target in enumerate(self.targets):
+            rows = observed[:, self.columns.index(target)]
+            Xr, Nr, y = Xc[rows], gaps[rows], X[rows, self.columns.index(target)]
+            self.rows[i] += int(rows.sum())
+            self.observed[i] += Xr.T @ Xr
+            self.mixed[i] += Xr.T @ Nr
+            self.missing[i] += Nr.T @ Nr
+            self.observed_y[i] += Xr.T @ y
+            self.missing_y[i] += Nr.T @ y
+        return self
+
+    def merge(self, other: 'RegressionMoments') -> 'RegressionMoments':
+        if other.columns != self.columns or other.targets != self.targets:
+            raise ValueError("Cannot merge regression moments of different columns")
+        for name in ('sums', 'counts', 'rows', 'observed', 'mixed', 'missing', 'observed_y', 'missing_y'):
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+        return self
+
+    def means(self) -> dict:
+        """
+        Mean of every column with at least one value.
+        """
+        return {col: float(self.sums[i] / self.counts[i]) for i, col in enumerate(self.columns) if self.counts[i]}
+
+    def solve(self, target: str, predictors: list) -> tuple:
+        """
+        Least-squares (intercept, coefficients) of `target` on mean-filled `predictors`.
+        """
+        i = self.targets.index(target)
+        means = self.means()
+        mu = np.concatenate([[1.0], [means.get(col, 0.0) for col in self.columns]])
+        shifted = self.mixed[i] * mu[None, :]
+        gram = self.observed[i] + shifted + shifted.T + self.missing[i] * np.outer(mu, mu)
+        moment = self.observed_y[i] + mu * self.missing_y[i]
+        index = [0] + [self.columns.index(col) + 1 for col in predictors]
+        weights = np.linalg.lstsq(gram[np.ix_(index, index)], moment[index], rcond=None)[0]
+        return float(weights[0]), weights[1:]
+
+
+class HyperLogLog:
+    """
+    Distinct count of a stream of 64-bit hashes in 2**precision one-byte registers.
+
+    Counts are exact while at most `exact_limit` distinct hashes were seen;
+    beyond that the relative error is about 1.04 / sqrt(2**precision), 1.6% for
+    the default precision of 12.
+    """
+
+    def __init__(self, precision: int = 12, exact_limit: int = 1024):
+        if not 4 <= precision <= 18:
+            raise ValueError("precision must be between 4 and 18")
+        self.precision = precision
+        self.exact_limit = exact_limit
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+        self._exact = np.empty(0, dtype=np.uint64)
+
+    @staticmethod
+    def _leading_zeros(words: np.ndarray) -> np.ndarray:
+        zeros = np.zeros(len(words), dtype=np.uint8)
+        for shift in (32, 16, 8, 4, 2, 1):
+            high = words >> np.uint64(64 - shift) == 0
+            zeros += np.uint8(shift) * high
+            words = np.where(high, words << np.uint64(shift), words)
+        return zeros + (words == 0)
+
+    def update(self, hashes) -> 'HyperLogLog':
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if not len(hashes):
+            return self
+        if self._exact is not None:
+            self._exact = np.union1d(self._exact, hashes)
+            if len(self._exact) > self.exact_limit:
+                self._exact = None
+        index = (hashes >> np.uint64(64 - self.precision)).astype(np.int64)
+        rank = np.minimum(self._leading_zeros(hashes << np.uint64(self.precision)), 64 - self.precision) + 1
+        np.maximum.at(self.registers, index, rank.astype(np.uint8))
+        return self
+
+    def merge(self, other: 'HyperLogLog') -> 'HyperLogLog':
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLog sketches of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        if self._exact is not None and other._exact is not None:
+            self._exact = np.union1d(self._exact, other._exact)
+            if len(self._exact) > self.exact_limit:
+                self._exact = None
+        else:
+            self._exact = None
+        return self
+
+    def estimate(self) -> int:
+        if self._exact is not None:
+            return len(self._exact)
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.exp2(-self.registers.astype(np.float64)))
+        empty = int((self.registers == 0).sum())
+        if raw <= 2.5 * m and empty:
+            # Linear counting is more accurate for small cardinalities
+            return int(round(m * np.log(m / empty)))
+        return int(round(raw))
+
+
+class MisraGries:
+    """
+    Frequent values of a stream with at most `k` counters.
+
+    Every count is underestimated by at most n / (k + 1), so any value more
+    frequent than that is kept. Summaries merge by adding counters and
+    subtracting the (k+1)-th largest count (Agarwal et al.).
+    """
+
+    def __init__(self, k: int = 64):
+        self.k = k
+        self.counters = {}
+        self.count = 0
+
+    def _trim(self):
+        if len(self.counters) > self.k:
+            cut = sorted(self.counters.values(), reverse=True)[self.k]
+            self.counters = {value: count - cut for value, count in self.counters.items() if count > cut}
+
+    def update(self, series: pd.Series) -> 'MisraGries':
+        counts = series.value_counts(dropna=True)
+        self.count += int(counts.sum())
+        if len(counts) > self.k:
+            # Summarize the batch first, the merge rule keeps the error bound
+            cut = counts.iloc[self.k]
+            counts = counts[counts > cut] - cut
+        for value, count in counts.items():
+            self.counters[value] = self.counters.get(value, 0) + int(count)
+        self._trim()
+        return self
+
+    def merge(self, other: 'MisraGries') -> 'MisraGries':
+        for value, count in other.counters.items():
+            self.counters[value] = self.counters.get(value, 0) + count
+        self.count += other.count
+        self._trim()
+        return self
+
+    def top(self, n: Optional[int] = None) -> list:
+        """
+        The kept values with their count lower bounds, most frequent first; ties in
+        sorted value order, so the first one matches pandas' `mode()[0]`.
+        """
+        try:
+            items = sorted(self.counters.items(), key=lambda item: item[0])
+        except TypeError:
+            items = list(self.counters.items())
+        items.sort(key=lambda item: item[1], reverse=True)
+        return items[:n] if n is not None else items
+
+
+class ColumnProfile:
+    """
+    Mergeable sketches of one column: running moments, a reservoir sample and a
+    KLL quantile sketch of its numeric chunks, and distinct and frequent values
+    of all chunks. Memory does not grow with the number of rows.
+    """
+
+    def __init__(self, sample_size: int = 1500, quantile_k: int = 200, precision: int = 12, top_k: int = 64,
+                 seed: Optional[int] = None):
+        self.dtypes = []
+        self.rows = 0
+        self.nulls = 0
+        self.moments = RunningMoments()
+        self.sample = ReservoirSample(sample_size, seed=seed)
+        self.quantiles = KLLSketch(quantile_k, seed=seed)
+        self.distinct = HyperLogLog(precision)
+        self.frequent = MisraGries(top_k)
+
+    @property
+    def dtype(self):
+        """
+        The dtype pandas gives the column when reading all chunks at once: numeric
+        if every chunk was, else object, unless all chunks share one dtype.
+        """
+        if not self.dtypes:
+            return np.dtype(object)
+        if all(dtype == self.dtypes[0] for dtype in self.dtypes):
+            return self.dtypes[0]
+        if all(pd.api.types.is_numeric_dtype(dtype) and not isinstance(dtype, pd.CategoricalDtype) for dtype in self.dtypes):
+            return np.result_type(*self.dtypes)
+        return np.dtype(object)
+
+    def update(self, series: pd.Series) -> 'ColumnProfile':
+        if series.dtype not in self.dtypes:
+            self.dtypes.append(series.dtype)
+        self.rows += len(series)
+        self.nulls += int(series.isna().sum())
+        if pd.api.types.is_numeric_dtype(series.dtype) and not isinstance(series.dtype, pd.CategoricalDtype):
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            self.moments.update(values)
+            self.sample.update(values)
+            self.quantiles.update(values)
+        self.distinct.update(hash_values(series))
+        self.frequent.update(series)
+        return self
+
+    def merge(self, other: 'ColumnProfile') -> 'ColumnProfile':
+        self.dtypes += [dtype for dtype in other.dtypes if dtype not in self.dtypes]
+        self.rows += other.rows
+        self.nulls += other.nulls
+        self.moments.merge(other.moments)
+        self.sample.merge(other.sample)
+        self.quantiles.merge(other.quantiles)
+        self.distinct.merge(other.distinct)
+        self.frequent.merge(other.frequent)
+        return self
+
+    def summary(self) -> dict:
+        top = self.frequent.top(1)
+        summary = {'dtype': str(self.dtype), 'rows': self.rows, 'nulls': self.nulls,
+                   'unique_values': self.distinct.estimate(), 'top_value': top[0][0] if top else None}
+        if self.moments.count:
+            q1, median, q3 = self.quantiles.quantile([0.25, 0.5, 0.75])
+            summary.update({'mean': self.moments.mean, 'std': self.moments.std(), 'min': self.moments.min,
+                            'q1': float(q1), 'median': float(median), 'q3': float(q3), 'max': self.moments.max})
+        return summary
@@ -1,76 +1,205 @@
 import os
-import logging
 import pandas as pd
 import numpy as np
-from fitter import Fitter, get_common_distributions
-from pathlib import Path
 import json
+from typing import Optional
+from concurrent.futures import ProcessPoolExecutor
 from Utilities.statergy import strategies
+from Utilities.logger import setup_logger
 
 # Set up logging
-LOG_DIR = Path('Logs')
-LOG_DIR.mkdir(exist_ok=True)
-logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
-formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
-file_handler = logging.FileHandler(LOG_DIR / 'pipeline.log')
-file_handler.setFormatter(formatter)
-if not logger.hasHandlers():
-    logger.addHandler(file_handler)
+logger = setup_logger(log_file='pipeline.log', __name__=__name__)
 
 class CustomError(Exception):
     pass
 
+def _fit_distribution(name, sample: np.ndarray, fit_jobs: int = -1) -> dict:
+    """
+    Fits the common distributions to a sample and returns the best one.
+    Module level so it can run in a worker process.
+    """
+    try:
+        # fitter pulls in scipy.stats and matplotlib, so it is only imported by the 'exact' engine
+        from fitter import Fitter, get_common_distributions
+        f = Fitter(sample, distributions=get_common_distributions(), timeout=10)
+        f.fit(n_jobs=fit_jobs)
+        best_fit = f.get_best(method='sumsquare_error')
+        best_dist_name = list(best_fit.keys())[0]
+        best_dist_params = best_fit[best_dist_name]
+        result = {
+            "Distribution": best_dist_name,
+            "Parameters": best_dist_params
+        }
+    except Exception as e:
+        logger.warning(f"Fitter failed for '{name}': {str(e)}")
+        result = {"Distribution": "Fitter Failed", "Parameters": None}
+    return result
+
 class Analyzer:
-    def __init__(self, metadata: dict = {}):
+    """
+    Infers column types and, for numeric columns, the best fitting distribution
+    and the preprocessing strategies that go with it.
+
+    Parameters:
+    -----------
+    metadata : dict
+        Shared pipeline metadata, filled under the 'columns' key.
+    n_jobs : int, default=1
+        Number of worker processes used to fit numeric columns in parallel.
+        1 fits the columns one after another in the current process.
+    fit_jobs : int, optional
+        Number of jobs Fitter uses across distributions within one column.
+        Defaults to all cores when columns are fitted sequentially and to 1
+        when they are fitted in a pool, to avoid oversubscription.
+    engine : str, default='fast'
+        'fast' scores all numeric columns at once with closed-form estimators
+        (see `Utilities.distributions.fit_distributions`). 'exact' runs Fitter
+        on every column; n_jobs and fit_jobs only apply to this engine.
+    cache_dir : str, optional
+        Directory of a persistent `Utilities.cache.AnalysisCache`. Columns whose
+        name, dtype and quantile fingerprint match a previous run reuse its result.
+    cache_tolerance : float, default=0.05
+        Largest fingerprint drift, relative to the column's spread, that still counts as a match.
+    cache_max_entries : int, default=1000
+        Number of column results kept before the least recently used ones are evicted.
+    """
+    ENGINES = ('fast', 'exact')
+
+    def __init__(self, metadata: dict = {}, n_jobs: int = 1, fit_jobs: Optional[int] = None, engine: str = 'fast',
+                 cache_dir: Optional[str] = None, cache_tolerance: float = 0.05, cache_max_entries: int = 1000):
+        if engine not in self.ENGINES:
+            raise ValueError(f"Unknown engine '{engine}', expected one of {self.ENGINES}")
         self.metadata = metadata if metadata is not None else {}
+        self.engine = engine
+        self.cache = None
+        if cache_dir:
+            from Utilities.cache import AnalysisCache
+            self.cache = AnalysisCache(os.path.join(cache_dir, 'analysis_cache.json'),
+                                       max_entries=cache_max_entries, tolerance=cache_tolerance)
+        self.n_jobs = (os.cpu_count() or 1) if n_jobs == -1 else max(1, n_jobs)
+        self.fit_jobs = fit_jobs if fit_jobs is not None else (-1 if self.n_jobs == 1 else 1)
+
+    def _fit_sample(self, feature: pd.Series) -> np.ndarray:
+        """
+        Draws the deterministic sample used for fitting (at most 1500 rows, random_state=42).
+        """
+        non_null = feature.dropna()
+        return non_null.sample(min(1500, len(non_null)), random_state=42).to_numpy()
 
     def analyze_distribution(self, feature: pd.Series) -> dict:
         """
         Analyzes distribution of a numeric pandas Series and recommends preprocessing steps.
         """
-        try:
-            fit_sample = feature.dropna().sample(min(1500, len(feature.dropna())), random_state=42)
-            f = Fitter(fit_sample, distributions=get_common_distributions(), timeout=10)
-            f.fit()
-            best_fit = f.get_best(method='sumsquare_error')
-            best_dist_name = list(best_fit.keys())[0]
-            best_dist_params = best_fit[best_dist_name]
-            result = {
-                "Distribution": best_dist_name,
-                "Parameters": best_dist_params
-            }
-        except Exception as e:
-            logger.warning(f"Fitter failed for '{feature.name}': {str(e)}")
-            result = {"Distribution": "Fitter Failed", "Parameters": None}
+        result = _fit_distribution(feature.name, self._fit_sample(feature), self.fit_jobs)
         logger.info(f"Distribution analysis for {feature.name}: {result}")
         return result
 
+    def _fit_samples(self, samples: dict) -> dict:
+        """
+        Runs the configured engine on pre-drawn samples, {column: sample} -> {column: result}.
+        """
+        columns = list(samples)
+        if not columns:
+            return {}
+        if self.engine == 'fast':
+            from Utilities.distributions import fit_distributions
+            matrix = np.full((len(columns), max(len(sample) for sample in samples.values())), np.nan)
+            for row, col in enumerate(columns):
+                matrix[row, :len(samples[col])] = samples[col]
+            return dict(zip(columns, fit_distributions(matrix)))
+
+        if self.n_jobs == 1 or len(columns) < 2:
+            return {col: _fit_distribution(col, samples[col], self.fit_jobs) for col in columns}
+
+        workers = min(self.n_jobs, len(columns))
+        logger.info(f"Fitting {len(columns)} numeric columns with {workers} worker processes")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {col: executor.submit(_fit_distribution, col, samples[col], self.fit_jobs) for col in columns}
+            return {col: future.result() for col, future in futures.items()}
+
+    def analyze_distributions(self, df: pd.DataFrame, columns: list) -> dict:
+        """
+        Analyzes the distribution of several numeric columns, in parallel when n_jobs > 1.
+        Samples are drawn in the calling process, so results do not depend on n_jobs.
+        With a cache, only columns that are new or have drifted are fitted.
+        """
+        samples = {col: self._fit_sample(df[col]) for col in columns}
+        return self._analyze_samples(samples, {col: df[col].dtype for col in columns})
+
+    def _analyze_samples(self, samples: dict, dtypes: dict) -> dict:
+        """
+        Fits pre-drawn samples, {column: sample} -> {column: result}, through the cache if there is one.
+        """
+        columns = list(samples)
+        results, keys, fingerprints = {}, {}, {}
+        if self.cache is not None:
+            for col in columns:
+                keys[col] = f"{self.engine}|{col}|{dtypes[col]}"
+                fingerprints[col] = self.cache.fingerprint(samples[col])
+                cached = self.cache.get(keys[col], fingerprints[col])
+                if cached is not None:
+                    logger.info(f"Reusing cached distribution analysis for {col}")
+                    results[col] = cached
+
+        fitted = self._fit_samples({col: samples[col] for col in columns if col not in results})
+        for col, result in fitted.items():
+            logger.info(f"Distribution analysis for {col}: {result}")
+            if self.cache is not None:
+                self.cache.put(keys[col], fingerprints[col], result)
+        if self.cache is not None:
+            self.cache.save()
+        return {col: results.get(col, fitted.get(col)) for col in columns}
+
+    @staticmethod
+    def _column_kind(dtype) -> Optional[str]:
+        """
+        The metadata dtype of a column: numeric, datetime, categorical or boolean columns, None if unknown.
+        """
+        if pd.api.types.is_numeric_dtype(dtype):
+            return 'numeric_columns'
+        if pd.api.types.is_datetime64_any_dtype(dtype):
+            return 'datetime_columns'
+        if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_categorical_dtype(dtype):          #type: ignore
+            return 'categorical_columns'
+        if pd.api.types.is_bool_dtype(dtype):
+            return 'boolean_columns'
+        return None
+
+    @staticmethod
+    def _column_entry(kind: Optional[str], distribution: Optional[dict] = None, unique_values=None, top_value=None) -> dict:
+        """
+        The metadata of one column with the strategies that go with its distribution.
+        """
+        if kind is None:
+            return {}
+        entry = {'dtype': kind}
+        if kind == 'numeric_columns':
+            method = distribution['Distribution']                   #type: ignore
+            entry['column_distribution'] = method
+            entry['outlier_detection'] = strategies.get(method, {}).get('outlier_detection', 'IQR')
+            entry['normalization'] = strategies.get(method, {}).get('normalization', 'MinMaxScaler')
+            entry['imputation'] = strategies.get(method, {}).get('imputation', 'Mean')
+        elif kind == 'categorical_columns':
+            entry['unique_values'] = unique_values
+            entry['top_value'] = top_value
+        return entry
+
     def column_details(self, df: pd.DataFrame) -> dict:
         self.metadata['columns'] = {}
+        numeric_columns = [col for col in df.columns if pd.api.types.is_numeric_dtype(df[col].dtype)]
+        distributions = self.analyze_distributions(df, numeric_columns)
         for col in df.columns:
-            self.metadata['columns'][col] = {}
             dtype = df[col].dtype
             logger.info(f"Analyzing column: {col} with dtype: {dtype}")
-            if pd.api.types.is_numeric_dtype(dtype):
-                result = self.analyze_distribution(df[col])
-                method = result['Distribution']
-                self.metadata['columns'][col]['dtype'] = 'numeric_columns'
-                self.metadata['columns'][col]['column_distribution'] = method
-                self.metadata['columns'][col]['outlier_detection'] = strategies[method].get('outlier_detection', 'IQR')
-                self.metadata['columns'][col]['normalization'] = strategies[method].get('normalization', 'MinMaxScaler')
-                self.metadata['columns'][col]['imputation'] = strategies[method].get('imputation', 'Mean')
-
-            elif pd.api.types.is_datetime64_any_dtype(dtype):
-                self.metadata['columns'][col]['dtype'] = 'datetime_columns'
-            elif pd.api.types.is_object_dtype(dtype) or pd.api.types.is_categorical_dtype(dtype):          #type: ignore
-                self.metadata['columns'][col]['dtype'] = 'categorical_columns'
-                self.metadata['columns'][col]['unique_values'] = df[col].nunique()
-                self.metadata['columns'][col]['top_value'] = df[col].mode()[0] if not df[col].mode().empty else None
-            elif pd.api.types.is_bool_dtype(dtype):
-                self.metadata['columns'][col]['dtype'] = 'boolean_columns'
+            kind = self._column_kind(dtype)
+            if kind == 'categorical_columns':
+                mode = df[col].mode()
+                entry = self._column_entry(kind, unique_values=df[col].nunique(), top_value=mode[0] if not mode.empty else None)
             else:
+                entry = self._column_entry(kind, distributions.get(col))
+            if kind is None:
                 logger.info(f"{col} unknown datatype, removing from the dataframe...")
+            self.metadata['columns'][col] = entry
         return self.metadata
 
     def analyze(self, df: pd.DataFrame) -> dict:
@@ -81,3 +210,110 @@ class Analyzer:
             raise
 
 
+
+
+class StreamingAnalyzer(Analyzer):
+    """
+    One-pass Analyzer for data that does not fit in memory.
+
+    Every chunk updates mergeable sketches per column (see `Utilities.sketches`):
+    a reservoir sample for distribution fitting, a KLL sketch for quantiles,
+    HyperLogLog for distinct counts, Misra-Gries for the most frequent values,
+    and running moments and null counts. `finalize` then writes the same
+    `metadata['columns']` as `Analyzer.analyze` would for the whole data, with
+    approximate `unique_values` and `top_value` on high-cardinality columns.
+    Memory is bounded by the sketch sizes, not the number of rows. Analyzers
+    fed with different shards can be combined with `merge`.
+
+    Parameters:
+    -----------
+    sample_size : int, default=1500
+        Reservoir size per numeric column, the sample distributions are fitted on.
+    quantile_k : int, default=200
+        Accuracy of the quantile sketches, rank error about 1.7 / quantile_k.
+    precision : int, default=12
+        HyperLogLog precision, relative error about 1.04 / sqrt(2 ** precision).
+    top_k : int, default=64
+        Counters kept for frequent values.
+    seed : int, default=42
+        Seed of the sampling and compaction, for reproducible results.
+    Other keyword arguments are passed to `Analyzer`.
+    """
+
+    def __init__(self, metadata: dict = {}, sample_size: int = 1500, quantile_k: int = 200, precision: int = 12,
+                 top_k: int = 64, seed: Optional[int] = 42, **kwargs):
+        super().__init__(metadata, **kwargs)
+        self.sample_size = sample_size
+        self.quantile_k = quantile_k
+        self.precision = precision
+        self.top_k = top_k
+        self.seed = seed
+        self.profiles = {}
+        self.chunks = 0
+
+    def update(self, chunk: pd.DataFrame) -> 'StreamingAnalyzer':
+        """
+        Adds one chunk of rows to the column sketches.
+        """
+        from Utilities.sketches import ColumnProfile
+        for col in chunk.columns:
+            if col not in self.profiles:
+                self.profiles[col] = ColumnProfile(self.sample_size, self.quantile_k, self.precision, self.top_k, seed=self.seed)
+            self.profiles[col].update(chunk[col])
+        self.chunks += 1
+        return self
+
+    def merge(self, other: 'StreamingAnalyzer') -> 'StreamingAnalyzer':
+        """
+        Adds the sketches of an analyzer that saw other rows of the same data.
+        """
+        for col, profile in other.profiles.items():
+            if col in self.profiles:
+                self.profiles[col].merge(profile)
+            else:
+                self.profiles[col] = profile
+        self.chunks += other.chunks
+        return self
+
+    def summary(self) -> dict:
+        """
+        Per-column statistics of the stream: rows, nulls, distinct and top values, and
+        mean, std and quartiles of numeric columns.
+        """
+        return {col: profile.summary() for col, profile in self.profiles.items()}
+
+    def finalize(self) -> dict:
+        """
+        Writes `metadata['columns']` from the sketches.
+        """
+        dtypes = {col: profile.dtype for col, profile in self.profiles.items()}
+        numeric_columns = [col for col, dtype in dtypes.items() if pd.api.types.is_numeric_dtype(dtype)]
+        distributions = self._analyze_samples({col: self.profiles[col].sample.values for col in numeric_columns},
+                                              {col: dtypes[col] for col in numeric_columns})
+        self.metadata['columns'] = {}
+        for col, profile in self.profiles.items():
+            logger.info(f"Analyzing streamed column: {col} with dtype: {dtypes[col]}")
+            kind = self._column_kind(dtypes[col])
+            top = profile.frequent.top(1)
+            self.metadata['columns'][col] = self._column_entry(kind, distributions.get(col), profile.distinct.estimate(),
+                                                               top[0][0] if top else None)
+            if kind is None:
+                logger.info(f"{col} unknown datatype, removing from the dataframe...")
+        logger.info(f"Streaming analysis of {self.chunks} chunks and {len(self.profiles)} columns completed")
+        return self.metadata
+
+    def analyze_chunks(self, chunks) -> dict:
+        """
+        Consumes an iterable of DataFrames, e.g. `Loader.transform_chunks()`, and returns the metadata.
+        """
+        try:
+            for chunk in chunks:
+                self.update(chunk)
+            return self.finalize()
+        except Exception as e:
+            logger.exception(f'Error occurred during streaming analysis: {e}')
+            raise
+
+    def analyze(self, df: pd.DataFrame) -> dict:
+        self.profiles, self.chunks = {}, 0
+        return self.analyze_chunks([df])
@@ -1,9 +1,11 @@
 import os
+import numpy as np
 import pandas as pd
 from typing import Optional
 
 import logging
 from Utilities.logger import setup_logger
+from Utilities.hash_set import SpillingHashSet
 
 logger = setup_logger(log_file='pipeline.log', __name__=__name__)
 
@@ -19,10 +21,17 @@ class Cleaner:
         target_column: str = '',
         column_threshold: float = 0.7,
         row_threshold: float = 0.7,
-        drop_null: bool = False
+        drop_null: bool = False,
+        dedup_budget: int = 64 * 2 ** 20,
+        spill_dir: Optional[str] = None
     ):
         """
         Initialize the Cleaner with optional metadata.
+
+        Duplicates are found by 64-bit row hashes kept in a set that moves to
+        `spill_dir` once it holds more than `dedup_budget` bytes. Between
+        `begin_stream` and `end_stream` the set is kept across calls, so
+        duplicates are removed across the chunks of a file.
         """
         cleaning_stats = {
             'columns_dropped': set(),
@@ -39,60 +48,133 @@ class Cleaner:
         self.column_threshold = column_threshold
         self.row_threshold = row_threshold
         self.drop_null = drop_null
+        self.columns_to_drop = None
+        self.dedup_budget = dedup_budget
+        self.spill_dir = spill_dir
+        self._seen = None
 
-    def _drop_columns_with_many_nulls(self, df: pd.DataFrame, threshold: float = 0.7) -> pd.DataFrame:
-        if not isinstance(df, pd.DataFrame):
-            raise TypeError("Input must be a pandas DataFrame")
-        if not (0 <= threshold <= 1):
-            raise ValueError("Threshold must be between 0 and 1")
-        null_ratios = df.isnull().mean()
-        columns_to_drop = null_ratios[null_ratios > threshold].index.tolist()
-        if columns_to_drop:
-            logger.info(f"Dropping {len(columns_to_drop)} columns with null ratio > {threshold}: {columns_to_drop}")
-            self.metadata['cleaning_stats']['columns_dropped'].update(columns_to_drop)
-            df = df.drop(columns=columns_to_drop)
-            for col in columns_to_drop:
-                self.metadata['columns'].pop(col)
-        return df
+    @staticmethod
+    def _column_hash(series: pd.Series) -> np.ndarray:
+        """
+        64-bit hash of every value of a column. Numbers are hashed as float64 so
+        the same value hashes alike in chunks read with different dtypes.
+        """
+        if pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+            # One NaN and one zero, as drop_duplicates compares them
+            values = np.where(np.isnan(values), np.nan, values + 0.0)
+            return pd.util.hash_array(values)
+        return pd.util.hash_pandas_object(series, index=False).to_numpy()
+
+    @classmethod
+    def _row_hashes(cls, df: pd.DataFrame, columns: list, rows: np.ndarray) -> np.ndarray:
+        """
+        64-bit hash of every selected row over `columns`, built column by column
+        so no row-wise copy of the frame is needed.
+        """
+        hashes = np.zeros(int(rows.sum()), dtype=np.uint64)
+        for col in columns:
+            hashes = (hashes * np.uint64(0x100000001B3)) ^ cls._column_hash(df[col])[rows]
+        return hashes
+
+    def begin_stream(self):
+        """
+        Starts a stream of chunks: duplicates are removed across all chunks until `end_stream`.
+        """
+        self.end_stream()
+        self._seen = SpillingHashSet(self.dedup_budget, self.spill_dir)
+
+    def end_stream(self):
+        """
+        Forgets the rows seen in the stream and deletes spilled hashes.
+        """
+        if self._seen is not None:
+            logger.info(f"Stream deduplication tracked {len(self._seen)} distinct rows, {self._seen.spilled} spilled to disk")
+            self._seen.close()
+        self._seen = None
+
+    @staticmethod
+    def _null_bitmap(df: pd.DataFrame, columns: list) -> np.ndarray:
+        """
+        Boolean (rows, columns) matrix, True where a value of `columns` is null.
+        """
+        if not columns:
+            return np.zeros((len(df), 0), dtype=bool)
+        return np.column_stack([df[col].isna().to_numpy() for col in columns])
 
-    def _drop_rows_with_many_nulls(self, df: pd.DataFrame, threshold: float = 0.7) -> pd.DataFrame:
+    def select(self, df: pd.DataFrame, rows: Optional[np.ndarray] = None, columns: Optional[list] = None,
+               nulls: Optional[np.ndarray] = None) -> tuple:
+        """
+        Copy-free `transform`, also used directly by the pipeline's lazy mode.
+
+        Applies the cleaning rules in order (null columns, null rows, null
+        target, `drop_null`, duplicates) to the selected `rows` (boolean mask)
+        and `columns` of `df`, and returns the new selection instead of a
+        filtered frame. Null ratios of columns and rows come from one null
+        bitmap, passed as `nulls` when the caller already built it, and
+        duplicates from 64-bit row hashes.
+
+        Returns:
+            tuple: (columns, rows) still selected after cleaning.
+        """
         if not isinstance(df, pd.DataFrame):
             raise TypeError("Input must be a pandas DataFrame")
-        if not (0 <= threshold <= 1):
+        if not (0 <= self.column_threshold <= 1 and 0 <= self.row_threshold <= 1):
             raise ValueError("Threshold must be between 0 and 1")
-        rows_before = len(df)
-        row_null_counts = df.isnull().sum(axis=1) / len(df.columns)
-        df = df[row_null_counts <= threshold]
-        rows_dropped = rows_before - len(df)
-        if rows_dropped > 0:
-            logger.info(f"Dropped {rows_dropped} rows with null ratio > {threshold}")
-            self.metadata['cleaning_stats']['rows_dropped'] += rows_dropped
-        return df
+        # The summary of a previous run leaves the dropped columns as a list
+        if not isinstance(self.metadata['cleaning_stats']['columns_dropped'], set):
+            self.metadata['cleaning_stats']['columns_dropped'] = set(self.metadata['cleaning_stats']['columns_dropped'])
+        stats = self.metadata['cleaning_stats']
+        columns = list(df.columns) if columns is None else list(columns)
+        rows = np.ones(len(df), dtype=bool) if rows is None else rows.copy()
+        logger.info(f"Starting data cleaning selection on {int(rows.sum())} rows and {len(columns)} columns")
+        if nulls is None:
+            nulls = self._null_bitmap(df, columns)
 
-    def _drop_rows_with_null_target(self, df: pd.DataFrame, target_column: str) -> pd.DataFrame:
-        if not isinstance(df, pd.DataFrame):
-            raise TypeError("Input must be a pandas DataFrame")
-        if target_column not in df.columns:
-            logger.warning(f"Target column '{target_column}' not found in DataFrame")
-            return df
-        rows_before = len(df)
-        df = df.dropna(subset=[target_column])
-        rows_dropped = rows_before - len(df)
-        if rows_dropped > 0:
-            logger.info(f"Dropped {rows_dropped} rows with null values in target column '{target_column}'")
-            self.metadata['cleaning_stats']['rows_dropped'] += rows_dropped
-        return df
+        if self.columns_to_drop is not None:
+            dropped = [col for col in columns if col in self.columns_to_drop]
+        else:
+            selected = int(rows.sum())
+            ratios = nulls[rows].sum(axis=0) / selected if selected else np.zeros(len(columns))
+            dropped = [col for col, ratio in zip(columns, ratios) if ratio > self.column_threshold]
+            if dropped:
+                logger.info(f"Dropping {len(dropped)} columns with null ratio > {self.column_threshold}: {dropped}")
+                stats['columns_dropped'].update(dropped)
+                for col in dropped:
+                    self.metadata.get('columns', {}).pop(col, None)
+            # Columns dropped from an earlier chunk of the same data stay dropped
+            dropped += [col for col in columns if col in stats['columns_dropped'] and col not in dropped]
+        keep = [i for i, col in enumerate(columns) if col not in dropped]
+        columns = [columns[i] for i in keep]
+        nulls = nulls[:, keep]
 
-    def _remove_duplicates(self, df: pd.DataFrame) -> pd.DataFrame:
-        if not isinstance(df, pd.DataFrame):
-            raise TypeError("Input must be a pandas DataFrame")
-        rows_before = len(df)
-        df = df.drop_duplicates()
-        duplicates_removed = rows_before - len(df)
-        if duplicates_removed > 0:
-            logger.info(f"Removed {duplicates_removed} duplicate rows")
-            self.metadata['cleaning_stats']['duplicates_removed'] += duplicates_removed
-        return df
+        before = int(rows.sum())
+        if columns:
+            rows &= nulls.sum(axis=1) / len(columns) <= self.row_threshold
+        if self.target_column is not None:
+            if self.target_column in columns:
+                rows &= ~nulls[:, columns.index(self.target_column)]
+            else:
+                logger.warning(f"Target column '{self.target_column}' not found in DataFrame")
+        rows_dropped = before - int(rows.sum())
+        if rows_dropped:
+            logger.info(f"Dropped {rows_dropped} rows with too many nulls or a null target")
+            stats['rows_dropped'] += rows_dropped
+        if self.drop_null:
+            rows &= ~nulls.any(axis=1)
+            logger.info("Dropped all remaining rows with any null values.")
+
+        positions = np.flatnonzero(rows)
+        seen = self._seen if self._seen is not None else SpillingHashSet(self.dedup_budget, self.spill_dir)
+        duplicated = seen.add(self._row_hashes(df, columns, rows))
+        if self._seen is None:
+            seen.close()
+        if duplicated.any():
+            rows[positions[duplicated]] = False
+            logger.info(f"Removed {int(duplicated.sum())} duplicate rows")
+            stats['duplicates_removed'] += int(duplicated.sum())
+        logger.info(f"Data cleaning selection completed: {int(rows.sum())} rows and {len(columns)} columns")
+        return columns, rows
 
     def get_cleaning_summary(self) -> dict:
         """
@@ -103,21 +185,83 @@ class Cleaner:
             stats['columns_dropped'] = list(stats['columns_dropped'])
         return stats if stats else 'No cleaning operations performed yet.'  # type: ignore
 
-    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+    @staticmethod
+    def merge_stats(stats: list) -> dict:
+        """
+        Combines the cleaning stats of several runs, e.g. the shards of one dataset,
+        into one report. Dropped columns are united and row counts summed.
+        """
+        merged = {'columns_dropped': [], 'rows_dropped': 0, 'duplicates_removed': 0}
+        for entry in stats:
+            merged['columns_dropped'] += [col for col in entry.get('columns_dropped', []) if col not in merged['columns_dropped']]
+            merged['rows_dropped'] += entry.get('rows_dropped', 0)
+            merged['duplicates_removed'] += entry.get('duplicates_removed', 0)
+        return merged
+
+    def fit(self, df: pd.DataFrame) -> 'Cleaner':
+        """
+        Learns which columns to drop. Row rules are applied per row and need no fitting.
+        """
+        if not isinstance(df, pd.DataFrame):
+            raise TypeError("Input must be a pandas DataFrame")
+        return self._fit_nulls(list(df.columns), self._null_bitmap(df, list(df.columns)))
+
+    def _fit_nulls(self, columns: list, nulls: np.ndarray) -> 'Cleaner':
+        """
+        `fit` from the null bitmap of `columns`.
+        """
+        ratios = nulls.sum(axis=0) / len(nulls) if len(nulls) else np.zeros(len(columns))
+        self.columns_to_drop = [col for col, ratio in zip(columns, ratios) if ratio > self.column_threshold]
+        if self.columns_to_drop:
+            logger.info(f"Fitted Cleaner drops {len(self.columns_to_drop)} columns with null ratio > {self.column_threshold}: {self.columns_to_drop}")
+            self.metadata['cleaning_stats']['columns_dropped'] = set(self.metadata['cleaning_stats']['columns_dropped']) | set(self.columns_to_drop)
+            for col in self.columns_to_drop:
+                self.metadata.get('columns', {}).pop(col, None)
+        return self
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        `fit` and `transform` from one null bitmap of the frame.
+        """
+        if not isinstance(df, pd.DataFrame):
+            raise TypeError("Input must be a pandas DataFrame")
+        columns = list(df.columns)
+        nulls = self._null_bitmap(df, columns)
+        return self._fit_nulls(columns, nulls).transform(df, nulls)
+
+    def get_state(self) -> dict:
+        """
+        Returns the configuration and the learned columns to drop.
+        """
+        return {
+            'column_threshold': self.column_threshold,
+            'row_threshold': self.row_threshold,
+            'drop_null': self.drop_null,
+            'target_column': self.target_column,
+            'columns_to_drop': list(self.columns_to_drop) if self.columns_to_drop is not None else None,
+            'dedup_budget': self.dedup_budget,
+            'spill_dir': self.spill_dir
+        }
+
+    @classmethod
+    def from_state(cls, state: dict, metadata: Optional[dict] = None) -> 'Cleaner':
+        cleaner = cls(metadata, column_threshold=state['column_threshold'],
+                      row_threshold=state['row_threshold'], drop_null=state['drop_null'],
+                      dedup_budget=state.get('dedup_budget', 64 * 2 ** 20), spill_dir=state.get('spill_dir'))
+        cleaner.target_column = state['target_column']
+        cleaner.columns_to_drop = state['columns_to_drop']
+        return cleaner
+
+    def transform(self, df: pd.DataFrame, nulls: Optional[np.ndarray] = None) -> pd.DataFrame:
         """
         Apply the complete data cleaning pipeline to the DataFrame.
+        `nulls` is the null bitmap of all its columns if already built.
         """
         if not isinstance(df, pd.DataFrame):
             raise TypeError("Input must be a pandas DataFrame")
         logger.info(f"Starting data cleaning process on DataFrame with shape: {df.shape}")
-        df = self._drop_columns_with_many_nulls(df, threshold=self.column_threshold)
-        df = self._drop_rows_with_many_nulls(df, threshold=self.row_threshold)
-        if self.target_column is not None:
-            df = self._drop_rows_with_null_target(df, self.target_column)
-        if self.drop_null:
-            df = df.dropna()
-            logger.info("Dropped all remaining rows with any null values.")
-        df = self._remove_duplicates(df)
+        columns, rows = self.select(df, nulls=nulls)
+        df = df.loc[rows, columns]
         logger.info(f"Data cleaning completed. Final DataFrame shape: {df.shape}")
         logger.info(f"Cleaning summary: {self.get_cleaning_summary()}")
         return df
@@ -0,0 +1,167 @@
+import numpy as np
+import pandas as pd
+from typing import Optional
+from Utilities.logger import setup_logger
+
+logger = setup_logger(log_file='pipeline.log', __name__=__name__)
+
+# Largest integer every float32 represents exactly
+FLOAT32_EXACT_INT = 2 ** 24
+INTEGER_TYPES = (np.int8, np.uint8, np.int16, np.uint16, np.int32, np.uint32, np.int64)
+
+
+class Compactor:
+    """
+    Shrinks a DataFrame's memory footprint by giving every column the smallest safe dtype.
+
+    - Integer columns get the smallest integer type that holds their range.
+    - Float columns become float32 when that loses nothing: whole numbers below
+      2**24 (counts, percentages, indices) or values that survive the round trip.
+    - Low-cardinality string columns become categoricals with the categories
+      seen by `fit`, so every batch gets the same categorical dtype.
+
+    Target dtypes are learned by `fit`. `transform` checks them again on every
+    batch and keeps the wider dtype for any column whose new values would not
+    fit, such as out-of-range integers or unseen categories, so it never
+    changes a value. The memory used before and after is
+    recorded under `metadata['memory']`.
+
+    Parameters:
+    -----------
+    metadata : dict
+        Shared pipeline metadata. Column types and unique counts from the Analyzer
+        are used when available.
+    category_ratio : float, default=0.5
+        String columns with at most this fraction of distinct values become categoricals.
+    lossy_floats : bool, default=False
+        Convert every float column to float32, accepting rounding to about 7 significant digits.
+    """
+
+    def __init__(self, metadata: Optional[dict] = None, category_ratio: float = 0.5, lossy_floats: bool = False):
+        self.metadata = metadata if metadata is not None else {}
+        self.category_ratio = category_ratio
+        self.lossy_floats = lossy_floats
+        self.dtypes = None
+
+    @staticmethod
+    def _integer_dtype(values: np.ndarray):
+        low, high = values.min(), values.max()
+        for dtype in INTEGER_TYPES:
+            info = np.iinfo(dtype)
+            if info.min <= low and high <= info.max:
+                return np.dtype(dtype)
+        return values.dtype
+
+    def _float_fits(self, values: np.ndarray) -> bool:
+        """
+        True if the non-null values can be stored as float32 under the current policy.
+        """
+        finite = values[np.isfinite(values)]
+        if finite.size and np.abs(finite).max() > np.finfo(np.float32).max:
+            return False
+        if self.lossy_floats:
+            return True
+        if np.all(finite == np.round(finite)) and (finite.size == 0 or np.abs(finite).max() <= FLOAT32_EXACT_INT):
+            return True
+        return bool(np.array_equal(finite.astype(np.float32).astype(np.float64), finite))
+
+    def _is_categorical(self, series: pd.Series) -> bool:
+        if len(series) == 0:
+            return False
+        details = self.metadata.get('columns', {}).get(series.name, {})
+        if details and details.get('dtype') not in (None, 'categorical_columns'):
+            return False
+        unique = details.get('unique_values')
+        if unique is None:
+            unique = series.nunique()
+        return unique <= self.category_ratio * len(series)
+
+    def _target_dtype(self, series: pd.Series):
+        dtype = series.dtype
+        if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype):
+            return None
+        if pd.api.types.is_integer_dtype(dtype) and not pd.api.types.is_extension_array_dtype(dtype):
+            if len(series) == 0:
+                return None
+            target = self._integer_dtype(series.to_numpy())
+            return target if target != dtype else None
+        if pd.api.types.is_float_dtype(dtype) and not pd.api.types.is_extension_array_dtype(dtype):
+            if dtype.itemsize > 4 and self._float_fits(series.to_numpy()):
+                return np.dtype(np.float32)
+            return None
+        if (pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype)) and self._is_categorical(series):
+            return pd.CategoricalDtype(pd.Categorical(series.dropna()).categories)
+        return None
+
+    def fit(self, df: pd.DataFrame) -> 'Compactor':
+        """
+        Learns the compact dtype of every column that can be shrunk.
+        """
+        self.dtypes = {}
+        for col in df.columns:
+            target = self._target_dtype(df[col])
+            if target is not None:
+                self.dtypes[col] = target if isinstance(target, pd.CategoricalDtype) else str(target)
+        logger.info(f"Compactor fitted, compact dtypes: { {col: str(dtype) for col, dtype in self.dtypes.items()} }")
+        return self
+
+    def _safe(self, series: pd.Series, target) -> bool:
+        """
+        Range check of a batch against a learned dtype.
+        """
+        if isinstance(target, pd.CategoricalDtype):
+            if not (pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)
+                    or isinstance(series.dtype, pd.CategoricalDtype)):
+                return False
+            return bool(series.dropna().isin(target.categories).all())
+        if target == 'category':
+            return pd.api.types.is_object_dtype(series.dtype) or pd.api.types.is_string_dtype(series.dtype)
+        dtype = np.dtype(target)
+        values = series.to_numpy()
+        if dtype.kind in 'iu':
+            if not pd.api.types.is_integer_dtype(series.dtype) or pd.api.types.is_extension_array_dtype(series.dtype):
+                return False
+            info = np.iinfo(dtype)
+            return len(values) == 0 or (info.min <= values.min() and values.max() <= info.max)
+        return pd.api.types.is_float_dtype(series.dtype) and self._float_fits(values)
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Casts the columns to their compact dtypes, learning them from `df` if not fitted.
+        """
+        fitted = self.dtypes is not None
+        if not fitted:
+            self.fit(df)
+        before = int(df.memory_usage(deep=True).sum())
+        changed = {}
+        for col, target in self.dtypes.items():                  #type: ignore
+            if col not in df.columns or df[col].dtype == target:
+                continue
+            if not self._safe(df[col], target):
+                logger.warning(f"Values of '{col}' do not fit {target}, keeping {df[col].dtype} for this batch.")
+                continue
+            changed[col] = [str(df[col].dtype), str(target)]
+            df[col] = df[col].astype(target)
+        after = int(df.memory_usage(deep=True).sum())
+        if not fitted:
+            self.dtypes = None
+        self.metadata['memory'] = {
+            'before_bytes': before,
+            'after_bytes': after,
+            'reduction': before / after if after else None,
+            'dtypes': changed
+        }
+        logger.info(f"Compacted DataFrame from {before} to {after} bytes ({len(changed)} columns recast)")
+        return df
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        return self.fit(df).transform(df)
+
+    def get_state(self) -> dict:
+        return {'category_ratio': self.category_ratio, 'lossy_floats': self.lossy_floats, 'dtypes': self.dtypes}
+
+    @classmethod
+    def from_state(cls, state: dict, metadata: Optional[dict] = None) -> 'Compactor':
+        compactor = cls(metadata=metadata, category_ratio=state['category_ratio'], lossy_floats=state['lossy_floats'])
+        compactor.dtypes = state['dtypes']
+        return compactor
@@ -0,0 +1,457 @@
+import numpy as np
+import pandas as pd
+from functools import lru_cache
+from typing import Optional
+from Utilities.logger import setup_logger
+from normalize import apply_method, encoder_codes, encoder_lookup
+
+logger = setup_logger(log_file='pipeline.log', __name__=__name__)
+
+
+class CompiledPipeline:
+    """
+    Low-latency transform path for single records and micro-batches.
+
+    A fitted `Lazy_Prep` is compiled once into a flat list of operations over
+    per-column NumPy arrays: columns to drop, null-ratio and duplicate row
+    rules, outlier bounds, fill values, regression coefficients, K-Means
+    centers, normalization parameters and category maps. Running it skips DataFrame
+    construction, dtype selection and per-component logging, while producing
+    the same values as `Lazy_Prep.transform` on the same rows.
+
+    Duplicate rows are only detected within one batch, and a single record is
+    never a duplicate.
+
+    Multivariate imputation models (KNNImputer, IterativeImputer) are applied
+    through their fitted sklearn objects, so batches that need them are slower.
+
+    Parameters:
+    -----------
+    prep : Lazy_Prep
+        A fitted pipeline.
+    columns : list, optional
+        Columns of the incoming records. Defaults to the columns the pipeline
+        was fitted on; pass the scoring schema when records have no target.
+        Missing keys in a record are treated as missing values and extra keys
+        are ignored.
+    memo_size : int, default=100000
+        Size of the LRU caches of processed text values and hashed categories,
+        so a long-running process does not grow with every distinct value.
+
+    Example:
+    --------
+    >>> compiled = prep.compile()
+    >>> compiled.transform_record({'Temperature': 14.0, 'Season': 'Winter', ...})
+    """
+
+    def __init__(self, prep, columns: Optional[list] = None, memo_size: int = 100_000):
+        if not prep.fitted:
+            raise ValueError("Only a fitted pipeline can be compiled. Call fit() first.")
+        self.input_columns = list(columns if columns is not None else prep.input_columns)
+        column_details = prep.metadata.get('columns', {})
+        self.numeric = {col for col in self.input_columns
+                        if column_details.get(col, {}).get('dtype') == 'numeric_columns'}
+        self.columns = list(self.input_columns)
+        self.memo_size = memo_size
+        self.ops = []
+        components = ([prep.compactor] if getattr(prep, 'compactor', None) is not None else []) + prep.pipeline
+        for component in components:
+            name = component.__class__.__name__
+            compiler = getattr(self, f"_compile_{name.lower()}", None)
+            if compiler is None:
+                raise ValueError(f"Component {name} cannot be compiled.")
+            compiler(component)
+        self.output_columns = list(self.columns)
+        logger.info(f"Compiled pipeline with {len(self.ops)} operations for columns {self.input_columns}")
+
+    # ----------------------------------------------------------------- helpers
+    @staticmethod
+    def _isnull(values: np.ndarray) -> np.ndarray:
+        if values.dtype.kind == 'f':
+            return np.isnan(values)
+        return pd.isna(values)
+
+    @staticmethod
+    def _is_missing(value) -> bool:
+        return value is None or value != value
+
+    @staticmethod
+    def _select(batch: dict, keep: np.ndarray) -> tuple:
+        return {col: values[keep] for col, values in batch.items()}, int(keep.sum())
+
+    @staticmethod
+    def _text(process, value):
+        # Cached token lists are shared between calls, every caller gets its own copy
+        result = process(value)
+        return list(result) if isinstance(result, list) else result
+
+    def _require(self, columns: list, label: str):
+        missing = [col for col in columns if col not in self.columns]
+        if missing:
+            raise ValueError(f"{label} needs columns {missing} that are not part of the compiled schema.")
+
+    # --------------------------------------------------------------- compilers
+    # Every component is lowered to plain tuples ('op', *arguments), interpreted
+    # by `_run_batch` for arrays and by `_run_row` for single records.
+    def _compile_compactor(self, compactor):
+        # Integer and categorical casts keep every value, only float32 changes later arithmetic
+        if compactor.dtypes is None:
+            raise ValueError("Compactor component is not fitted.")
+        for col, dtype in compactor.dtypes.items():
+            if col in self.numeric and dtype == 'float32':
+                self.ops.append(('float32', col, compactor.lossy_floats))
+
+    def _compile_cleaner(self, cleaner):
+        if cleaner.columns_to_drop:
+            dropped = [col for col in cleaner.columns_to_drop if col in self.columns]
+            self.columns = [col for col in self.columns if col not in dropped]
+            self.ops.append(('drop_columns', dropped))
+        columns = list(self.columns)
+        if not columns:
+            return
+        self.ops.append(('row_nulls', columns, cleaner.row_threshold))
+        target = cleaner.target_column
+        if target is not None and target in self.columns:
+            self.ops.append(('drop_null', [target]))
+        if cleaner.drop_null:
+            self.ops.append(('drop_null', columns))
+        self.ops.append(('dedup', columns))
+
+    def _compile_textprocessor(self, processor):
+        for col in [col for col in self.columns if col not in self.numeric]:
+            text_data = col in processor.text_data_columns
+            process = lru_cache(maxsize=self.memo_size)(lambda value, text_data=text_data: processor.preprocess(value, text_data))
+            self.ops.append(('text', col, process))
+
+    def _compile_outlier(self, outlier):
+        if outlier.bounds is None:
+            raise ValueError("Outlier component is not fitted.")
+        if outlier.mode == 'flag':
+            return
+        bounded = [(col, lower, upper, inclusive) for col, (_, lower, upper, inclusive) in outlier.bounds.items()
+                   if col in self.columns]
+        if bounded:
+            self.ops.append(('bounds', bounded))
+
+    def _compile_imputer(self, imputer):
+        if imputer.steps is None:
+            raise ValueError("Imputer component is not fitted.")
+        for step in imputer.steps:
+            cols = [col for col in step['cols'] if col in self.columns]
+            if not cols:
+                continue
+            kind = step['kind']
+            if kind == 'values':
+                for col in cols:
+                    self.ops.append(('fill', col, step['values'][col]))
+            elif kind == 'model':
+                self._require(step['features'], step['label'])
+                self.ops.append(('model', cols, step['features'], step['model']))
+            elif kind == 'regression':
+                for col in cols:
+                    if col in step['models']:
+                        model, predictors = step['models'][col]
+                        self._require(predictors, step['label'])
+                        means = np.array([step['predictor_means'][p] for p in predictors])
+                        self.ops.append(('regression', col, predictors, means, model.coef_, model.intercept_))
+                    else:
+                        self.ops.append(('fill', col, step['medians'].get(col)))
+            elif kind == 'kmeans':
+                self._require(step['features'], step['label'])
+                means = np.array([step['feature_means'][f] for f in step['features']])
+                centers = step['model'].cluster_centers_
+                lookup = {col: np.array([step['cluster_means'][col][k] for k in range(len(centers))]) for col in cols}
+                self.ops.append(('kmeans', cols, step['features'], means, centers, lookup))
+        for col, mode_value in (imputer.modes or {}).items():
+            if col in self.columns:
+                self.ops.append(('fill', col, mode_value))
+
+    def _compile_normalizer(self, normalizer):
+        if normalizer.groups is None:
+            raise ValueError("Normalizer component is not fitted.")
+        for group in normalizer.groups:
+            index = [i for i, col in enumerate(group['columns']) if col in self.columns]
+            if index:
+                params = {name: value[..., index] for name, value in group['params'].items()}
+                self.ops.append(('normalize', group['method'], [group['columns'][i] for i in index], params, normalizer.dtype))
+        for encoder in normalizer.encoders or []:
+            col = encoder['column']
+            if col not in self.columns:
+                continue
+            if encoder['encoder'] == 'hashing':
+                codes = lru_cache(maxsize=self.memo_size)(lambda value, encoder=encoder: int(encoder_codes('hashing', [value], encoder)[0]))
+            else:
+                codes = {category: code for code, category in enumerate(encoder.get('categories', []))}.get
+            lookup = encoder_lookup(encoder).astype(normalizer.dtype) if 'table' in encoder else None
+            self.ops.append(('encode', col, encoder, codes, lookup))
+            if encoder['names']:
+                self.columns = [c for c in self.columns if c != col] + encoder['names']
+        target = normalizer.metadata.get('target_column')
+        if normalizer.classes is not None and target in self.columns:
+            self.ops.append(('label', target, normalizer.classes, {label: code for code, label in enumerate(normalizer.classes)}))
+
+    # ---------------------------------------------------------- interpreters
+    def _run_batch(self, batch: dict, n: int) -> tuple:
+        """
+        Runs the program on a batch of `n` rows held as per-column arrays.
+
+        Returns:
+            tuple: (batch, rows) with the surviving rows and their number; the
+            batch is None once every row is dropped.
+        """
+        for op in self.ops:
+            code = op[0]
+            if n == 0:
+                return None, 0
+            if code == 'drop_columns':
+                for col in op[1]:
+                    batch.pop(col, None)
+            elif code == 'row_nulls':
+                _, columns, threshold = op
+                nulls = sum(self._isnull(batch[col]).astype(np.int64) for col in columns)
+                keep = nulls / len(columns) <= threshold
+                if not keep.all():
+                    batch, n = self._select(batch, keep)
+            elif code == 'drop_null':
+                keep = ~np.any([self._isnull(batch[col]) for col in op[1]], axis=0)
+                if not keep.all():
+                    batch, n = self._select(batch, keep)
+            elif code == 'dedup':
+                if n < 2:
+                    continue
+                seen, keep = set(), np.ones(n, dtype=bool)
+                rows = zip(*(np.where(self._isnull(batch[col]), None, batch[col]).tolist() for col in op[1]))
+                for i, row in enumerate(rows):
+                    if row in seen:
+                        keep[i] = False
+                    seen.add(row)
+                if not keep.all():
+                    batch, n = self._select(batch, keep)
+            elif code == 'text':
+                _, col, process = op
+                out = np.empty(n, dtype=object)
+                for i, value in enumerate(batch[col]):
+                    out[i] = self._text(process, value) if isinstance(value, str) else value
+                batch[col] = out
+            elif code == 'bounds':
+                keep = np.ones(n, dtype=bool)
+                with np.errstate(invalid='ignore'):
+                    for col, lower, upper, inclusive in op[1]:
+                        values = batch[col]
+                        if inclusive:
+                            keep &= ~((values <= lower) | (values >= upper))
+                        else:
+                            keep &= ~((values < lower) | (values > upper))
+                if not keep.all():
+                    batch, n = self._select(batch, keep)
+            elif code == 'float32':
+                _, col, lossy = op
+                values = batch[col].astype(np.float32)
+                if lossy or np.array_equal(values, batch[col], equal_nan=True):
+                    batch[col] = values
+            elif code == 'fill':
+                _, col, value = op
+                nulls = self._isnull(batch[col])
+                if nulls.any():
+                    values = batch[col].copy()
+                    values[nulls] = value
+                    batch[col] = values
+            elif code == 'normalize':
+                _, method, cols, params, dtype = op
+                X = np.asfortranarray(np.column_stack([batch[col] for col in cols]).astype(dtype))
+                X = apply_method(method, X, params)
+                for i, col in enumerate(cols):
+                    batch[col] = X[:, i]
+            elif code == 'encode':
+                _, col, encoder, _, lookup = op
+                codes = encoder_codes(encoder['encoder'], batch[col], encoder)
+                if lookup is None:
+                    batch.pop(col)
+                    for i, name in enumerate(encoder['names']):
+                        batch[name] = (codes == i).astype(np.uint8)
+                elif encoder['names']:
+                    batch.pop(col)
+                    for i, name in enumerate(encoder['names']):
+                        batch[name] = lookup[codes, i]
+                else:
+                    batch[col] = lookup[codes, 0]
+            elif code == 'label':
+                _, col, classes, _ = op
+                batch[col] = pd.Categorical(batch[col], categories=classes).codes.astype(np.int64)
+            elif code == 'model':
+                _, cols, features, model = op
+                if not any(np.isnan(batch[col]).any() for col in cols):
+                    continue
+                # sklearn models were fitted on DataFrames, keep the feature names
+                filled = model.transform(pd.DataFrame({f: batch[f] for f in features}, columns=features))
+                for col in cols:
+                    values = batch[col].copy()
+                    nulls = np.isnan(values)
+                    values[nulls] = filled[nulls, features.index(col)]
+                    batch[col] = values
+            elif code == 'regression':
+                _, col, predictors, means, coef, intercept = op
+                nulls = np.isnan(batch[col])
+                if nulls.any():
+                    X = np.column_stack([batch[p][nulls] for p in predictors])
+                    values = batch[col].copy()
+                    values[nulls] = np.where(np.isnan(X), means, X) @ coef + intercept
+                    batch[col] = values
+            elif code == 'kmeans':
+                _, cols, features, means, centers, lookup = op
+                if not any(np.isnan(batch[col]).any() for col in cols):
+                    continue
+                X = np.column_stack([batch[f] for f in features])
+                X = np.where(np.isnan(X), means, X)
+                clusters = np.argmin(((X[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2), axis=1)
+                for col in cols:
+                    values = batch[col].copy()
+                    nulls = np.isnan(values)
+                    values[nulls] = lookup[col][clusters[nulls]]
+                    batch[col] = values
+        return (batch, n) if n else (None, 0)
+
+    def _run_row(self, row: dict) -> Optional[dict]:
+        """
+        Runs the program on one record held as plain Python values. Returns None if the row is dropped.
+        """
+        missing = self._is_missing
+        for op in self.ops:
+            code = op[0]
+            if code == 'drop_columns':
+                for col in op[1]:
+                    row.pop(col, None)
+            elif code == 'row_nulls':
+                _, columns, threshold = op
+                if sum(missing(row[col]) for col in columns) / len(columns) > threshold:
+                    return None
+            elif code == 'drop_null':
+                if any(missing(row[col]) for col in op[1]):
+                    return None
+            elif code == 'text':
+                _, col, process = op
+                if isinstance(row[col], str):
+                    row[col] = self._text(process, row[col])
+            elif code == 'bounds':
+                for col, lower, upper, inclusive in op[1]:
+                    value = row[col]
+                    if inclusive:
+                        if value <= lower or value >= upper:
+                            return None
+                    elif value < lower or value > upper:
+                        return None
+            elif code == 'float32':
+                _, col, lossy = op
+                value = np.float32(row[col])
+                if lossy or value == row[col] or missing(value):
+                    row[col] = value
+            elif code == 'fill':
+                if missing(row[op[1]]):
+                    row[op[1]] = np.float32(op[2]) if isinstance(row[op[1]], np.float32) else op[2]
+            elif code == 'normalize':
+                _, method, cols, params, dtype = op
+                X = apply_method(method, np.array([[row[col] for col in cols]], dtype=dtype), params)
+                for i, col in enumerate(cols):
+                    row[col] = X[0, i]
+            elif code == 'encode':
+                _, col, encoder, codes, lookup = op
+                value = row[col]
+                if missing(value):
+                    index = -1
+                elif encoder['encoder'] == 'hashing':
+                    # `codes` is an LRU cache of the buckets of hashed values
+                    index = codes(value)
+                else:
+                    index = codes(value, -1)
+                if lookup is None:
+                    row.pop(col)
+                    for i, name in enumerate(encoder['names']):
+                        row[name] = int(i == index)
+                elif encoder['names']:
+                    row.pop(col)
+                    for i, name in enumerate(encoder['names']):
+                        row[name] = lookup[index, i]
+                else:
+                    row[col] = lookup[index, 0]
+            elif code == 'label':
+                row[op[1]] = op[3].get(row[op[1]], -1)
+            elif code in ('model', 'regression', 'kmeans'):
+                cols = [op[1]] if code == 'regression' else op[1]
+                if any(missing(row[col]) for col in cols):
+                    batch, _ = self._run_batch_op(op, row)
+                    row.update({col: type(row[col])(values[0]) for col, values in batch.items() if col in cols})
+        return row
+
+    def _run_batch_op(self, op: tuple, row: dict) -> tuple:
+        """
+        Runs one array operation on a single row, used for model-based steps.
+        """
+        batch = {col: np.array([np.nan if value is None else value], dtype=np.float64)
+                 for col, value in row.items() if col in self.numeric}
+        ops, self.ops = self.ops, [op]
+        try:
+            return self._run_batch(batch, 1)
+        finally:
+            self.ops = ops
+
+    # ----------------------------------------------------------------- running
+    def _to_batch(self, records: list) -> dict:
+        batch = {}
+        for col in self.input_columns:
+            values = [record.get(col) for record in records]
+            if col in self.numeric:
+                batch[col] = np.array([np.nan if value is None else value for value in values], dtype=np.float64)
+            else:
+                array = np.empty(len(values), dtype=object)
+                array[:] = values
+                batch[col] = array
+        return batch
+
+    def transform_array(self, X: np.ndarray) -> np.ndarray:
+        """
+        Transforms a 2-D array whose columns follow `input_columns`.
+
+        Returns:
+            np.ndarray: 2-D object array with the surviving rows, columns following `output_columns`.
+        """
+        X = np.asarray(X, dtype=object)
+        batch = {}
+        for i, col in enumerate(self.input_columns):
+            column = X[:, i]
+            if col in self.numeric:
+                batch[col] = np.array([np.nan if value is None else value for value in column], dtype=np.float64)
+            else:
+                batch[col] = column.copy()
+        batch, n = self._run_batch(batch, len(X))
+        if batch is None or not self.output_columns:
+            return np.empty((n, len(self.output_columns)), dtype=object)
+        return np.column_stack([batch[col].astype(object) for col in self.output_columns])
+
+    def transform_records(self, records: list) -> list:
+        """
+        Transforms a list of dict records; dropped rows are left out of the result.
+        """
+        if not records:
+            return []
+        batch, n = self._run_batch(self._to_batch(records), len(records))
+        if batch is None:
+            return []
+        if not self.output_columns:
+            return [{} for _ in range(n)]
+        columns = [batch[col].tolist() for col in self.output_columns]
+        return [dict(zip(self.output_columns, row)) for row in zip(*columns)]
+
+    def transform_record(self, record: dict) -> Optional[dict]:
+        """
+        Transforms a single dict record with the scalar interpreter. Returns None if the pipeline drops it.
+        """
+        row = {}
+        for col in self.input_columns:
+            value = record.get(col)
+            if col in self.numeric:
+                value = float('nan') if value is None else float(value)
+            row[col] = value
+        row = self._run_row(row)
+        if row is None:
+            return None
+        return {col: float(row[col]) if isinstance(row[col], np.float32) else row[col] for col in self.output_columns}
@@ -1,11 +1,7 @@
+import copy
 import pandas as pd
 import numpy as np
-from scipy.stats import mstats, trim_mean
-from sklearn.experimental import enable_iterative_imputer  # Enable IterativeImputer
-from sklearn.impute import IterativeImputer, KNNImputer
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.linear_model import BayesianRidge, LinearRegression
-from sklearn.cluster import KMeans
+from functools import partial
 from Utilities.logger import setup_logger
 from typing import Optional
 
@@ -27,18 +23,46 @@ class Imputer:
         Default categorical imputation method.
     method_maps : dict, optional
         Column-to-method override mapping.
+    quantile_k : int, default=200
+        Accuracy of the quantile sketches behind streamed medians and winsorized
+        means, rank error about 1.7 / quantile_k.
+    top_k : int, default=1024
+        Counters per categorical column for streamed modes; exact up to that many categories.
+    fallback : str, optional
+        Method used by `partial_fit` for columns whose method cannot be fitted
+        chunk by chunk (KNN, IterativeImputer, K-Means). Only 'mean' is
+        supported. By default such columns raise a ValueError instead of being
+        imputed differently than `fit` would.
 
     Methods
     -------
+    fit(df: pd.DataFrame) -> Imputer
+        Learns fill values and models without modifying the DataFrame.
     transform(df: pd.DataFrame) -> pd.DataFrame
-        Fills missing values in-place according to configured methods.
+        Fills missing values according to configured methods.
+    partial_fit(df) / merge(other) / finish_fit() -> Imputer
+        Learns the fill values chunk by chunk or shard by shard.
+
+    Notes
+    -----
+    Numeric columns are grouped by imputation method before any work is done,
+    so multivariate models (KNN, IterativeImputer, K-Means) are fitted once per
+    method and fill all of their assigned columns from that single fit.
     """
 
+    # Imputation functions whose statistics can be accumulated chunk by chunk
+    STREAMING = ('_mean', '_winsorized_mean', '_regression_median')
+    # `transform` fills gaps, so later components are only fitted on its output after `finish_fit`
+    transform_changes_data = True
+
     def __init__(self,
                  metadata: Optional[dict] = None,
                  method_to_all_numeric: str = 'Mean',
                  method_to_all_categorical: str = 'Mode',
-                 method_maps: dict = {}):
+                 method_maps: dict = {},
+                 quantile_k: int = 200,
+                 top_k: int = 1024,
+                 fallback: Optional[str] = None):
         self.method_map = {
             "Winsorized Mean": "_winsorized_mean",
             "IterativeImputer(estimator=RandomForestRegressor())": "_iterative_rf",
@@ -54,117 +78,459 @@ class Imputer:
         self.method_to_all_numeric = self._check_method(method_to_all_numeric)
         self.method_to_all_categorical = method_to_all_categorical
         self.method_map_to_column = method_maps
+        self.steps = None
+        self.modes = None
+        self.quantile_k = quantile_k
+        self.top_k = top_k
+        if fallback not in (None, 'mean'):
+            raise ValueError(f"Unknown streaming fallback '{fallback}', expected None or 'mean'")
+        self.fallback = fallback
+        self._accumulators = None
 
-    def _mean(self, df: pd.DataFrame, col: str):
-        mean_val = df[col].mean()
-        df[col].fillna(mean_val, inplace=True)
-        logger.info(f"Filled missing in '{col}' with Mean: {mean_val}")
-        return df
+    def _mean(self, df: pd.DataFrame, cols: list) -> dict:
+        return {'kind': 'values', 'label': 'Mean', 'cols': cols, 'values': df[cols].mean().to_dict()}
 
-    def _winsorized_mean(self, df: pd.DataFrame, col: str):
-        series = df[col]
-        wins = mstats.winsorize(series.dropna(), limits=[0.05, 0.05])
-        wm = wins.mean()
-        df[col].fillna(wm, inplace=True)
-        logger.info(f"Filled missing in '{col}' with Winsorized Mean: {wm}")
-        return df
+    def _winsorized_mean(self, df: pd.DataFrame, cols: list) -> dict:
+        from scipy.stats import mstats
+        values = {}
+        for col in cols:
+            wins = mstats.winsorize(df[col].dropna(), limits=[0.05, 0.05])
+            values[col] = float(wins.mean())
+        return {'kind': 'values', 'label': 'Winsorized Mean', 'cols': cols, 'values': values}
 
-    def _iterative_rf(self, df: pd.DataFrame, col: str):
+    def _model_impute(self, df: pd.DataFrame, cols: list, imp, name: str) -> dict:
+        """
+        Fits one multivariate imputer on all numeric features for every column in `cols`.
+        """
+        numeric = df.select_dtypes(include=[np.number])
+        # Entirely empty features are dropped by sklearn imputers, so keep them out of the fit
+        features = numeric.columns[numeric.notna().any()].tolist()
+        arr = imp.fit_transform(numeric[features])
+        logger.info(f"Fitted {name} once on numeric features for {cols}")
+        return {'kind': 'model', 'label': name, 'cols': [col for col in cols if col in features],
+                'features': features, 'model': imp,
+                'train_output': pd.DataFrame(arr, index=df.index, columns=features)}
+
+    def _iterative_rf(self, df: pd.DataFrame, cols: list) -> dict:
+        # scikit-learn is imported only when a model-based method is actually used
+        from sklearn.experimental import enable_iterative_imputer  # Enable IterativeImputer
+        from sklearn.impute import IterativeImputer
+        from sklearn.ensemble import RandomForestRegressor
         imp = IterativeImputer(estimator=RandomForestRegressor(), random_state=0)
-        arr = imp.fit_transform(df.select_dtypes(include=[np.number]))
-        df[df.select_dtypes(include=[np.number]).columns] = arr
-        logger.info(f"Applied IterativeImputer(RandomForestRegressor) on numeric features")
-        return df
+        return self._model_impute(df, cols, imp, 'IterativeImputer(RandomForestRegressor)')
 
-    def _knn(self, df: pd.DataFrame, col: str):
-        imp = KNNImputer()
-        arr = imp.fit_transform(df.select_dtypes(include=[np.number]))
-        df[df.select_dtypes(include=[np.number]).columns] = arr
-        logger.info(f"Applied KNNImputer on numeric features")
-        return df
+    def _knn(self, df: pd.DataFrame, cols: list) -> dict:
+        from sklearn.impute import KNNImputer
+        return self._model_impute(df, cols, KNNImputer(), 'KNNImputer')
 
-    def _bayesian(self, df: pd.DataFrame, col: str):
+    def _bayesian(self, df: pd.DataFrame, cols: list) -> dict:
+        from sklearn.experimental import enable_iterative_imputer  # Enable IterativeImputer
+        from sklearn.impute import IterativeImputer
+        from sklearn.linear_model import BayesianRidge
         imp = IterativeImputer(estimator=BayesianRidge(), random_state=0)
-        arr = imp.fit_transform(df.select_dtypes(include=[np.number]))
-        df[df.select_dtypes(include=[np.number]).columns] = arr
-        logger.info(f"Applied IterativeImputer(BayesianRidge) on numeric features")
-        return df
+        return self._model_impute(df, cols, imp, 'IterativeImputer(BayesianRidge)')
 
-    def _regression_median(self, df: pd.DataFrame, col: str):
+    def _regression_median(self, df: pd.DataFrame, cols: list) -> dict:
         # Simple regression-based imputation using other numeric features
+        from sklearn.linear_model import LinearRegression
         numeric = df.select_dtypes(include=[np.number])
-        if col not in numeric:
-            return df
-        train = numeric[numeric[col].notna()]
-        test = numeric[numeric[col].isna()]
-        if test.empty or train.shape[1] < 2:
-            med = df[col].median()
-            df[col].fillna(med, inplace=True)
-            logger.info(f"Filled missing in '{col}' with Median fallback: {med}")
-            return df
-        X_train = train.drop(columns=[col])
-        y_train = train[col]
-        model = LinearRegression()
-        model.fit(X_train, y_train)
-        preds = model.predict(test.drop(columns=[col]))
-        df.loc[df[col].isna(), col] = preds
-        logger.info(f"Filled missing in '{col}' with Regression-based Median (predictions)")
-        return df
+        # Predictors may have gaps of their own; mean-fill them so one regression covers every row
+        predictors = numeric.loc[:, numeric.notna().any()]
+        predictor_means = predictors.mean()
+        predictors = predictors.fillna(predictor_means)
+        models, medians = {}, {}
+        for col in cols:
+            if col not in numeric:
+                continue
+            observed = numeric[col].notna()
+            X = predictors.drop(columns=[col], errors='ignore')
+            if not observed.any() or X.shape[1] < 1:
+                medians[col] = df[col].median()
+                continue
+            model = LinearRegression()
+            model.fit(X[observed], numeric.loc[observed, col])
+            models[col] = (model, X.columns.tolist())
+        return {'kind': 'regression', 'label': 'Regression-based Median', 'cols': cols,
+                'models': models, 'medians': medians, 'predictor_means': predictor_means.to_dict()}
 
-    def _kmeans(self, df: pd.DataFrame, col: str):
-        numeric = df.select_dtypes(include=[np.number]).copy()
+    def _kmeans(self, df: pd.DataFrame, cols: list) -> dict:
+        from sklearn.cluster import KMeans
+        numeric = df.select_dtypes(include=[np.number])
+        features = numeric.columns[numeric.notna().any()].tolist()
         n_clusters = min(5, len(df))
         km = KMeans(n_clusters=n_clusters, random_state=0)
-        filled = numeric.fillna(numeric.mean())
-        clusters = km.fit_predict(filled)
-        numeric['__cluster'] = clusters
-        df['__cluster'] = clusters
-        for cluster in np.unique(clusters):
-            mask = (df['__cluster'] == cluster)
-            cluster_mean = df.loc[mask, col].mean()
-            df.loc[(df[col].isna()) & mask, col] = cluster_mean
-        df.drop(columns='__cluster', inplace=True)
-        logger.info(f"Filled missing in '{col}' using K-Means Imputation with {n_clusters} clusters")
+        feature_means = numeric[features].mean()
+        clusters = km.fit_predict(numeric[features].fillna(feature_means))
+        cluster_means = df[cols].groupby(clusters).mean()
+        logger.info(f"Fitted K-Means Imputation with {n_clusters} clusters for {cols}")
+        return {'kind': 'kmeans', 'label': 'K-Means Imputation', 'cols': cols, 'features': features,
+                'feature_means': feature_means.to_dict(), 'model': km,
+                'cluster_means': cluster_means.to_dict(), 'train_clusters': clusters}
+
+    @staticmethod
+    def _as_dtype(values, dtype):
+        """
+        Casts fill values to a compact float column's dtype, so filling never widens the column.
+        """
+        if pd.api.types.is_float_dtype(dtype) and not pd.api.types.is_extension_array_dtype(dtype):
+            if isinstance(values, (pd.Series, np.ndarray)):
+                return values.astype(dtype)
+            return dtype.type(values) if values is not None else values
+        return values
+
+    def _apply_step(self, df: pd.DataFrame, step: dict) -> pd.DataFrame:
+        """
+        Fills the columns of one fitted step. Observed values are never changed,
+        and compact float dtypes (e.g. float32) are kept.
+        """
+        cols = [col for col in step['cols'] if col in df.columns]
+        if not cols or not df[cols].isna().any().any():
+            return df
+        kind = step['kind']
+        if kind == 'values':
+            df[cols] = df[cols].fillna({col: self._as_dtype(step['values'][col], df[col].dtype) for col in cols})
+            logger.info(f"Filled missing in {cols} with {step['label']}: {[step['values'][col] for col in cols]}")
+        elif kind == 'model':
+            filled = step.get('train_output')
+            if filled is None:
+                arr = step['model'].transform(df[step['features']])
+                filled = pd.DataFrame(arr, index=df.index, columns=step['features'])
+            df[cols] = df[cols].fillna(filled[cols].astype({col: df[col].dtype for col in cols if pd.api.types.is_float_dtype(df[col].dtype)}))
+            logger.info(f"Filled missing in {cols} with {step['label']}")
+        elif kind == 'regression':
+            predictors = None
+            for col in cols:
+                missing = df[col].isna()
+                if not missing.any():
+                    continue
+                if col in step['models']:
+                    model, predictor_columns = step['models'][col]
+                    if predictors is None:
+                        predictors = df[list(step['predictor_means'])].fillna(step['predictor_means'])
+                    predictions = model.predict(predictors.loc[missing, predictor_columns])
+                    df.loc[missing, col] = self._as_dtype(predictions, df[col].dtype)
+                    logger.info(f"Filled missing in '{col}' with Regression-based Median (predictions)")
+                else:
+                    df[col] = df[col].fillna(self._as_dtype(step['medians'].get(col), df[col].dtype))
+                    logger.info(f"Filled missing in '{col}' with Median fallback: {step['medians'].get(col)}")
+        elif kind == 'kmeans':
+            clusters = step.get('train_clusters')
+            if clusters is None:
+                clusters = step['model'].predict(df[step['features']].fillna(step['feature_means']))
+            for col in cols:
+                fill = pd.Series(clusters, index=df.index).map(step['cluster_means'][col])
+                df[col] = df[col].fillna(self._as_dtype(fill, df[col].dtype))
+            logger.info(f"Filled missing in {cols} using K-Means Imputation")
         return df
 
+    def _plan(self, df: pd.DataFrame, only_missing: bool = True) -> dict:
+        """
+        Groups the numeric columns by imputation function.
+        With `only_missing`, columns without missing values are left out.
+
+        Returns:
+            dict: {function name: [columns]}, in order of first appearance.
+        """
+        missing = df.isna().any()
+        plan = {}
+        for col in df.select_dtypes(include=[np.number]).columns:
+            if only_missing and not missing[col]:
+                continue
+            method_name = self._column_method(col)
+            logger.info(f"Imputing numeric column '{col}' using method: {method_name}")
+            plan.setdefault(self.method_map[method_name], []).append(col)
+        return plan
+
+    def _column_method(self, col: str) -> str:
+        """
+        Imputation method of a numeric column: the override, then the analyzed strategy, then the default.
+        """
+        method_name = self.method_map_to_column.get(col, None)
+        if not method_name:
+            method_name = self.metadata.get('columns', {}).get(col, {}).get('imputation', self.method_to_all_numeric)
+        return self._check_method(method_name)
+
     def _check_method(self, method: str) -> str:
         if method not in self.method_map:
             logger.warning(f"Unknown method '{method}', defaulting to '{self.method_to_all_numeric}'")
             return self.method_to_all_numeric
         return method
 
+    def _fit_apply(self, df: pd.DataFrame, only_missing: bool) -> tuple:
+        """
+        Fits every imputation step on `df` and applies it straight away, so
+        later steps learn from the columns filled by earlier ones.
 
-    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        Returns:
+            tuple: (filled DataFrame, fitted steps, categorical fill values)
+        """
         columns_details = self.metadata.get('columns', {})
-        # Impute numeric columns
-        for col in df.select_dtypes(include=[np.number]).columns:
-            method_name = self.method_map_to_column.get(col, None)  
-            if not method_name:
-                method_name = columns_details.get(col, {}).get('imputation', self.method_to_all_numeric)
-
-            method_name = self._check_method(method_name) 
-            logger.info(f"Imputing numeric column '{col}' using method: {method_name}")
-            func = getattr(self, self.method_map.get(method_name, None), None)
+        steps = []
+        # Impute numeric columns, one fit per imputation method
+        for func_name, cols in self._plan(df, only_missing=only_missing).items():
+            func = getattr(self, func_name, None)
             if callable(func):
                 try:
-                    df = func(df, col)
+                    step = func(df, cols)
+                    df = self._apply_step(df, step)
+                    step.pop('train_output', None)
+                    step.pop('train_clusters', None)
+                    steps.append(step)
                 except Exception as e:
-                    logger.error(f"Error imputing column '{col}' using {method_name}: {e}")
+                    logger.error(f"Error imputing columns {cols} using {func_name}: {e}")
             else:
-                logger.warning(f"Imputation method '{method_name}' for column '{col}' is invalid.")
+                logger.warning(f"Imputation method '{func_name}' for columns {cols} is invalid.")
 
         # Impute categorical or non-numeric columns
+        modes = {}
         for col in df.select_dtypes(exclude=[np.number]).columns:
             is_target = col == self.metadata.get('target_column')
             is_categorical = columns_details.get(col, {}).get('dtype') == 'categorical_columns'
             if is_target or is_categorical:
                 mode_series = df[col].mode()
                 if not mode_series.empty:
-                    mode_value = mode_series.iloc[0]
-                    df[col] = df[col].fillna(mode_value)
-                    logger.info(f"Filled missing values in '{col}' with mode: {mode_value}")
+                    modes[col] = mode_series.iloc[0]
+                    df[col] = df[col].fillna(modes[col])
+                    logger.info(f"Filled missing values in '{col}' with mode: {modes[col]}")
                 else:
                     logger.warning(f"Cannot impute '{col}': No mode found (column might be entirely NaN).")
+        return df, steps, modes
+
+    def fit(self, df: pd.DataFrame) -> 'Imputer':
+        """
+        Learns fill values and imputation models for every numeric and categorical column,
+        including columns without gaps in `df`, so unseen gaps can be filled later.
+        """
+        _, self.steps, self.modes = self._fit_apply(df.copy(), only_missing=False)
+        logger.info("Imputer fitted.")
+        return self
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Fits like `fit` and returns the frame filled while fitting, so model-based
+        steps are not applied a second time.
+        """
+        df, self.steps, self.modes = self._fit_apply(df, only_missing=False)
+        logger.info("Imputer fitted.")
+        return df
+
+    def partial_fit(self, df: pd.DataFrame) -> 'Imputer':
+        """
+        Adds a chunk to mergeable accumulators of the fill statistics: running
+        moments for means, quantile sketches for winsorized means and medians,
+        regression moments for regression-based imputation and value counters for
+        modes. Columns and methods are planned on the first chunk. Statistics come
+        from the raw chunks, so unlike `fit` later steps do not see the values
+        filled by earlier ones.
+
+        Raises:
+        -------
+        ValueError
+            If a column uses a model-based method (KNN, IterativeImputer, K-Means),
+            which cannot be fitted chunk by chunk, and `fallback` is not set. With
+            `fallback='mean'` those columns use the mean and the substitution is
+            recorded in `metadata['imputation_fallbacks']`.
+        """
+        from Utilities.sketches import RunningMoments, KLLSketch, MisraGries, RegressionMoments
+        if self._accumulators is None:
+            plan = {}
+            for func_name, cols in self._plan(df, only_missing=False).items():
+                if func_name not in self.STREAMING:
+                    methods = {col: self._column_method(col) for col in cols}
+                    if self.fallback is None:
+                        raise ValueError(f"Imputation methods {methods} cannot be fitted chunk by chunk. "
+                                         f"Use fit(), or pass fallback='mean' to impute these columns with the mean.")
+                    logger.warning(f"Imputation methods {methods} cannot be fitted chunk by chunk, using the mean instead")
+                    fallbacks = self.metadata.setdefault('imputation_fallbacks', {})
+                    fallbacks.update({col: {'method': method, 'fallback': 'Mean'} for col, method in methods.items()})
+                    func_name = '_mean'
+                plan.setdefault(func_name, []).extend(cols)
+            columns_details = self.metadata.get('columns', {})
+            categorical = [col for col in df.select_dtypes(exclude=[np.number]).columns
+                           if col == self.metadata.get('target_column') or columns_details.get(col, {}).get('dtype') == 'categorical_columns']
+            sketched = plan.get('_winsorized_mean', []) + plan.get('_regression_median', [])
+            self._accumulators = {
+                'plan': plan,
+                'moments': {col: RunningMoments() for col in plan.get('_mean', [])},
+                'quantiles': {col: KLLSketch(self.quantile_k, seed=0) for col in sketched},
+                'regression': RegressionMoments(df.select_dtypes(include=[np.number]).columns, plan['_regression_median'])
+                              if '_regression_median' in plan else None,
+                'counts': {col: MisraGries(self.top_k) for col in categorical}
+            }
+        accumulators = self._accumulators
+        for kind in ('moments', 'quantiles'):
+            for col, accumulator in accumulators[kind].items():
+                if col in df.columns:
+                    accumulator.update(df[col].to_numpy(dtype=np.float64, na_value=np.nan))
+        if accumulators['regression'] is not None:
+            accumulators['regression'].update(df)
+        for col, counter in accumulators['counts'].items():
+            if col in df.columns:
+                counter.update(df[col])
+        return self
+
+    def merge(self, other: 'Imputer') -> 'Imputer':
+        """
+        Adds the accumulators of an Imputer that saw other chunks or shards, e.g.
+        one returned by a worker process.
+        """
+        if other._accumulators is None:
+            return self
+        if self._accumulators is None:
+            self._accumulators = copy.deepcopy(other._accumulators)
+            return self
+        if other._accumulators['plan'] != self._accumulators['plan']:
+            raise ValueError("Cannot merge Imputers that planned different columns or methods")
+        for kind in ('moments', 'quantiles', 'counts'):
+            for col, accumulator in other._accumulators[kind].items():
+                if col in self._accumulators[kind]:
+                    self._accumulators[kind][col].merge(accumulator)
+                else:
+                    self._accumulators[kind][col] = copy.deepcopy(accumulator)
+        if self._accumulators['regression'] is not None:
+            self._accumulators['regression'].merge(other._accumulators['regression'])
+        return self
+
+    def _regression_step(self, cols: list) -> dict:
+        """
+        The 'Regression-based Median' step from the streamed regression moments.
+        """
+        from sklearn.linear_model import LinearRegression
+        regression, quantiles = self._accumulators['regression'], self._accumulators['quantiles']   #type: ignore
+        means = regression.means()
+        columns = [col for col in regression.columns if col in means]
+        models, medians = {}, {}
+        for col in cols:
+            predictors = [predictor for predictor in columns if predictor != col]
+            if not regression.rows[regression.targets.index(col)] or not predictors:
+                medians[col] = quantiles[col].quantile(0.5)
+                continue
+            intercept, coef = regression.solve(col, predictors)
+            model = LinearRegression()
+            model.intercept_, model.coef_ = intercept, coef
+            model.n_features_in_, model.feature_names_in_ = len(predictors), np.asarray(predictors, dtype=object)
+            models[col] = (model, predictors)
+        return {'kind': 'regression', 'label': 'Regression-based Median', 'cols': cols,
+                'models': models, 'medians': medians, 'predictor_means': {col: means[col] for col in columns}}
+
+    def finish_fit(self) -> 'Imputer':
+        """
+        Turns the accumulators into fitted steps and modes, as `fit` would store them.
+        """
+        accumulators = self._accumulators
+        if accumulators is None:
+            raise ValueError("Imputer has no accumulated statistics. Call partial_fit() first.")
+        self.steps = []
+        for func_name, cols in accumulators['plan'].items():
+            if func_name == '_mean':
+                moments = accumulators['moments']
+                values = {col: moments[col].mean if moments[col].count else np.nan for col in cols}
+                self.steps.append({'kind': 'values', 'label': 'Mean', 'cols': cols, 'values': values})
+            elif func_name == '_winsorized_mean':
+                values = {col: accumulators['quantiles'][col].winsorized_mean(0.05) for col in cols}
+                self.steps.append({'kind': 'values', 'label': 'Winsorized Mean', 'cols': cols, 'values': values})
+            else:
+                self.steps.append(self._regression_step(cols))
+        self.modes = {}
+        for col, counter in accumulators['counts'].items():
+            top = counter.top(1)
+            if top:
+                self.modes[col] = top[0][0]
+            else:
+                logger.warning(f"Cannot impute '{col}': No mode found (column might be entirely NaN).")
+        self._accumulators = None
+        logger.info("Imputer fitted from streamed statistics.")
+        return self
+
+    def fit_stream(self, chunks) -> 'Imputer':
+        """
+        Learns the fill values from an iterable of DataFrames in one pass with bounded memory.
+        """
+        self._accumulators = None
+        for chunk in chunks:
+            self.partial_fit(chunk)
+        return self.finish_fit()
 
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Fills missing values with the fitted steps, or learns them from `df` if not fitted.
+        """
+        if self.steps is None:
+            df, _, _ = self._fit_apply(df, only_missing=True)
+        else:
+            for step in self.steps:
+                try:
+                    df = self._apply_step(df, step)
+                except Exception as e:
+                    logger.error(f"Error imputing columns {step['cols']} using {step['label']}: {e}")
+            for col, mode_value in self.modes.items():          #type: ignore
+                if col in df.columns and df[col].isna().any():
+                    df[col] = df[col].fillna(mode_value)
+                    logger.info(f"Filled missing values in '{col}' with mode: {mode_value}")
         logger.info("Imputation completed.")
-        return df
\ No newline at end of file
+        return df
+
+    def _step_task(self, step: dict, frame: pd.DataFrame) -> dict:
+        try:
+            frame = self._apply_step(frame, step)
+        except Exception as e:
+            logger.error(f"Error imputing columns {step['cols']} using {step['label']}: {e}")
+        return {col: frame[col] for col in step['cols'] if col in frame.columns}
+
+    def _mode_task(self, col, mode_value, frame: pd.DataFrame) -> dict:
+        if not frame[col].isna().any():
+            return {}
+        logger.info(f"Filled missing values in '{col}' with mode: {mode_value}")
+        return {col: frame[col].fillna(mode_value)}
+
+    def tasks(self, df: pd.DataFrame):
+        """
+        Column tasks for the pipeline scheduler, or None if not fitted. Fill-value
+        steps are split per column; model steps stay whole and also read their features.
+        """
+        if self.steps is None:
+            return None
+        tasks = []
+        for step in self.steps:
+            cols = [col for col in step['cols'] if col in df.columns]
+            if not cols:
+                continue
+            if step['kind'] == 'values':
+                for col in cols:
+                    single = dict(step, cols=[col])
+                    tasks.append((f"{step['label']}:{col}", partial(self._step_task, single), [col], [col]))
+                continue
+            features = step.get('features') or list(step.get('predictor_means', {}))
+            reads = cols + [col for col in features if col in df.columns and col not in cols]
+            tasks.append((step['label'], partial(self._step_task, step), reads, cols))
+        for col, mode_value in self.modes.items():          #type: ignore
+            if col in df.columns:
+                tasks.append((f"mode:{col}", partial(self._mode_task, col, mode_value), [col], [col]))
+        return tasks
+
+    def get_state(self) -> dict:
+        """
+        Returns the configuration and fitted steps. Model steps hold fitted sklearn
+        estimators, so the state is meant to be pickled.
+        """
+        return {
+            'method_to_all_numeric': self.method_to_all_numeric,
+            'method_to_all_categorical': self.method_to_all_categorical,
+            'method_maps': dict(self.method_map_to_column),
+            'steps': self.steps,
+            'modes': self.modes,
+            'quantile_k': self.quantile_k,
+            'top_k': self.top_k,
+            'fallback': self.fallback
+        }
+
+    @classmethod
+    def from_state(cls, state: dict, metadata: Optional[dict] = None) -> 'Imputer':
+        imputer = cls(metadata=metadata, method_to_all_numeric=state['method_to_all_numeric'],
+                      method_to_all_categorical=state['method_to_all_categorical'], method_maps=state['method_maps'],
+                      quantile_k=state.get('quantile_k', 200), top_k=state.get('top_k', 1024),
+                      fallback=state.get('fallback'))
+        imputer.steps = state['steps']
+        imputer.modes = state['modes']
+        return imputer
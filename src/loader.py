@@ -1,8 +1,8 @@
 import os
 import logging
 import mimetypes
-import chardet
 import pandas as pd
+from typing import Iterator, Optional
 from Utilities.logger import setup_logger
 logger = setup_logger(log_file='pipeline.log', __name__=__name__)
 
@@ -20,16 +20,37 @@ class Loader:
         ]
     }
 
-    def __init__(self, path: str, metadata: dict = {}):
+    def __init__(self, path: str, metadata: dict = {}, cache_dir: Optional[str] = None, cache_max_bytes: int = 2 * 1024 ** 3,
+                 encoding: Optional[str] = None):
         """
         Initializes the Loader with a file path.
         Automatically detects the file format and encoding (for CSV).
+
+        If `cache_dir` is given, loaded frames are kept in an on-disk columnar
+        cache (see `Utilities.cache.FrameCache`) and unchanged files are read
+        back memory-mapped instead of being parsed and encoding-sniffed again.
+        A known `encoding`, e.g. shared by the shards of one dataset, also skips detection.
         """
         logger.info('-'*50)
         logger.info(f"Initializing Loader for path: {path}")
         self.path = path
         self.format = self._detect_file_format()
-        self.encoding = self._detect_encoding() if self.format == 'csv' else None
+        self.cache = None
+        self.cache_key = None
+        cached_info = None
+        if cache_dir:
+            from Utilities.cache import FrameCache
+            self.cache = FrameCache(cache_dir, max_bytes=cache_max_bytes)
+            self.cache_key = self.cache.key(self.path)
+            cached_info = self.cache.info(self.cache_key)
+        if cached_info is not None:
+            logger.info(f"Columnar cache hit for {self.path}, skipping encoding detection.")
+            self.encoding = cached_info.get('encoding')
+        elif encoding is not None:
+            self.encoding = encoding
+        else:
+            self.encoding = self._detect_encoding() if self.format == 'csv' else None
+        self.cache_hit = cached_info is not None
         self.dataframe = None
         self.metadata = metadata if metadata is not None else {}
         result = {'path': self.path,
@@ -73,6 +94,7 @@ class Loader:
             Exception: If file can't be read or encoding can't be detected.
         """
         try:
+            import chardet
             logger.debug("Detecting file encoding...")
             with open(self.path, 'rb') as file:
                 raw_data = file.read(4096)
@@ -134,14 +156,68 @@ class Loader:
             logger.critical(f"Unsupported file format: {self.format}")
             raise ValueError(f"Unsupported file format: {self.format}")
 
-        logger.debug(f"Delegating to loader for format: {self.format}")
-        loaders[self.format]()
         result = {'path': self.path,
                 'format': self.format,
                 'encoding': self.encoding
             }
+        if self.cache_hit:
+            self.dataframe = self.cache.load(self.cache_key)        #type: ignore
+        else:
+            logger.debug(f"Delegating to loader for format: {self.format}")
+            loaders[self.format]()
+            if self.cache is not None:
+                self.cache.store(self.cache_key, self.dataframe, result)        #type: ignore
 
         logger.debug(f"Loader Summary: {result}")
         # self.dataframe = self._normalize_columns(self.dataframe)
         self.metadata['file_info'] = self.metadata.get('file_info', result)
         return self.dataframe
+
+    def transform_chunks(self, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        """
+        Streams the file as a sequence of DataFrames of at most `chunksize` rows.
+
+        CSV files are read incrementally, so peak memory is bounded by the chunk
+        size rather than the file size. Excel files cannot be read incrementally;
+        they are loaded once and then sliced.
+
+        Yields:
+            pd.DataFrame: The next chunk of rows.
+
+        Raises:
+            ValueError: If the chunk size is not positive or the format is not supported.
+        """
+        if chunksize <= 0:
+            raise ValueError(f"chunksize must be a positive integer, got {chunksize}")
+        logger.info(f"Streaming file with format: {self.format} in chunks of {chunksize} rows")
+        result = {'path': self.path,
+                'format': self.format,
+                'encoding': self.encoding
+            }
+        self.metadata['file_info'] = self.metadata.get('file_info', result)
+
+        if self.cache_hit:
+            from Utilities.cache import table_to_frame
+            table = self.cache.read_table(self.cache_key)       #type: ignore
+            for start in range(0, table.num_rows, chunksize):
+                chunk = table_to_frame(table.slice(start, chunksize))
+                chunk.index = pd.RangeIndex(start, start + len(chunk))
+                yield chunk
+        elif self.format == 'csv':
+            try:
+                reader = pd.read_csv(self.path, encoding=self.encoding, chunksize=chunksize)
+            except Exception as e:
+                logger.exception("Failed to open CSV file for streaming.")
+                raise
+            with reader:
+                for chunk in reader:
+                    yield chunk
+        elif self.format == 'xlsx':
+            logger.warning("Excel files cannot be streamed; loading the full sheet before chunking.")
+            self._load_xlsx()
+            df, self.dataframe = self.dataframe, None
+            for start in range(0, len(df), chunksize):      #type: ignore
+                yield df.iloc[start:start + chunksize]      #type: ignore
+        else:
+            logger.critical(f"Unsupported file format: {self.format}")
+            raise ValueError(f"Unsupported file format: {self.format}")
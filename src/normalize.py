@@ -1,114 +1,712 @@
 import pandas as pd
 import numpy as np
-from sklearn.pipeline import Pipeline
-from sklearn.preprocessing import (
-    PowerTransformer,
-    StandardScaler,
-    MinMaxScaler,
-    QuantileTransformer,
-    LabelEncoder
-)
+from functools import partial
+from typing import Optional
 
 from Utilities.logger import setup_logger
 logger = setup_logger(log_file='normalize.log', __name__=__name__)
 
+EPSILON = 1e-5  # for stability in sqrt/reciprocal/log
+BOUNDS_THRESHOLD = 1e-7  # as in sklearn's QuantileTransformer
+# Methods starting with log1p, defined for values above -1
+LOG_METHODS = ('log_quantile', 'log_powertransformer')
+
+# Spellings found in strategies and configurations -> canonical method
+METHOD_ALIASES = {
+    'minmax': 'minmax',
+    'minmaxscalar': 'minmax',
+    'minmaxscaler': 'minmax',
+    'standardscaler': 'standardscaler',
+    'standardscalar': 'standardscaler',
+    'standard': 'standardscaler',
+    'yeojohnson_standard': 'yeojohnson_standard',
+    'boxcox': 'boxcox',
+    'sqrt_reciprocal': 'sqrt_reciprocal',
+    'log_quantile': 'log_quantile',
+    'log_powertransformer': 'log_powertransformer',
+}
+
+
+# Spellings of categorical encoders -> canonical encoder
+ENCODER_ALIASES = {
+    'onehotencoding': 'onehot',
+    'onehot': 'onehot',
+    'one_hot': 'onehot',
+    'hashing': 'hashing',
+    'hash': 'hashing',
+    'featurehashing': 'hashing',
+    'feature_hashing': 'hashing',
+    'frequency': 'frequency',
+    'frequencyencoding': 'frequency',
+    'count': 'frequency',
+    'target': 'target',
+    'targetencoding': 'target',
+    'target_encoding': 'target',
+    'none': 'none',
+    'passthrough': 'none',
+}
+# Encoders that turn a column into a sparse block of indicator columns
+SPARSE_ENCODERS = ('onehot', 'hashing')
+
+
+def canonical_method(method: str) -> str:
+    """
+    Resolves a normalization method name, ignoring case and dashes, e.g. 'MinMaxScalar' -> 'minmax'.
+    """
+    key = str(method).strip().lower().replace('-', '')
+    if key not in METHOD_ALIASES:
+        raise ValueError(f"Unknown method: {method}")
+    return METHOD_ALIASES[key]
+
+
+def canonical_encoder(encoder: str) -> str:
+    """
+    Resolves a categorical encoder name, ignoring case, spaces and dashes, e.g. 'OneHotEncoding' -> 'onehot'.
+    """
+    key = str(encoder).strip().lower().replace('-', '').replace(' ', '')
+    if key not in ENCODER_ALIASES:
+        raise ValueError(f"Unknown encoder: {encoder}")
+    return ENCODER_ALIASES[key]
+
+
+def _standardize_params(X: np.ndarray) -> dict:
+    count = (~np.isnan(X)).sum(axis=0)
+    mean, var = np.nanmean(X, axis=0), np.nanvar(X, axis=0)
+    # Constant up to rounding, the bound sklearn's StandardScaler uses
+    eps = np.finfo(np.float64).eps
+    constant = var <= count * eps * var + (count * mean * eps) ** 2
+    scale = np.sqrt(var)
+    scale[constant] = 1.0
+    return {'shift': mean, 'scale': scale}
+
+
+def _yeo_johnson(x: np.ndarray, lmbda: float) -> np.ndarray:
+    """
+    Yeo-Johnson transform of a 1-D array, the formula of scipy.stats.yeojohnson
+    without its per-call overhead. NaN stays NaN.
+    """
+    eps = np.finfo(np.float64).eps
+    out = np.empty(len(x), dtype=np.float64)
+    pos, neg = x >= 0, x < 0
+    out[np.isnan(x)] = np.nan
+    if abs(lmbda) < eps:
+        out[pos] = np.log1p(x[pos])
+    else:
+        out[pos] = np.expm1(lmbda * np.log1p(x[pos])) / lmbda
+    if abs(lmbda - 2) > eps:
+        out[neg] = -np.expm1((2 - lmbda) * np.log1p(-x[neg])) / (2 - lmbda)
+    else:
+        out[neg] = -np.log1p(-x[neg])
+    return out
+
+
+def _power(X: np.ndarray, lambdas: np.ndarray, method: str) -> np.ndarray:
+    """
+    Applies a Box-Cox or Yeo-Johnson transform column by column, in place.
+    """
+    from scipy.special import boxcox
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for i, lmbda in enumerate(lambdas):
+            X[:, i] = boxcox(X[:, i], lmbda) if method == 'box-cox' else _yeo_johnson(X[:, i], lmbda)
+    return X
+
+
+def _quantile_normal(X: np.ndarray, quantiles: np.ndarray, references: np.ndarray) -> np.ndarray:
+    """
+    Maps every column to a standard normal through its fitted quantiles, in place.
+    Same computation as sklearn's QuantileTransformer(output_distribution='normal').
+    """
+    from scipy.special import ndtri
+    clip_min = ndtri(BOUNDS_THRESHOLD - np.spacing(1))
+    clip_max = ndtri(1 - (BOUNDS_THRESHOLD - np.spacing(1)))
+    with np.errstate(invalid='ignore', divide='ignore'):
+        lower = X - BOUNDS_THRESHOLD < quantiles[0]
+        upper = X + BOUNDS_THRESHOLD > quantiles[-1]
+        finite = ~np.isnan(X)
+        for i in range(X.shape[1]):
+            q, ref, rows = quantiles[:, i], references[:, i], finite[:, i]
+            values = X[rows, i]
+            # Interpolating from both ends averages over repeated quantiles
+            X[rows, i] = 0.5 * (np.interp(values, q, ref) - np.interp(-values, -q[::-1], -ref[::-1]))
+        X[upper] = 1
+        X[lower] = 0
+        X[:] = np.clip(ndtri(X), clip_min, clip_max)
+    return X
+
+
+def fit_method(method: str, X: np.ndarray) -> dict:
+    """
+    Learns the parameters of `method` for every column of a 2-D float array at once.
+    Missing values are ignored.
+
+    Returns:
+        dict: Parameter name -> array whose last axis follows the columns of `X`.
+    """
+    if method == 'minmax':
+        low, high = np.nanmin(X, axis=0), np.nanmax(X, axis=0)
+        scale = high - low
+        scale[scale < 10 * np.finfo(np.float64).eps] = 1.0
+        return {'shift': low, 'scale': scale}
+    if method == 'standardscaler':
+        return _standardize_params(X)
+    if method == 'sqrt_reciprocal':
+        return {}
+    if method in ('yeojohnson_standard', 'log_powertransformer'):
+        from sklearn.preprocessing import PowerTransformer
+        X = np.log1p(X) if method == 'log_powertransformer' else X.copy()
+        lambdas = PowerTransformer(method='yeo-johnson', standardize=False).fit(X).lambdas_
+        return {'lambdas': lambdas, **_standardize_params(_power(X, lambdas, 'yeo-johnson'))}
+    if method == 'boxcox':
+        from sklearn.preprocessing import PowerTransformer
+        shift = np.nanmin(X, axis=0) - EPSILON
+        lambdas = PowerTransformer(method='box-cox', standardize=False).fit(X - shift).lambdas_
+        return {'shift': shift, 'lambdas': lambdas}
+    if method == 'log_quantile':
+        from sklearn.preprocessing import QuantileTransformer
+        transformer = QuantileTransformer(output_distribution='normal', n_quantiles=min(1000, len(X)), random_state=0)
+        transformer.fit(np.log1p(X))
+        references = np.repeat(transformer.references_[:, None], X.shape[1], axis=1)
+        return {'quantiles': transformer.quantiles_, 'references': references}
+    raise ValueError(f"Unknown method: {method}")
+
+
+def apply_method(method: str, X: np.ndarray, params: dict) -> np.ndarray:
+    """
+    Applies fitted parameters to a 2-D float array, in place. Returns `X`.
+    """
+    if method in LOG_METHODS:
+        np.maximum(X, -1 + EPSILON, out=X)
+    if method in ('minmax', 'standardscaler'):
+        X -= params['shift']
+        X /= params['scale']
+    elif method == 'sqrt_reciprocal':
+        X += EPSILON
+        with np.errstate(invalid='ignore', divide='ignore'):
+            np.sqrt(X, out=X)
+            np.reciprocal(X, out=X)
+    elif method in ('yeojohnson_standard', 'log_powertransformer'):
+        if method == 'log_powertransformer':
+            np.log1p(X, out=X)
+        _power(X, params['lambdas'], 'yeo-johnson')
+        X -= params['shift']
+        X /= params['scale']
+    elif method == 'boxcox':
+        X -= params['shift']
+        # Values below the fitted minimum are clipped to it, Box-Cox needs positive input
+        np.maximum(X, EPSILON, out=X)
+        _power(X, params['lambdas'], 'box-cox')
+    elif method == 'log_quantile':
+        np.log1p(X, out=X)
+        _quantile_normal(X, params['quantiles'], params['references'])
+    else:
+        raise ValueError(f"Unknown method: {method}")
+    return X
+
+
+def _hash_codes(values: np.ndarray, width: int) -> np.ndarray:
+    """
+    Bucket of every value in [0, width), -1 for missing values. Values are hashed
+    as strings with pandas' fixed key, so buckets are stable across processes.
+    """
+    codes = np.full(len(values), -1, dtype=np.int64)
+    present = pd.notna(values)
+    if present.any():
+        hashes = pd.util.hash_array(values[present].astype(str).astype(object))
+        codes[present] = (hashes % np.uint64(width)).astype(np.int64)
+    return codes
+
+
+def fit_encoder(encoder: str, series: pd.Series, target: Optional[pd.Series] = None,
+                hash_width: int = 32, smoothing: float = 10.0) -> dict:
+    """
+    Learns the lookup table of a categorical encoder.
+
+    - 'onehot': the sorted categories, one indicator column each.
+    - 'hashing': `hash_width` indicator columns, nothing to learn.
+    - 'frequency': share of the rows holding every category, 0 for unseen ones.
+    - 'target': mean of the target per category, shrunk towards the overall mean
+      by `smoothing` pseudo-rows. A categorical target gives one column per class.
+
+    Returns:
+        dict: Parameters for `encoder_codes` and `encoder_lookup`, with the output
+        column names under 'names' when the column is replaced by several columns.
+    """
+    col = series.name
+    if encoder == 'onehot':
+        categories = list(series.dropna().unique())
+        try:
+            categories = sorted(categories)
+        except TypeError:
+            pass
+        return {'categories': categories, 'names': [f"{col}_{category}" for category in categories]}
+    if encoder == 'hashing':
+        return {'width': hash_width, 'names': [f"{col}_hash_{i}" for i in range(hash_width)]}
+    codes, categories = pd.factorize(series)
+    if encoder == 'frequency':
+        counts = np.bincount(codes[codes >= 0], minlength=len(categories))
+        return {'categories': list(categories), 'table': (counts / max(len(series), 1))[:, None],
+                'default': np.zeros(1), 'names': None}
+    if encoder == 'target':
+        if target is None:
+            raise ValueError(f"Target encoding of '{col}' needs the target column.")
+        Y, classes = _target_matrix(target)
+        table, prior = _target_table(codes, len(categories), Y, smoothing)
+        names = None if classes is None else [f"{col}_{label}" for label in classes]
+        return {'categories': list(categories), 'table': table, 'default': prior, 'names': names}
+    raise ValueError(f"Unknown encoder: {encoder}")
+
+
+def _target_matrix(target: pd.Series) -> tuple:
+    """
+    The target as a 2-D float array: one column for a numeric target, one indicator
+    column per sorted class for a categorical one. Missing targets are NaN rows.
+
+    Returns:
+        tuple: (Y, classes), classes None for a numeric target.
+    """
+    if pd.api.types.is_numeric_dtype(target.dtype):
+        return target.to_numpy(dtype=np.float64, na_value=np.nan)[:, None], None
+    classes = sorted(target.dropna().unique().tolist())
+    Y = (target.to_numpy(dtype=object)[:, None] == np.array(classes, dtype=object)[None, :]).astype(np.float64)
+    Y[target.isna().to_numpy()] = np.nan
+    return Y, classes
+
+
+def _target_table(codes: np.ndarray, n_categories: int, Y: np.ndarray, smoothing: float) -> tuple:
+    """
+    Smoothed target mean of every category and the overall mean, from rows with a category and a target.
+
+    Returns:
+        tuple: (table of shape (n_categories, Y columns), prior)
+    """
+    valid = (codes >= 0) & ~np.isnan(Y).any(axis=1)
+    prior = Y[valid].mean(axis=0) if valid.any() else np.zeros(Y.shape[1])
+    counts = np.bincount(codes[valid], minlength=n_categories)
+    sums = np.stack([np.bincount(codes[valid], weights=Y[valid, j], minlength=n_categories)
+                     for j in range(Y.shape[1])], axis=1)
+    return (sums + smoothing * prior) / (counts[:, None] + smoothing), prior
+
+
+def target_encode_out_of_fold(series: pd.Series, target: pd.Series, params: dict, cv: int = 5,
+                              smoothing: float = 10.0, seed: int = 0) -> np.ndarray:
+    """
+    Target encoding of the rows a target encoder was fitted on, without leaking
+    each row's own target: rows are split into `cv` shuffled folds and every
+    fold is encoded with the smoothed means of the other folds, as sklearn's
+    TargetEncoder.fit_transform does. Categories and classes are those of `params`.
+
+    Returns:
+        np.ndarray: Encoded values, shape (len(series), output columns).
+    """
+    codes = encoder_codes('target', series, params)
+    Y, _ = _target_matrix(target)
+    folds = np.random.default_rng(seed).permutation(len(series)) % cv
+    encoded = np.empty((len(series), Y.shape[1]), dtype=np.float64)
+    for fold in range(cv):
+        rows = folds == fold
+        table, prior = _target_table(codes[~rows], len(params['categories']), Y[~rows], smoothing)
+        encoded[rows] = np.vstack([table, prior[None, :]])[codes[rows]]
+    return encoded
+
+
+def encoder_codes(encoder: str, values, params: dict) -> np.ndarray:
+    """
+    Index of every value in the encoder's table or block, -1 for missing and unseen values.
+    """
+    if encoder == 'hashing':
+        return _hash_codes(np.asarray(values, dtype=object), params['width'])
+    return pd.Categorical(values, categories=params['categories']).codes.astype(np.int64)
+
+
+def encoder_lookup(params: dict) -> np.ndarray:
+    """
+    Table of a frequency or target encoder with the value for unseen categories
+    as its last row, so indexing with `encoder_codes` maps -1 to it.
+    """
+    return np.vstack([params['table'], np.atleast_1d(params['default'])[None, :]])
+
+
+def sparse_block(codes: np.ndarray, width: int):
+    """
+    CSR indicator matrix of shape (len(codes), width) with a 1 at every non-negative code.
+    """
+    from scipy import sparse
+    rows = np.flatnonzero(codes >= 0)
+    return sparse.csr_matrix((np.ones(len(rows), dtype=np.uint8), (rows, codes[rows])), shape=(len(codes), width))
+
+
 class Normalizer:
-    def __init__(self, metadata: dict = {}, stratergy: dict = {}, normalize_numeric: str='MinMaxScalar', normalize_categoric: str='OneHotEncoding'):
+    """
+    Scales numeric columns, encodes categorical ones and label-encodes a categorical
+    target with learned parameters.
+
+    Columns are grouped by normalization method. `fit` learns each group's
+    parameters once from a 2-D float array of all its columns and stores them
+    as plain arrays, so `transform` re-applies them to new data in one
+    vectorized pass per group. The method of a column is taken from
+    `stratergy`, then `normalize_numeric`, then the Analyzer's suggestion in
+    the metadata; names are matched with `canonical_method`.
+
+    Categorical columns (not free text) are encoded with 'onehot', 'hashing',
+    'frequency', 'target' or 'none', see `fit_encoder`. The encoder of a column
+    is taken from `stratergy`, then `metadata['columns'][col]['encoding']`,
+    then `normalize_categoric`. One-hot and hashed columns are built as sparse
+    matrices: `transform` returns them as sparse DataFrame columns appended
+    after the other columns, and `transform_sparse` returns the whole result as
+    a CSR matrix for sparse-aware trainers.
+
+    Parameters:
+    -----------
+    metadata : dict
+        Shared pipeline metadata with the target column and column details.
+    stratergy : dict
+        Column -> normalization method, overriding everything else.
+    normalize_numeric : str, default='MinMaxScalar'
+        Method applied to every numeric column without an entry in `stratergy`.
+        Falsy to use the Analyzer's suggestion per column. Columns with values
+        at or below -1 cannot use the log methods and get 'yeojohnson_standard'.
+    normalize_categoric : str, default='OneHotEncoding'
+        Encoder of every categorical column without an entry in `stratergy` or the metadata.
+    float32 : bool, default=False
+        Compute and return normalized columns as float32, halving their memory.
+        Every group is transformed in place in a single float32 buffer.
+    hash_width : int, default=32
+        Number of columns of the 'hashing' encoder, whatever the number of categories.
+    smoothing : float, default=10.0
+        Pseudo-rows of the overall target mean blended into every category of the 'target' encoder.
+    cv : int, default=5
+        Folds of out-of-fold target encoding. `fit_transform`, and `transform` or
+        `transform_sparse` of an unfitted Normalizer, encode every row with the
+        target means of the other folds, so a row's own target never leaks into
+        its features; a fitted Normalizer's `transform` uses the means of all
+        fitting rows. Below 2 the fitting rows are encoded with their own means,
+        which leaks the target into training features.
+    """
+    def __init__(self, metadata: dict = {}, stratergy: dict = {}, normalize_numeric: str='MinMaxScalar',
+                 normalize_categoric: str='OneHotEncoding', float32: bool = False, hash_width: int = 32,
+                 smoothing: float = 10.0, cv: int = 5):
         self.metadata = metadata
         self.stratergy = stratergy
         self.normalize_numeric = normalize_numeric
         self.normalize_categoric = normalize_categoric
+        self.float32 = float32
+        self.hash_width = hash_width
+        self.smoothing = smoothing
+        self.cv = cv
+        self.groups = None
+        self.encoders = None
+        self.classes = None
 
     def text_normalizer(self, df, columns):
         pass
 
-    def apply_transformation(self, X, method):
+    @property
+    def dtype(self):
+        return np.float32 if self.float32 else np.float64
+
+    def _column_method(self, column: str) -> str:
+        if column in self.stratergy:
+            method = self.stratergy[column]
+        elif self.normalize_numeric:
+            method = self.normalize_numeric
+        else:
+            method = self.metadata.get('columns', {}).get(column, {}).get('normalization', 'minmax')
+        return canonical_method(method)
+
+    def _column_encoder(self, column: str) -> str:
+        if column in self.stratergy:
+            encoder = self.stratergy[column]
+        else:
+            encoder = self.metadata.get('columns', {}).get(column, {}).get('encoding') or self.normalize_categoric
+        return canonical_encoder(encoder or 'none')
+
+    def _numeric_columns(self, df: pd.DataFrame) -> list:
+        target = self.metadata.get('target_column')
+        return [col for col in df.select_dtypes(include=[np.number]).columns if col != target]
+
+    def _categorical_columns(self, df: pd.DataFrame) -> list:
+        """
+        String and categorical columns other than the target and free text, which
+        holds token lists after the TextProcessor.
+        """
+        target = self.metadata.get('target_column')
+        column_details = self.metadata.get('columns', {})
+        columns = []
+        for col in df.select_dtypes(include=['object', 'category', 'string']).columns:
+            if col == target or column_details.get(col, {}).get('text_type') == 'text_data':
+                continue
+            values = df[col].dropna()
+            if len(values) and isinstance(values.iloc[0], (list, tuple, set, dict)):
+                continue
+            columns.append(col)
+        return columns
+
+    def _block(self, df: pd.DataFrame, columns: list) -> np.ndarray:
+        """
+        The columns as one contiguous 2-D float array, column-major so every column is contiguous.
+        """
+        return np.asfortranarray(df[columns].to_numpy(dtype=self.dtype, na_value=np.nan))
+
+    def apply_transformation(self, X, method, params: Optional[dict] = None):
         """
-        Apply the specified transformation to the input DataFrame X.
+        Apply the specified transformation to the input X.
 
         Parameters:
-        - X: pd.DataFrame
-        - method: str, one of the following:
+        - X: pd.DataFrame, pd.Series or array of numeric columns
+        - method: str, one of the following (any spelling accepted by `canonical_method`):
             'yeojohnson_standard'
-            'minmaxscalar'
+            'minmax'
             'boxcox'
             'standardscaler'
             'sqrt_reciprocal'
             'log_quantile'
             'log_powertransformer'
+        - params: dict, parameters from `fit_method`. Learned from X when omitted.
 
         Returns:
-        - Transformed NumPy array
+        - Transformed 2-D NumPy array
         """
-        epsilon = 1e-5  # for stability in sqrt/reciprocal/log
+        method = canonical_method(method)
+        X = np.asarray(X, dtype=self.dtype)
+        # A column-major copy, transformed in place
+        X = np.array(X.reshape(-1, 1) if X.ndim == 1 else X, order='F')
+        if params is None:
+            params = fit_method(method, X.astype(np.float64))
+        return apply_method(method, X, params)
 
-        if method == 'yeojohnson_standard':
-            pipeline = Pipeline([
-                ('yeo', PowerTransformer(method='yeo-johnson')),
-                ('scaler', StandardScaler())
-            ])
-            return pipeline.fit_transform(X)
+    def fit(self, df: pd.DataFrame) -> 'Normalizer':
+        """
+        Learns the parameters of every method group and the classes of a categorical target.
+        """
+        by_method = {}
+        for col in self._numeric_columns(df):
+            method = self._column_method(col)
+            if method in LOG_METHODS and df[col].min() <= -1:
+                logger.info(f"Warning: Column '{col}' has values <= -1. Using yeojohnson_standard instead of {method}.")
+                method = 'yeojohnson_standard'
+            by_method.setdefault(method, []).append(col)
+        self.groups = []
+        for method, columns in by_method.items():
+            X = df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+            empty = [col for col, count in zip(columns, np.isfinite(X).sum(axis=0)) if count == 0]
+            if empty:
+                logger.warning(f"Columns {empty} have no values to fit {method} on, leaving them unchanged.")
+                columns = [col for col in columns if col not in empty]
+                X = df[columns].to_numpy(dtype=np.float64, na_value=np.nan)
+            if not columns:
+                continue
+            logger.info(f"Fitting {method} on columns {columns} at once")
+            self.groups.append({'method': method, 'columns': columns, 'params': fit_method(method, X)})
 
-        elif method == 'minmax':
-            scaler = MinMaxScaler(feature_range=(0, 1))
-            return scaler.fit_transform(X)
+        target = self.metadata.get('target_column')
+        self.encoders = []
+        for col in self._categorical_columns(df):
+            encoder = self._column_encoder(col)
+            if encoder == 'none':
+                continue
+            logger.info(f"Fitting {encoder} encoder on column '{col}'")
+            params = fit_encoder(encoder, df[col], df[target] if target in df.columns else None,
+                                 hash_width=self.hash_width, smoothing=self.smoothing)
+            self.encoders.append({'encoder': encoder, 'column': col, **params})
 
-        elif method == 'boxcox':
-            X_pos = X - X.min() + epsilon
-            transformer = PowerTransformer(method='box-cox', standardize=False)
-            return transformer.fit_transform(X_pos)
+        self.classes = None
+        if target and target in df.columns and self.metadata.get('columns', {}).get(target, {}).get('dtype') == 'categorical_columns':
+            self.classes = sorted(df[target].dropna().unique().tolist())
+        return self
 
-        elif method == 'standardscaler':
-            scaler = StandardScaler()
-            return scaler.fit_transform(X)
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Fits on `df` and transforms it, with out-of-fold target encodings.
+        """
+        self.fit(df)
+        out_of_fold = self._out_of_fold(df)
+        return self._finish(self._scale(df), out_of_fold)
 
-        elif method == 'sqrt_reciprocal':
-            return 1.0 / (np.sqrt(X + epsilon))
+    def _out_of_fold(self, df: pd.DataFrame) -> dict:
+        """
+        Out-of-fold encodings of the target-encoded columns of the rows the encoders were fitted on.
 
-        elif method == 'log_quantile':
-            X_log = np.log1p(X)
-            transformer = QuantileTransformer(output_distribution='normal', random_state=0)
-            return transformer.fit_transform(X_log)
+        Returns:
+            dict: {column: encoded values}, empty when `cv` is below 2.
+        """
+        target = self.metadata.get('target_column')
+        if self.cv < 2 or target not in df.columns:
+            return {}
+        # Fewer rows than folds: one fold per row, so no row sees its own target
+        folds = min(self.cv, len(df))
+        encoded = {}
+        for encoder in self.encoders:        #type: ignore
+            if encoder['encoder'] == 'target' and encoder['column'] in df.columns:
+                col = encoder['column']
+                if folds < self.cv:
+                    logger.warning(f"Only {len(df)} rows to target encode '{col}' out of {self.cv} folds, leaving one row out per fold")
+                encoded[col] = target_encode_out_of_fold(df[col], df[target], encoder, cv=folds, smoothing=self.smoothing)
+                logger.info(f"Target encoded column '{col}' out of {folds} folds")
+        return encoded
 
-        elif method == 'log_powertransformer':
-            X_log = np.log1p(X)
-            transformer = PowerTransformer(method='yeo-johnson')
-            return transformer.fit_transform(X_log)
+    def _scale_group(self, group: dict, df: pd.DataFrame) -> dict:
+        """
+        Applies one method group to the columns of it present in `df`.
 
-        else:
-            raise ValueError(f"Unknown method: {method}")
-    
-    def transform(self, df):
-        column_details = self.metadata['columns']
-        target = self.metadata['target_column']
-        
-        # NUMERIC TRANSFORMATION
-        for column in df.select_dtypes(include=[np.number]).columns:
-            if self.normalize_numeric:
-                method = self.normalize_numeric
+        Returns:
+            dict: {column: scaled values}
+        """
+        index = [i for i, col in enumerate(group['columns']) if col in df.columns]
+        if not index:
+            return {}
+        columns = [group['columns'][i] for i in index]
+        params = {name: value[..., index] for name, value in group['params'].items()}
+        X = apply_method(group['method'], self._block(df, columns), params)
+        logger.info(f"Applied {group['method']} to columns {columns}")
+        return {col: X[:, i] for i, col in enumerate(columns)}
+
+    def _scale(self, df: pd.DataFrame) -> pd.DataFrame:
+        for group in self.groups:        #type: ignore
+            for col, values in self._scale_group(group, df).items():
+                df[col] = values
+        return df
+
+    def _encode(self, df: pd.DataFrame, out_of_fold: Optional[dict] = None):
+        """
+        Encodes the categorical columns. Frequency and single-column target encodings
+        replace their column; the other encoders drop it and return their output.
+        `out_of_fold` holds target encodings to use instead of the fitted tables.
+
+        Returns:
+            tuple: (df, blocks) where blocks is a list of (names, matrix), sparse for
+            one-hot and hashing, dense for per-class target encodings.
+        """
+        blocks, expanded = [], []
+        for encoder in self.encoders:        #type: ignore
+            col = encoder['column']
+            if col not in df.columns:
+                continue
+            codes = encoder_codes(encoder['encoder'], df[col], encoder)
+            if encoder['encoder'] in SPARSE_ENCODERS:
+                blocks.append((encoder['names'], sparse_block(codes, len(encoder['names']))))
+                expanded.append(col)
+                logger.info(f"Applied {encoder['encoder']} encoder to column '{col}'")
+                continue
+            values = out_of_fold[col] if out_of_fold and col in out_of_fold else encoder_lookup(encoder)[codes]
+            if encoder['names']:
+                blocks.append((encoder['names'], values.astype(self.dtype)))
+                expanded.append(col)
             else:
-                method = self.stratergy[column] if (column in self.stratergy) else column_details[column]['normalization']
-            df[column] = self.apply_transformation(X=df[column], method=method)
-
-        # CATEGORICAL TRANSFORMATION
-        categorical_columns = df.select_dtypes(exclude=[np.number]).columns
-        categorical_columns.pop(target)
-
-        columns_to_transform = []
-        text_normalize_column = []
-        for column in columns_to_transform:
-            if column_details[column]['text_type'] == 'Nominal/Ordinal_Data':
-                columns_to_transform.append(column)
+                df[col] = values[:, 0].astype(self.dtype)
+            logger.info(f"Applied {encoder['encoder']} encoder to column '{col}'")
+        if expanded:
+            df = df.drop(columns=expanded)
+        return df, blocks
+
+    def _encode_target(self, df: pd.DataFrame) -> pd.DataFrame:
+        target = self.metadata.get('target_column')
+        if self.classes is not None and target in df.columns:
+            codes = pd.Categorical(df[target], categories=self.classes).codes.astype(np.int64)
+            unseen = int(((codes == -1) & df[target].notna().to_numpy()).sum())
+            if unseen:
+                logger.warning(f"{unseen} values of target '{target}' were not seen during fitting, encoded as -1.")
+            df[target] = codes
+        return df
+
+    def _finish(self, df: pd.DataFrame, out_of_fold: Optional[dict] = None) -> pd.DataFrame:
+        """
+        Encodes the categorical columns and the target of a scaled frame.
+        """
+        df, blocks = self._encode(df, out_of_fold)
+        frames = []
+        for names, block in blocks:
+            if isinstance(block, np.ndarray):
+                frames.append(pd.DataFrame(block, index=df.index, columns=names))
             else:
-                text_normalize_column.append(column)
-        
-        # df = text_normalizer(df, text_normalize_column)
-        df = pd.get_dummies(df, columns=columns_to_transform)
-
-        # TARGET NORMALIZATION
-        label_encoder = LabelEncoder()
-        if column_details[target]['dtype'] == 'categorical_columns':
-            df[target] = label_encoder.fit_transform(df[target])
-            self.labelencoder = label_encoder
-
-        return df
\ No newline at end of file
+                frames.append(pd.DataFrame.sparse.from_spmatrix(block, index=df.index, columns=names))
+        if frames:
+            df = pd.concat([df] + frames, axis=1)
+        return self._encode_target(df)
+
+    def tasks(self, df: pd.DataFrame):
+        """
+        Tasks for the pipeline scheduler, or None if not fitted: one column task
+        per method group, then encoding as a barrier since it adds and drops columns.
+        """
+        if self.groups is None:
+            return None
+        tasks = []
+        for group in self.groups:
+            columns = [col for col in group['columns'] if col in df.columns]
+            if columns:
+                tasks.append((group['method'], partial(self._scale_group, group), columns, columns))
+        tasks.append(('encode', self._finish, None, None))
+        return tasks
+
+    def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Normalizes every method group in one pass, encodes categorical columns and
+        label-encodes the target with the fitted parameters, or with parameters
+        learned from `df` if not fitted. Target labels not seen during fitting become -1.
+        """
+        fitted = self.groups is not None
+        if not fitted:
+            self.fit(df)
+        out_of_fold = None if fitted else self._out_of_fold(df)
+        df = self._finish(self._scale(df), out_of_fold)
+        if not fitted:
+            self.groups, self.encoders, self.classes = None, None, None
+        return df
+
+    def transform_sparse(self, df: pd.DataFrame):
+        """
+        Like `transform`, but returns the features as one CSR matrix without building
+        dense or sparse DataFrame columns for the encoded blocks. Columns that are
+        still not numeric (free text, dates) are left out.
+
+        Returns:
+            tuple: (X, y, feature_names) with X a scipy.sparse.csr_matrix, y the encoded
+            target as an array (None without a target column) and the names of X's columns.
+        """
+        from scipy import sparse
+        fitted = self.groups is not None
+        if not fitted:
+            self.fit(df)
+        out_of_fold = None if fitted else self._out_of_fold(df)
+        df, blocks = self._encode(self._scale(df), out_of_fold)
+        df = self._encode_target(df)
+        target = self.metadata.get('target_column')
+        y = df[target].to_numpy() if target in df.columns else None
+        features = [col for col in df.columns if col != target]
+        numeric = [col for col in features if pd.api.types.is_numeric_dtype(df[col].dtype)]
+        skipped = [col for col in features if col not in numeric]
+        if skipped:
+            logger.warning(f"Columns {skipped} are not numeric and are left out of the sparse matrix.")
+        parts = [sparse.csr_matrix(df[numeric].to_numpy(dtype=self.dtype, na_value=np.nan))]
+        parts += [sparse.csr_matrix(block, dtype=self.dtype) for _, block in blocks]
+        names = numeric + [name for names, _ in blocks for name in names]
+        if not fitted:
+            self.groups, self.encoders, self.classes = None, None, None
+        X = sparse.hstack(parts, format='csr')
+        logger.info(f"Sparse matrix of shape {X.shape} with {X.nnz} stored values")
+        return X, y, names
+
+    def get_state(self) -> dict:
+        return {
+            'stratergy': dict(self.stratergy),
+            'normalize_numeric': self.normalize_numeric,
+            'normalize_categoric': self.normalize_categoric,
+            'float32': self.float32,
+            'hash_width': self.hash_width,
+            'smoothing': self.smoothing,
+            'cv': self.cv,
+            'groups': self.groups,
+            'encoders': self.encoders,
+            'classes': self.classes
+        }
+
+    @classmethod
+    def from_state(cls, state: dict, metadata: dict = {}) -> 'Normalizer':
+        normalizer = cls(metadata=metadata, stratergy=state['stratergy'], normalize_numeric=state['normalize_numeric'],
+                         normalize_categoric=state['normalize_categoric'], float32=state['float32'],
+                         hash_width=state.get('hash_width', 32), smoothing=state.get('smoothing', 10.0),
+                         cv=state.get('cv', 5))
+        normalizer.groups = state['groups']
+        normalizer.encoders = state.get('encoders', [])
+        normalizer.classes = state['classes']
+        return normalizer
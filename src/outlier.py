@@ -28,31 +28,53 @@ class Outlier:
 		"IQR", "Z-score", "Percentile", "Modified Z-score", "Range-based", "MAD", "Log-space IQR"
 	method_map : dict, optional
 		Manual mapping of column names to outlier detection methods.
+	mode : str, default='drop'
+		'drop' removes outlier rows. 'flag' keeps the frame as is and stores the
+		combined row mask in `outlier_mask`; see also `flag()`.
+	independent : bool, default=False
+		Compute every column's bounds on the full input instead of on the rows
+		left by the previous columns. Columns then no longer depend on each
+		other's drops and are fitted together in one vectorized pass.
 
 	Methods
 	-------
 	transform(df: pd.DataFrame) -> pd.DataFrame
 		Applies the specified outlier detection methods and removes outliers in-place.
 
+	fit(df: pd.DataFrame) -> Outlier
+		Learns per-column bounds without modifying the DataFrame.
+	flag(df: pd.DataFrame, per_column=False) -> pd.Series | pd.DataFrame
+		Returns the combined outlier mask or per-column outlier bitmaps.
+	fit_stream(chunks) -> Outlier
+		Learns bounds from chunks with quantile sketches, see `partial_fit`.
+
 	Internal Detection Methods
 	--------------------------
-	_IQR(df, col)                  : Interquartile Range method.
-	_zscore(df, col)               : Standard Z-score.
-	_percentile(df, col)           : 1st and 99th percentile filter.
-	_modified_zscore(df, col)      : Median and MAD-based Z-score.
-	_range_based(df, col)          : Removes min and max values.
-	_mad(df, col)                  : Median Absolute Deviation method.
-	_logspace_IQR(df, col)         : IQR on log-transformed values (positive data only).
+	Each method takes a column and returns (lower, upper, inclusive) bounds,
+	or None when the method does not apply.
+
+	_IQR(series)                   : Interquartile Range method.
+	_zscore(series)                : Standard Z-score.
+	_percentile(series)            : 1st and 99th percentile filter.
+	_modified_zscore(series)       : Median and MAD-based Z-score.
+	_range_based(series)           : Removes min and max values.
+	_mad(series)                   : Median Absolute Deviation method.
+	_logspace_IQR(series)          : IQR on log-transformed values (positive data only).
 
 	Notes
 	-----
 	- Only numeric (float64, int64) columns are processed.
 	- Non-positive columns are skipped in log-based methods.
 	- Logging is handled via `outlier.log`.
-	- Modifies the DataFrame in-place.
+	- Rows are removed with a single selection after all masks are combined.
 	"""
 
-	def __init__(self, metadata: Optional[dict] = None, method_to_all='', method_maps={}):
+	MODES = ('drop', 'flag')
+
+	def __init__(self, metadata: Optional[dict] = None, method_to_all='', method_maps={}, mode: str = 'drop', independent: bool = False,
+				 quantile_k: int = 200):
+		if mode not in self.MODES:
+			raise ValueError(f"Unknown mode '{mode}', expected one of {self.MODES}")
 		self.method_map = {
 			"IQR": "_IQR",
 			"Z-score": "_zscore",
@@ -65,112 +87,358 @@ class Outlier:
 		self.metadata = metadata if metadata else {}
 		self.method_to_all = self._check_method(method_to_all, key=False)
 		self.method_map_to_column = method_maps
+		self.mode = mode
+		self.independent = independent
+		self.bounds = None
+		self.outlier_mask = None
+		self.quantile_k = quantile_k
+		self._sketches = None
 
+	@property
+	def transform_changes_data(self) -> bool:
+		"""
+		Whether `transform` changes the frame. In 'flag' mode it only stores the
+		mask, so streamed fitting of later components can share this one's pass.
+		"""
+		return self.mode != 'flag'
 
-	def _IQR(self, df: pd.DataFrame, col: str):
-		Q1 = df[col].quantile(0.25)
-		Q3 = df[col].quantile(0.75)
+	def _IQR(self, series: pd.Series):
+		Q1 = series.quantile(0.25)
+		Q3 = series.quantile(0.75)
 		IQR = Q3 - Q1
-		lower_bound = Q1 - 1.5 * IQR
-		upper_bound = Q3 + 1.5 * IQR
-		outliers = df[(df[col] < lower_bound) | (df[col] > upper_bound)]
-		if not outliers.empty:
-			logger.info(f"Warning: Found {len(outliers)} outliers in column '{col}' (IQR). Dropping them.")
-			df.drop(outliers.index, inplace=True)
-		return df
+		return Q1 - 1.5 * IQR, Q3 + 1.5 * IQR, False
 
-	def _zscore(self, df: pd.DataFrame, col: str):
-		z_scores = (df[col] - df[col].mean()) / df[col].std()
-		outliers = df[abs(z_scores) > 3]
-		if not outliers.empty:
-			logger.info(f"Warning: Found {len(outliers)} outliers in column '{col}' (Z-score). Dropping them.")
-			df.drop(outliers.index, inplace=True)
-		return df
+	def _zscore(self, series: pd.Series):
+		mean, std = series.mean(), series.std()
+		return mean - 3 * std, mean + 3 * std, False
 
-	def _percentile(self, df: pd.DataFrame, col: str):
-		lower = df[col].quantile(0.01)
-		upper = df[col].quantile(0.99)
-		outliers = df[(df[col] < lower) | (df[col] > upper)]
-		if not outliers.empty:
-			logger.info(f"Warning: Found {len(outliers)} outliers in column '{col}' (Percentile). Dropping them.")
-			df.drop(outliers.index, inplace=True)
-		return df
+	def _percentile(self, series: pd.Series):
+		return series.quantile(0.01), series.quantile(0.99), False
 
-	def _modified_zscore(self, df: pd.DataFrame, col: str):
-		median = df[col].median()
-		mad = np.median(np.abs(df[col] - median))
+	def _modified_zscore(self, series: pd.Series):
+		median = series.median()
+		mad = np.median(np.abs(series - median))
 		if mad == 0:
-			return df
-		mzs = 0.6745 * (df[col] - median) / mad #type: ignore
-		outliers = df[abs(mzs) > 3.5]
-		if not outliers.empty:
-			logger.info(f"Warning: Found {len(outliers)} outliers in column '{col}' (Modified Z-score). Dropping them.")
-			df.drop(outliers.index, inplace=True)
-		return df
+			return None
+		# |0.6745 * (x - median) / mad| > 3.5
+		return median - 3.5 * mad / 0.6745, median + 3.5 * mad / 0.6745, False
 
-	def _range_based(self, df: pd.DataFrame, col: str):
-		min_val = df[col].min()
-		max_val = df[col].max()
-		outliers = df[(df[col] == min_val) | (df[col] == max_val)]
-		if not outliers.empty:
-			logger.info(f"Warning: Found {len(outliers)} outliers in column '{col}' (Range-based). Dropping them.")
-			df.drop(outliers.index, inplace=True)
-		return df
+	def _range_based(self, series: pd.Series):
+		# The extreme values themselves are the outliers
+		return series.min(), series.max(), True
 
-	def _mad(self, df: pd.DataFrame, col: str):
-		median = df[col].median()
-		mad = np.median(np.abs(df[col] - median))
-		lower = median - 3 * mad
-		upper = median + 3 * mad
-		outliers = df[(df[col] < lower) | (df[col] > upper)]
-		if not outliers.empty:
-			logger.info(f"Warning: Found {len(outliers)} outliers in column '{col}' (MAD). Dropping them.")
-			df.drop(outliers.index, inplace=True)
-		return df
+	def _mad(self, series: pd.Series):
+		median = series.median()
+		mad = np.median(np.abs(series - median))
+		return median - 3 * mad, median + 3 * mad, False
 
-	def _logspace_IQR(self, df: pd.DataFrame, col: str):
-		if (df[col] <= 0).any():
-			logger.info(f"Warning: Column '{col}' contains non-positive values. Skipping log-space IQR.")
-			return df
-		log_col = np.log(df[col])
+	def _logspace_IQR(self, series: pd.Series):
+		if (series <= 0).any():
+			logger.info(f"Warning: Column '{series.name}' contains non-positive values. Skipping log-space IQR.")
+			return None
+		log_col = np.log(series)
 		Q1 = log_col.quantile(0.25)             #type: ignore
 		Q3 = log_col.quantile(0.75)             #type: ignore
 		IQR = Q3 - Q1
-		lower_bound = np.exp(Q1 - 1.5 * IQR)
-		upper_bound = np.exp(Q3 + 1.5 * IQR)
-		outliers = df[(df[col] < lower_bound) | (df[col] > upper_bound)]
-		if not outliers.empty:
-			logger.info(f"Warning: Found {len(outliers)} outliers in column '{col}' (Log-space IQR). Dropping them.")
-			df.drop(outliers.index, inplace=True)
-		return df
+		return np.exp(Q1 - 1.5 * IQR), np.exp(Q3 + 1.5 * IQR), False
+
+	def _outlier_mask(self, series: pd.Series, bounds) -> pd.Series:
+		lower, upper, inclusive = bounds
+		if inclusive:
+			return (series <= lower) | (series >= upper)
+		return (series < lower) | (series > upper)
 
 	def _check_method(self, method: str, key: bool = True) -> str:
 		if method not in self.method_map:
 			method = 'IQR' if not key else self.method_to_all 
 		return method
-	
-	def transform(self, df: pd.DataFrame) -> pd.DataFrame:
-		columns_details = self.metadata.get('columns', {})
-		count = len(df)
 
+	def _column_methods(self) -> dict:
+		"""
+		Resolves the detection method of every column that should be checked.
+		"""
+		columns_details = self.metadata.get('columns', {})
+		methods = {}
 		for col in columns_details.keys():
-			if col == self.metadata.get('target_column') or columns_details[col]['dtype'] == 'categorical_columns':
-				logger.info(f"{col} is {columns_details[col]['dtype']} or Target Column so skipping it")
+			if col == self.metadata.get('target_column') or columns_details[col].get('dtype') != 'numeric_columns':
+				logger.info(f"{col} is {columns_details[col].get('dtype')} or Target Column so skipping it")
 				continue
 
 			elif self.method_map_to_column and col in self.method_map_to_column:
-				method_name = self._check_method(self.method_map_to_column[col])
+				methods[col] = self._check_method(self.method_map_to_column[col])
 			else:
 				col_meta = columns_details.get(col, {})
 				outlier_method = col_meta.get('outlier_detection', self.method_to_all)
-				method_name = self._check_method(outlier_method)
+				methods[col] = self._check_method(outlier_method)
+		return methods
+
+	def _vector_bounds(self, method_name: str, X: np.ndarray):
+		"""
+		Computes the bounds of every column of a 2-D float array with one NumPy pass
+		per statistic. Returns (lower, upper, inclusive, valid) arrays, one entry per column.
+		"""
+		k = X.shape[1]
+		valid = np.ones(k, dtype=bool)
+		inclusive = np.zeros(k, dtype=bool)
+		with np.errstate(all='ignore'):
+			if method_name == 'IQR':
+				q1, q3 = np.nanquantile(X, [0.25, 0.75], axis=0)
+				lower, upper = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+			elif method_name == 'Z-score':
+				mean, std = np.nanmean(X, axis=0), np.nanstd(X, axis=0, ddof=1)
+				lower, upper = mean - 3 * std, mean + 3 * std
+			elif method_name == 'Percentile':
+				lower, upper = np.nanquantile(X, [0.01, 0.99], axis=0)
+			elif method_name in ('Modified Z-score', 'MAD'):
+				median = np.nanmedian(X, axis=0)
+				# Same as the per-column methods: a gap in the column leaves MAD undefined
+				mad = np.median(np.abs(X - median), axis=0)
+				width = 3.5 * mad / 0.6745 if method_name == 'Modified Z-score' else 3 * mad
+				lower, upper = median - width, median + width
+				if method_name == 'Modified Z-score':
+					valid = mad != 0
+			elif method_name == 'Range-based':
+				lower, upper = np.nanmin(X, axis=0), np.nanmax(X, axis=0)
+				inclusive[:] = True
+			elif method_name == 'Log-space IQR':
+				valid = ~(X <= 0).any(axis=0)
+				q1, q3 = np.nanquantile(np.log(np.where(X > 0, X, np.nan)), [0.25, 0.75], axis=0)
+				lower, upper = np.exp(q1 - 1.5 * (q3 - q1)), np.exp(q3 + 1.5 * (q3 - q1))
+			else:
+				raise ValueError(f"Unknown outlier method: {method_name}")
+		return lower, upper, inclusive, valid
+
+	def fit(self, df: pd.DataFrame, rows: Optional[np.ndarray] = None, columns: Optional[list] = None) -> 'Outlier':
+		"""
+		Learns the outlier bounds of every checked column.
+
+		By default columns are processed in order and each one's bounds are computed
+		on the rows that survive the previous columns, exactly as sequential removal
+		would. With `independent=True` every column's bounds come from the full
+		input, so all columns sharing a method are fitted in one vectorized pass.
+		`rows` (boolean mask) and `columns` optionally restrict the fit to part of `df`.
+		"""
+		columns = df.columns if columns is None else columns
+		methods = {col: method for col, method in self._column_methods().items() if col in columns}
+		self.bounds = {}
+		if self.independent:
+			by_method = {}
+			for col, method_name in methods.items():
+				by_method.setdefault(method_name, []).append(col)
+			for method_name, cols in by_method.items():
+				logger.info(f"{cols} are numeric_columns... Executing {method_name} on all of them at once.....")
+				X = df[cols].to_numpy(dtype=np.float64, na_value=np.nan)
+				if rows is not None:
+					X = X[rows]
+				lower, upper, inclusive, valid = self._vector_bounds(method_name, X)
+				for i, col in enumerate(cols):
+					if not valid[i]:
+						if method_name == 'Log-space IQR':
+							logger.info(f"Warning: Column '{col}' contains non-positive values. Skipping log-space IQR.")
+						continue
+					self.bounds[col] = (method_name, float(lower[i]), float(upper[i]), bool(inclusive[i]))
+			# Keep the column order of the metadata
+			self.bounds = {col: self.bounds[col] for col in methods if col in self.bounds}
+			return self
 
-			logger.info(f"{col} is {columns_details[col]['dtype']}... Executing {method_name}.....")
-			method_func = getattr(self, self.method_map[method_name])
-			df = method_func(df, col)
-	
+		keep = pd.Series(True if rows is None else rows, index=df.index)
+		for col, method_name in methods.items():
+			logger.info(f"{col} is numeric_columns... Executing {method_name}.....")
+			series = df.loc[keep, col]
+			bounds = getattr(self, self.method_map[method_name])(series)
+			if bounds is None:
+				continue
+			self.bounds[col] = (method_name, *bounds)
+			keep &= ~self._outlier_mask(df[col], bounds)
+		return self
+
+	def partial_fit(self, df: pd.DataFrame) -> 'Outlier':
+		"""
+		Phase one of streamed fitting: adds a chunk to per-column sketches.
+
+		Quantile methods keep a KLL sketch (of the log values for log-space IQR),
+		Z-score and range-based keep running moments, so memory does not grow with
+		the number of rows. Call `finish_fit` after the last chunk.
+		"""
+		from Utilities.sketches import KLLSketch, RunningMoments
+		if self._sketches is None:
+			self._sketches = {}
+		for col, method_name in self._column_methods().items():
+			if col not in df.columns:
+				continue
+			if col not in self._sketches:
+				self._sketches[col] = (method_name, KLLSketch(self.quantile_k, seed=0), RunningMoments())
+			_, quantiles, moments = self._sketches[col]
+			values = df[col].to_numpy(dtype=np.float64, na_value=np.nan)
+			moments.update(values)
+			if method_name == 'Log-space IQR':
+				with np.errstate(all='ignore'):
+					quantiles.update(np.log(np.where(values > 0, values, np.nan)))
+			elif method_name not in ('Z-score', 'Range-based'):
+				quantiles.update(values)
+		return self
+
+	def finish_fit(self) -> 'Outlier':
+		"""
+		Phase two of streamed fitting: turns the sketches into fixed bounds, which
+		`transform` then applies to every chunk. Every column is fitted on all rows,
+		as with `independent=True`, and gaps are ignored.
+		"""
+		self.bounds = {}
+		for col, (method_name, quantiles, moments) in (self._sketches or {}).items():
+			if not moments.count:
+				continue
+			if method_name in ('IQR', 'Log-space IQR'):
+				if method_name == 'Log-space IQR' and moments.min <= 0:
+					logger.info(f"Warning: Column '{col}' contains non-positive values. Skipping log-space IQR.")
+					continue
+				q1, q3 = quantiles.quantile([0.25, 0.75])
+				lower, upper = q1 - 1.5 * (q3 - q1), q3 + 1.5 * (q3 - q1)
+				if method_name == 'Log-space IQR':
+					lower, upper = np.exp(lower), np.exp(upper)
+			elif method_name == 'Z-score':
+				lower, upper = moments.mean - 3 * moments.std(), moments.mean + 3 * moments.std()
+			elif method_name == 'Percentile':
+				lower, upper = quantiles.quantile([0.01, 0.99])
+			elif method_name == 'Range-based':
+				lower, upper = moments.min, moments.max
+			else:
+				median = quantiles.quantile(0.5)
+				mad = quantiles.deviation_quantile(median)
+				if method_name == 'Modified Z-score' and mad == 0:
+					continue
+				width = 3.5 * mad / 0.6745 if method_name == 'Modified Z-score' else 3 * mad
+				lower, upper = median - width, median + width
+			self.bounds[col] = (method_name, float(lower), float(upper), method_name == 'Range-based')
+			logger.info(f"Streamed {method_name} bounds of '{col}' from {moments.count} values: [{float(lower)}, {float(upper)}]")
+		self._sketches = None
+		return self
+
+	def fit_stream(self, chunks) -> 'Outlier':
+		"""
+		Learns bounds from an iterable of DataFrames in one pass with bounded memory.
+		"""
+		self._sketches = None
+		for chunk in chunks:
+			self.partial_fit(chunk)
+		return self.finish_fit()
+
+	def _flags(self, df: pd.DataFrame, cols: list) -> np.ndarray:
+		"""
+		Outlier bitmap of the fitted columns `cols`, shape (rows, len(cols)).
+		"""
+		if not cols:
+			return np.zeros((len(df), 0), dtype=bool)
+		X = df[cols].to_numpy(dtype=np.float64, na_value=np.nan)
+		lower = np.array([self.bounds[col][1] for col in cols])		#type: ignore
+		upper = np.array([self.bounds[col][2] for col in cols])		#type: ignore
+		inclusive = np.array([self.bounds[col][3] for col in cols])	#type: ignore
+		with np.errstate(invalid='ignore'):
+			return np.where(inclusive, (X <= lower) | (X >= upper), (X < lower) | (X > upper))
+
+	def select(self, df: pd.DataFrame, rows: Optional[np.ndarray] = None, columns: Optional[list] = None) -> tuple:
+		"""
+		Copy-free `transform` used by the pipeline's lazy mode.
+
+		Looks only at the selected `rows` (boolean mask) and `columns` of `df`
+		and returns the new selection instead of a filtered frame. In 'flag'
+		mode the rows are kept and the mask is stored in `self.outlier_mask`.
+
+		Returns:
+			tuple: (columns, rows) still selected after outlier removal.
+		"""
+		columns = list(df.columns) if columns is None else columns
+		rows = np.ones(len(df), dtype=bool) if rows is None else rows
+		fitted = self.bounds is not None
+		if not fitted:
+			self.fit(df, rows=rows, columns=columns)
+		cols = [col for col in self.bounds if col in columns]		#type: ignore
+		flags = self._flags(df, cols) & rows[:, None]
+		counts = flags.sum(axis=0)
+		for i, col in enumerate(cols):
+			if counts[i]:
+				logger.info(f"Warning: Found {int(counts[i])} outliers in column '{col}' ({self.bounds[col][0]}).")	#type: ignore
+		if not fitted:
+			self.bounds = None
+		mask = flags.any(axis=1)
+		if self.mode == 'flag':
+			self.outlier_mask = pd.Series(mask, index=df.index)
+			logger.info(f"Outlier flagging completed. Total flagged rows {int(mask.sum())}")
+			return columns, rows
+		logger.info(f"Outlier detection and removal completed. Total Removed rows {int(mask.sum())}")
+		return columns, rows & ~mask
+
+	def flag(self, df: pd.DataFrame, per_column: bool = False):
+		"""
+		Marks outliers without copying or modifying the DataFrame.
+
+		All fitted bounds are checked in one vectorized comparison over the
+		columns' 2-D array. Learns the bounds from `df` first if not fitted.
+
+		Returns:
+			pd.Series of bool: True for rows that are outliers in any column, or
+			pd.DataFrame of bool: one outlier bitmap per checked column if `per_column`.
+		"""
+		fitted = self.bounds is not None
+		if not fitted:
+			self.fit(df)
+		cols = [col for col in self.bounds if col in df.columns]		#type: ignore
+		flags = self._flags(df, cols)
+		if not fitted:
+			self.bounds = None
+		if per_column:
+			return pd.DataFrame(flags, index=df.index, columns=cols)
+		return pd.Series(flags.any(axis=1), index=df.index)
+
+	def transform(self, df: pd.DataFrame) -> pd.DataFrame:
+		"""
+		Removes the rows outside the fitted bounds in a single selection, or in
+		'flag' mode stores the outlier mask in `self.outlier_mask` and returns `df` untouched.
+		Learns the bounds from `df` first if not fitted.
+		"""
+		fitted = self.bounds is not None
+		if not fitted:
+			self.fit(df)
+		flags = self.flag(df, per_column=True)
+		counts = flags.sum()
+		for col in flags.columns:
+			if counts[col]:
+				logger.info(f"Warning: Found {int(counts[col])} outliers in column '{col}' ({self.bounds[col][0]}).")	#type: ignore
+		if not fitted:
+			self.bounds = None
+		mask = flags.any(axis=1)
+		if self.mode == 'flag':
+			self.outlier_mask = mask
+			logger.info(f"Outlier flagging completed. Total flagged rows {int(mask.sum())}")
+			return df
+		count = len(df)
+		if mask.any():
+			df = df[~mask]
 		logger.info(f"Outlier detection and removal completed. Total Removed rows {count-len(df)}")
 		return df
-	
 
+	def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+		return self.fit(df).transform(df)
+
+	def get_state(self) -> dict:
+		"""
+		Returns the configuration and fitted bounds as plain Python values.
+		"""
+		return {
+			'method_to_all': self.method_to_all,
+			'method_maps': dict(self.method_map_to_column),
+			'mode': self.mode,
+			'independent': self.independent,
+			'quantile_k': self.quantile_k,
+			'bounds': {col: [method, float(lower), float(upper), bool(inclusive)]
+					   for col, (method, lower, upper, inclusive) in (self.bounds or {}).items()} if self.bounds is not None else None
+		}
 
+	@classmethod
+	def from_state(cls, state: dict, metadata: Optional[dict] = None) -> 'Outlier':
+		outlier = cls(metadata=metadata, method_to_all=state['method_to_all'], method_maps=state['method_maps'],
+					  mode=state.get('mode', 'drop'), independent=state.get('independent', False),
+					  quantile_k=state.get('quantile_k', 200))
+		if state['bounds'] is not None:
+			outlier.bounds = {col: tuple(bounds) for col, bounds in state['bounds'].items()}
+		return outlier
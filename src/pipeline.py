@@ -1,60 +1,169 @@
 import os
+import copy
 import json
+import pickle
 import logging
 import shutil
+import importlib
 import pandas as pd
-from loader import Loader
-from cleaner import Cleaner
-from analyzer import Analyzer
-from outlier import Outlier
-from imputer import Imputer
-from text_processor import TextProcessor
+from typing import Iterator
 from Utilities.logger import setup_logger
 logger = setup_logger(log_file='pipeline.log', __name__=__name__)
 
+ARTIFACT_VERSION = 1
+
+# Component name -> module defining it. Modules are imported the first time a
+# component is used, so heavy dependencies (scikit-learn, scipy, nltk) are only
+# loaded by the stages that need them.
+REGISTRY = {
+    'Loader': 'loader',
+    'Analyzer': 'analyzer',
+    'StreamingAnalyzer': 'analyzer',
+    'Compactor': 'compactor',
+    'Cleaner': 'cleaner',
+    'TextProcessor': 'text_processor',
+    'Outlier': 'outlier',
+    'Imputer': 'imputer',
+    'Normalizer': 'normalize',
+    'CompiledPipeline': 'compiled',
+    'Scheduler': 'scheduler',
+}
+# Components whose fitted state is stored in artifacts with get_state/from_state
+COMPONENTS = ('Cleaner', 'TextProcessor', 'Outlier', 'Imputer', 'Normalizer')
+
+
+def register_component(name: str, module: str):
+    """
+    Register a component class `name` defined in `module`, importable from `src`.
+    """
+    REGISTRY[name] = module
+
+
+def component_class(name: str):
+    """
+    Return the class of a registered component, importing its module on first use.
+    """
+    if name not in REGISTRY:
+        raise ValueError(f"Unknown component '{name}'. Register it with register_component().")
+    return getattr(importlib.import_module(REGISTRY[name]), name)
+
+# Pickled pipeline shared by the shards a batch worker process transforms
+_batch_template = None
+
+
+def _init_batch_worker(template: bytes):
+    global _batch_template
+    _batch_template = template
+
+
+def _transform_shard(path: str, encoding, output_dir, output_format: str) -> tuple:
+    """
+    Transforms one shard with a fresh copy of the batch pipeline, so no state
+    leaks between shards. Module level so it can run in a worker process.
+
+    Returns:
+        tuple: (path, DataFrame or written file, {'rows_in', 'rows_out', 'cleaning_stats'})
+    """
+    prep = pickle.loads(_batch_template)        #type: ignore
+    prep.metadata['cleaning_stats'] = {'columns_dropped': set(), 'rows_dropped': 0, 'duplicates_removed': 0}
+    df = prep._load(path, encoding=encoding)
+    rows_in = len(df)
+    df = prep._apply(df, owned=True)
+    stats = prep.metadata['cleaning_stats']
+    stats['columns_dropped'] = list(stats['columns_dropped'])
+    report = {'rows_in': rows_in, 'rows_out': len(df), 'cleaning_stats': stats}
+    if output_dir is None:
+        return path, df, report
+    name = os.path.splitext(os.path.basename(path))[0]
+    output = os.path.join(output_dir, f"{name}.{output_format}")
+    if output_format == 'parquet':
+        df.to_parquet(output)
+    else:
+        df.to_csv(output, index=False)
+    return path, output, report
+
+
 class Lazy_Prep:
     """
     Data preprocessing pipeline that encapsulates loading, imputing, and cleaning steps.
     """
 
-    def __init__(self, path, target_column='', config: bool = False):
+    def __init__(self, path, target_column='', config: bool = False, cache_dir=None):
         self.metadata: dict = {}
         self.filepath: str = path
+        self.cache_dir = cache_dir
         self.target_column: str = target_column
         self.pipeline: list = [] 
         self.config_parameters: dict = {}
+        self.fitted: bool = False
+        self.input_columns: list = []
+        self.profiler = None
+        self.compactor = None
+        self.lazy: bool = False
+        self.memory_budget = None
+        self.on_budget: str = 'raise'
+        self.spill_dir = None
+        self.scheduler = None
+        self.analyzed: bool = False
         if not config:
             self._default_pipeline()
 
         self.metadata['target_column'] = target_column
 
-    def add_cleaner(self, column_threshold=0.80, row_threshold=0.80):
+    def add_compactor(self, category_ratio=0.5, lossy_floats=False):
+        """
+        Shrink dtypes right after loading and analysis, before any other component runs.
+        """
+        self.compactor = component_class('Compactor')(metadata=self.metadata, category_ratio=category_ratio, lossy_floats=lossy_floats)
+        logger.info(f"Compactor added with category_ratio: {category_ratio}, lossy_floats: {lossy_floats}")
+
+    def add_cleaner(self, column_threshold=0.80, row_threshold=0.80, dedup_budget=64 * 2 ** 20, spill_dir=None):
         """
         Add a cleaner component to the pipeline.
+
+        `dedup_budget` bytes of row hashes are kept in memory for deduplication,
+        beyond that they are spilled to `spill_dir`.
         """
-        self.pipeline.append(Cleaner(self.metadata, column_threshold=column_threshold, row_threshold=row_threshold))
+        self.pipeline.append(component_class('Cleaner')(self.metadata, column_threshold=column_threshold, row_threshold=row_threshold,
+                                                        dedup_budget=dedup_budget, spill_dir=spill_dir))
         logger.info(f"Cleaner component added with column_threshold: {column_threshold}, row_threshold: {row_threshold}")
     
-    def add_outlier_detection(self, method_to_all='', method_map={}):
+    def add_outlier_detection(self, method_to_all='', method_map={}, quantile_k=200, mode='drop'):
         """
         Add an outlier detection component to the pipeline.
+        `quantile_k` sets the accuracy of the sketches used by `fit_stream`;
+        `mode='flag'` keeps outlier rows and only marks them, see `Outlier`.
         """
-        self.pipeline.append(Outlier(metadata=self.metadata, method_to_all=method_to_all, method_maps=method_map))
+        self.pipeline.append(component_class('Outlier')(metadata=self.metadata, method_to_all=method_to_all, method_maps=method_map,
+                                                        quantile_k=quantile_k, mode=mode))
         if method_map or method_to_all:
             logger.info(f"Outlier detection method {method_map} added to pipeline.")
 
-    def add_imputer(self, method_to_all_numeric='Mean', method_to_all_categorical='Mode', method_map={}):
+    def add_imputer(self, method_to_all_numeric='Mean', method_to_all_categorical='Mode', method_map={}, fallback=None):
         """
         Add an imputer component to the pipeline.
+        `fallback='mean'` lets `fit_stream` impute columns of model-based methods with the mean.
         """
-        self.pipeline.append(Imputer(metadata=self.metadata, method_to_all_numeric=method_to_all_numeric, method_to_all_categorical=method_to_all_categorical, method_maps=method_map))
+        self.pipeline.append(component_class('Imputer')(metadata=self.metadata, method_to_all_numeric=method_to_all_numeric, method_to_all_categorical=method_to_all_categorical, method_maps=method_map, fallback=fallback))
         logger.info(f"Imputer component added with method_to_all_numeric: {method_to_all_numeric}, method_to_all_categorical: {method_to_all_categorical}")
 
+    def add_normalizer(self, normalize_numeric='MinMaxScalar', normalize_categoric='OneHotEncoding', stratergy={}, float32=False, hash_width=32):
+        """
+        Add a normalizer component to the pipeline. Numeric columns are scaled with
+        parameters learned per method group; `normalize_numeric=''` uses the
+        Analyzer's suggested method for every column. Categorical columns are
+        encoded with `normalize_categoric` ('OneHotEncoding', 'hashing', 'frequency',
+        'target' or 'none') unless `stratergy` or the column metadata name another encoder.
+        """
+        self.pipeline.append(component_class('Normalizer')(metadata=self.metadata, stratergy=stratergy, normalize_numeric=normalize_numeric,
+                                                           normalize_categoric=normalize_categoric, float32=float32, hash_width=hash_width))
+        logger.info(f"Normalizer component added with normalize_numeric: {normalize_numeric}, normalize_categoric: {normalize_categoric}, float32: {float32}")
+
     def add_text_processor(self, text_data_columns=[]):
         """
         Add a text processor component to the pipeline.
         """
-        self.pipeline.append(TextProcessor(metadata=self.metadata, text_data_columns=text_data_columns))
+        self.pipeline.append(component_class('TextProcessor')(metadata=self.metadata, text_data_columns=text_data_columns))
         logger.info(f"TextProcessor component added with text_data_columns: {text_data_columns}")
 
     def add_component(self, component):
@@ -71,21 +180,542 @@ class Lazy_Prep:
         self.pipeline.append(component)
         logger.info(f"Component {component.__name__} added to pipeline.")
 
-    def transform(self, **kwargs) -> pd.DataFrame:
+    def enable_profiling(self, memory: bool = True, hooks=None, cprofile_path=None):
         """
-        Apply all components in the pipeline to the DataFrame.
+        Record wall time, CPU time, peak memory and shapes of every stage in `metadata['profile']`.
+
+        Parameters:
+            memory (bool): Trace peak memory with tracemalloc.
+            hooks (list): Callables receiving every stage record as it is taken.
+            cprofile_path (str): Dump a cProfile of each run to this path.
+        """
+        from Utilities.instrumentation import StageProfiler
+        self.profiler = StageProfiler(memory=memory, hooks=hooks, cprofile_path=cprofile_path)
+        logger.info(f"Profiling enabled with memory={memory}, cprofile_path={cprofile_path}")
+        return self.profiler
+
+    def disable_profiling(self):
+        """
+        Stop recording stage profiles.
         """
-        logger.info('logger.info(f"=================="Processing starts===================")')
-        df = Loader(self.filepath, self.metadata).transform()
-        Analyzer(self.metadata).analyze(df)
-        logger.info(f"Initial DataFrame loaded with shape: {df.shape}")
+        self.profiler = None
+
+    def set_memory_mode(self, lazy: bool = True, memory_budget=None, on_budget: str = 'raise', spill_dir=None):
+        """
+        Configure how `transform` and `transform_stream` hold data in memory.
+
+        Parameters:
+            lazy (bool): Row-dropping components (Cleaner, Outlier) only record the rows
+                and columns they keep, on the shared input. The selection is copied once,
+                right before the next component that modifies data, so at most one
+                materialized copy is alive at a time. A frame passed to `transform` is
+                never modified.
+            memory_budget (int): Bytes the pipeline's own frame may hold. Checked after
+                every copy and every modifying component.
+            on_budget (str): 'raise' raises `MemoryBudgetExceeded`; 'spill' first moves
+                numeric columns to memory-mapped files and only raises if that is not enough.
+            spill_dir (str): Directory of spill files, the system temp directory by default.
+        """
+        if on_budget not in ('raise', 'spill'):
+            raise ValueError(f"Unknown on_budget '{on_budget}', expected 'raise' or 'spill'")
+        self.lazy = lazy
+        self.memory_budget = memory_budget
+        self.on_budget = on_budget
+        self.spill_dir = spill_dir
+        logger.info(f"Memory mode set with lazy={lazy}, memory_budget={memory_budget}, on_budget={on_budget}")
+
+    def set_scheduler(self, workers=None, backend: str = 'thread'):
+        """
+        Run `transform` and `transform_stream` as a DAG of (stage, column group) tasks.
+
+        Column tasks of the TextProcessor, Imputer and Normalizer run concurrently
+        and overlap across stages when their columns allow it; row-dropping stages
+        and unfitted components run alone as barriers. Fitting stays sequential and
+        lazy memory mode does not use the scheduler.
+
+        Parameters:
+            workers (int): Pool size, all cores by default.
+            backend (str): 'thread' or 'process'; None turns scheduling off.
+        """
+        if backend is None:
+            self.scheduler = None
+            logger.info("Scheduler disabled")
+            return None
+        Scheduler = component_class('Scheduler')
+        self.scheduler = Scheduler(workers=workers, backend=backend)
+        logger.info(f"Scheduler set with {self.scheduler.workers} {backend} workers")
+        return self.scheduler
+
+    def _check_budget(self, df: pd.DataFrame, stage: str) -> pd.DataFrame:
+        if self.memory_budget is None:
+            return df
+        from Utilities.memory import MemoryBudgetExceeded, resident_bytes, spill
+        used = resident_bytes(df)
+        if used > self.memory_budget and self.on_budget == 'spill':
+            logger.warning(f"{stage} holds {used} bytes, over the budget of {self.memory_budget}. Spilling to disk.")
+            df = spill(df, self.spill_dir)
+            used = resident_bytes(df)
+        if used > self.memory_budget:
+            raise MemoryBudgetExceeded(stage, used, self.memory_budget)
+        return df
+
+    def _materialize(self, df: pd.DataFrame, rows, columns: list, owned: bool, stage: str) -> pd.DataFrame:
+        """
+        Copies the pending selection of `df`, or `df` itself if it is not owned by the pipeline.
+        """
+        if rows is None and len(columns) == len(df.columns):
+            if owned:
+                return df
+            df = df.copy()
+        elif rows is None:
+            df = df[columns]
+        else:
+            df = df.loc[rows, columns]
+        return self._check_budget(df, stage)
+
+    def _apply(self, df: pd.DataFrame, owned: bool = False, chunk=None) -> pd.DataFrame:
+        """
+        Runs the compactor and every component on `df`. `owned` tells whether the
+        pipeline created `df` and may modify it in lazy mode.
+        """
+        if not self.lazy:
+            df = self._compact(df, chunk=chunk)
+            if self.scheduler is not None:
+                df = self.scheduler.run(df, self.pipeline, lambda name, func, data: self._stage(name, 'transform', func, data, chunk=chunk))
+                return self._check_budget(df, 'Pipeline')
+            for component in self.pipeline:
+                name = component.__class__.__name__
+                logger.info(f"-----------------Applying component: {name}-------------------")
+                df = self._stage(name, 'transform', component.transform, df, chunk=chunk)
+            return self._check_budget(df, 'Pipeline')
+
+        rows, columns = None, list(df.columns)
+        components = ([self.compactor] if self.compactor is not None else []) + self.pipeline
+        for component in components:
+            name = component.__class__.__name__
+            logger.info(f"-----------------Applying component lazily: {name}-------------------")
+            if hasattr(component, 'select'):
+                columns, rows = self._stage(name, 'select', lambda data: component.select(data, rows=rows, columns=columns),
+                                            df, chunk=chunk)
+                continue
+            df = self._materialize(df, rows, columns, owned, name)
+            rows, columns, owned = None, list(df.columns), True
+            df = self._check_budget(self._stage(name, 'transform', component.transform, df, chunk=chunk), name)
+        return self._materialize(df, rows, columns, True, 'Pipeline')
+
+    def _stage(self, component: str, method: str, func, data=None, chunk=None):
+        if self.profiler is None:
+            return func() if data is None else func(data)
+        return self.profiler.call(component, method, func, data, chunk=chunk)
+
+    def _begin_profile(self, run: str):
+        if self.profiler is not None:
+            self.profiler.begin(run)
+
+    def _end_profile(self):
+        if self.profiler is not None:
+            records = self.profiler.end()
+            self.metadata['profile'] = {'run': self.profiler.run, 'stages': records, 'summary': self.profiler.summary()}
+
+    def _load(self, path, encoding=None) -> pd.DataFrame:
+        loader = component_class('Loader')(path, self.metadata, cache_dir=self.cache_dir, encoding=encoding)
+        return self._stage('Loader', 'transform', loader.transform)
+
+    def _compact(self, df: pd.DataFrame, fit: bool = False, chunk=None) -> pd.DataFrame:
+        if self.compactor is None:
+            return df
+        if fit:
+            return self._stage('Compactor', 'fit_transform', self.compactor.fit_transform, df, chunk=chunk)
+        return self._stage('Compactor', 'transform', self.compactor.transform, df, chunk=chunk)
+
+    def _analyze(self, df: pd.DataFrame, chunk=None):
+        if self.analyzed:
+            logger.info("Reusing the column metadata of analyze_stream()")
+            return
+        analyzer = component_class('Analyzer')(self.metadata, **{'cache_dir': self.cache_dir, **self.config_parameters.get('analyzer', {})})
+        self._stage('Analyzer', 'analyze', analyzer.analyze, df, chunk=chunk)
+
+    def analyze_stream(self, chunksize: int = 100_000, path=None, **options) -> dict:
+        """
+        Analyze the whole file in one sequential read with bounded memory.
+
+        Columns are profiled chunk by chunk with a `StreamingAnalyzer`, whose sketches
+        replace the in-memory nunique, mode and sampling of the Analyzer. Later
+        `fit`, `transform` and `transform_stream` calls reuse this metadata instead
+        of analyzing their data again.
+
+        Parameters:
+            chunksize (int): Rows read at a time.
+            path (str): File to analyze, the pipeline's file by default.
+            options: Sketch sizes and Analyzer settings passed to `StreamingAnalyzer`.
+
+        Returns:
+            dict: Per-column statistics of the file, see `StreamingAnalyzer.summary`.
+        """
+        loader = component_class('Loader')(path or self.filepath, self.metadata, cache_dir=self.cache_dir)
+        analyzer = component_class('StreamingAnalyzer')(self.metadata, **{'cache_dir': self.cache_dir,
+                                                                          **self.config_parameters.get('analyzer', {}), **options})
+        self._begin_profile('analyze_stream')
+        try:
+            self._stage('StreamingAnalyzer', 'analyze_chunks', analyzer.analyze_chunks, loader.transform_chunks(chunksize=chunksize))
+        finally:
+            self._end_profile()
+        self.analyzed = True
+        return analyzer.summary()
+
+    def fit(self, path=None) -> dict:
+        """
+        Learn column strategies and every component's statistics and models from a file.
+
+        Each component is fitted on the output of the previous ones, exactly as
+        `transform` would see the data. Afterwards `transform` only applies what
+        was learned, so new batches cannot leak into the statistics.
+
+        Returns:
+            dict: The fitted artifact, see `get_artifact`.
+        """
+        logger.info("==================Fitting starts===================")
+        self._begin_profile('fit')
+        try:
+            self._fit_frame(self._load(path or self.filepath))
+        finally:
+            self._end_profile()
+        logger.info("==================Fitting ends===================")
+        return self.get_artifact()
+
+    def _fit_frame(self, df: pd.DataFrame, chunk=None) -> pd.DataFrame:
+        """
+        Analyzes `df` and fits the compactor and every component on it in order,
+        each on the output of the previous ones. Marks the pipeline as fitted.
+
+        Returns:
+            pd.DataFrame: `df` transformed by the fitted pipeline.
+        """
+        self._analyze(df, chunk=chunk)
+        self.input_columns = df.columns.tolist()
+        df = self._compact(df, fit=True, chunk=chunk)
+        logger.info(f"Fitting on DataFrame with shape: {df.shape}")
         for component in self.pipeline:
-            logger.info(f"-----------------Applying component: {component.__class__.__name__}-------------------")
-            df = component.transform(df)
-            
-        logger.info('logger.info(f"==================Processing ends===================")')
+            name = component.__class__.__name__
+            logger.info(f"-----------------Fitting component: {name}-------------------")
+            if hasattr(component, 'fit_transform'):
+                df = self._stage(name, 'fit_transform', component.fit_transform, df, chunk=chunk)
+            else:
+                df = self._stage(name, 'transform', component.transform, df, chunk=chunk)
+        self.fitted = True
+        return df
+
+    def fit_stream(self, chunksize: int = 100_000) -> list:
+        """
+        Fit the pipeline on the whole file with bounded memory.
+
+        Components that learn chunk by chunk (`partial_fit`/`finish_fit`, e.g. the
+        Outlier's sketch-based bounds and the Imputer's statistics) see every
+        chunk. The file is read once per group of such components: a component
+        joins the previous one's pass when the components of that pass before it
+        leave the data unchanged (`transform_changes_data` is False, e.g. an
+        Outlier in 'flag' mode), otherwise it waits for their `finish_fit` and
+        takes the next pass. Every other component is fitted on the first chunk
+        that reaches it, as `transform_stream` would, and the pipeline is fitted
+        afterwards. Column analysis runs on the first chunk unless
+        `analyze_stream` was called. Cleaning stats are only counted on the first
+        pass, as `fit` counts them once.
+
+        Returns:
+            list: Names of the components fitted chunk by chunk.
+        """
+        logger.info(f"==================Streamed fitting starts (chunksize={chunksize})===================")
+        done = {id(component) for component in [self.compactor] + self.pipeline} if self.fitted else set()
+        pending = [position for position, component in enumerate(self.pipeline) if hasattr(component, 'partial_fit')]
+        fitted, passes = [], 0
+        self._begin_profile('fit_stream')
+        try:
+            while pending or not all(id(component) in done for component in self.pipeline):
+                group = pending[:1]
+                while group and pending[len(group):] and not any(getattr(self.pipeline[position], 'transform_changes_data', True)
+                                                                  for position in group):
+                    group.append(pending[len(group)])
+                pending = pending[len(group):]
+                names = [self.pipeline[position].__class__.__name__ for position in group]
+                logger.info(f"-----------------Streamed fitting pass {passes + 1}: {names or 'first chunk'}-------------------")
+                # Later passes replay the Cleaner on rows the first pass already counted
+                stats = copy.deepcopy(self.metadata.get('cleaning_stats')) if passes else None
+                try:
+                    self._fit_pass(group, done, chunksize)
+                finally:
+                    if stats is not None:
+                        self.metadata['cleaning_stats'] = stats
+                passes += 1
+                for position, name in zip(group, names):
+                    self._stage(name, 'finish_fit', self.pipeline[position].finish_fit)
+                    done.add(id(self.pipeline[position]))
+                    fitted.append(name)
+                if not group:
+                    break
+        finally:
+            self._end_profile()
+        self.fitted = True
+        logger.info(f"==================Streamed fitting ends: {fitted} in {passes} passes===================")
+        return fitted
+
+    def _fit_pass(self, group: list, done: set, chunksize: int):
+        """
+        One read of the file for `fit_stream`. Chunks go through the pipeline up to
+        the last position in `group`: components at those positions add the chunk
+        to their statistics, the others transform it, after being fitted on the
+        first chunk unless their id is in `done`. Without `group` only the first
+        chunk is read, to fit the components left.
+        """
+        end = group[-1] + 1 if group else len(self.pipeline)
+        components = self.pipeline[:end]
+        loader = component_class('Loader')(self.filepath, self.metadata, cache_dir=self.cache_dir)
+        streaming = [component for component in components if hasattr(component, 'begin_stream')]
+        for component in streaming:
+            component.begin_stream()
+        try:
+            for index, chunk in enumerate(loader.transform_chunks(chunksize=chunksize)):
+                if not self.fitted and not self.analyzed:
+                    self._analyze(chunk, chunk=index)
+                    self.analyzed = True
+                if not self.fitted and not self.input_columns:
+                    self.input_columns = chunk.columns.tolist()
+                chunk = self._compact(chunk, fit=id(self.compactor) not in done, chunk=index)
+                done.add(id(self.compactor))
+                for position, component in enumerate(components):
+                    name = component.__class__.__name__
+                    if position in group:
+                        self._stage(name, 'partial_fit', component.partial_fit, chunk, chunk=index)
+                    elif id(component) in done or not hasattr(component, 'fit_transform'):
+                        chunk = self._stage(name, 'transform', component.transform, chunk, chunk=index)
+                        done.add(id(component))
+                    else:
+                        chunk = self._stage(name, 'fit_transform', component.fit_transform, chunk, chunk=index)
+                        done.add(id(component))
+                if not group:
+                    break
+        finally:
+            for component in streaming:
+                component.end_stream()
+
+    def transform(self, df: pd.DataFrame = None, **kwargs) -> pd.DataFrame:       #type: ignore
+        """
+        Apply all components in the pipeline to the DataFrame.
+
+        Without `df`, the pipeline's file is loaded. An unfitted pipeline analyzes
+        and learns from the data it is given; a fitted one only applies its artifact.
+        """
+        logger.info("==================Processing starts===================")
+        self._begin_profile('transform')
+        try:
+            owned = df is None
+            if df is None:
+                df = self._load(self.filepath)
+            if not self.fitted:
+                self._analyze(df)
+            logger.info(f"Initial DataFrame loaded with shape: {df.shape}")
+            df = self._apply(df, owned=owned)
+        finally:
+            self._end_profile()
+
+        logger.info("==================Processing ends===================")
         return df
+
+    def get_artifact(self) -> dict:
+        """
+        Return the fitted pipeline as a versioned, picklable dictionary:
+        {'version', 'target_column', 'input_columns', 'metadata', 'compactor', 'components': [{'name', 'state'}]}.
+        Components without `get_state` are stored as objects.
+        """
+        if not self.fitted:
+            raise ValueError("Pipeline is not fitted yet. Call fit() first.")
+        components = []
+        for component in self.pipeline:
+            name = component.__class__.__name__
+            if name in COMPONENTS and hasattr(component, 'get_state'):
+                components.append({'name': name, 'state': component.get_state()})
+            else:
+                components.append({'name': name, 'object': component})
+        return {
+            'version': ARTIFACT_VERSION,
+            'target_column': self.target_column,
+            'input_columns': list(self.input_columns),
+            'metadata': copy.deepcopy({key: value for key, value in self.metadata.items() if key not in ('profile', 'batch_report')}),
+            'compactor': self.compactor.get_state() if self.compactor is not None else None,
+            'components': components
+        }
+
+    def save(self, path: str):
+        """
+        Pickle the fitted artifact to `path`.
+        """
+        with open(path, 'wb') as file:
+            pickle.dump(self.get_artifact(), file)
+        logger.info(f"Fitted pipeline saved to {path}")
+
+    @classmethod
+    def from_artifact(cls, artifact: dict, path: str = '') -> 'Lazy_Prep':
+        """
+        Rebuild a fitted pipeline from an artifact returned by `get_artifact`.
+        """
+        if artifact.get('version') != ARTIFACT_VERSION:
+            raise ValueError(f"Unsupported artifact version {artifact.get('version')}, expected {ARTIFACT_VERSION}")
+        prep = cls(path, target_column=artifact['target_column'], config=True)
+        prep.metadata.clear()
+        prep.metadata.update(copy.deepcopy(artifact['metadata']))
+        prep.input_columns = list(artifact.get('input_columns', []))
+        if artifact.get('compactor') is not None:
+            prep.compactor = component_class('Compactor').from_state(artifact['compactor'], metadata=prep.metadata)
+        for entry in artifact['components']:
+            if 'state' in entry:
+                prep.pipeline.append(component_class(entry['name']).from_state(entry['state'], metadata=prep.metadata))
+            else:
+                prep.pipeline.append(entry['object'])
+        prep.fitted = True
+        return prep
+
+    def compile(self, columns=None, memo_size: int = 100_000):
+        """
+        Compile the fitted pipeline into a `CompiledPipeline` for single records and micro-batches.
+        """
+        return component_class('CompiledPipeline')(self, columns=columns, memo_size=memo_size)
+
+    @classmethod
+    def load(cls, path: str, data_path: str = '') -> 'Lazy_Prep':
+        """
+        Load a fitted pipeline saved with `save`.
+        """
+        with open(path, 'rb') as file:
+            artifact = pickle.load(file)
+        logger.info(f"Fitted pipeline loaded from {path}")
+        return cls.from_artifact(artifact, path=data_path)
+
+    def transform_stream(self, chunksize: int = 100_000) -> Iterator[pd.DataFrame]:
+        """
+        Apply all components in the pipeline chunk by chunk.
+
+        The file is read in chunks of `chunksize` rows and every chunk is pushed
+        through the components before the next one is read, so peak memory is
+        bounded by the chunk size. Every chunk gets the same columns: an unfitted
+        pipeline is fitted on the first chunk, as `fit` would on a whole file,
+        and stays fitted, so the dropped columns, outlier bounds, fill values and
+        encodings learned there apply to the rest of the stream. Call `fit` or
+        `fit_stream` first to learn them from the whole file instead. Components
+        with `begin_stream` and `end_stream` hooks keep state across chunks, e.g.
+        the Cleaner removes duplicates across the whole file.
+        """
+        logger.info(f"==================Stream processing starts (chunksize={chunksize})===================")
+        loader = component_class('Loader')(self.filepath, self.metadata, cache_dir=self.cache_dir)
+        rows_in, rows_out = 0, 0
+        self._begin_profile('transform_stream')
+        streaming = [component for component in self.pipeline if hasattr(component, 'begin_stream')]
+        try:
+            for component in streaming:
+                component.begin_stream()
+            for index, chunk in enumerate(loader.transform_chunks(chunksize=chunksize)):
+                rows_in += len(chunk)
+                logger.info(f"Processing chunk {index} with shape: {chunk.shape}")
+                if not self.fitted:
+                    logger.info("Pipeline is not fitted, fitting it on the first chunk")
+                    chunk = self._fit_frame(chunk, chunk=index)
+                else:
+                    chunk = self._apply(chunk, owned=True, chunk=index)
+                rows_out += len(chunk)
+                yield chunk
+        finally:
+            for component in streaming:
+                component.end_stream()
+            self._end_profile()
+        logger.info(f"==================Stream processing ends: {rows_in} rows in, {rows_out} rows out===================")
     
+    def _sample(self, paths: list, sample_rows: int, sample_shards: int) -> pd.DataFrame:
+        """
+        Head rows of up to `sample_shards` shards spread evenly over `paths`, `sample_rows` in total.
+        """
+        step = max(1, len(paths) // sample_shards)
+        chosen = paths[::step][:sample_shards]
+        per_shard = max(1, sample_rows // len(chosen))
+        frames = []
+        for path in chosen:
+            loader = component_class('Loader')(path, self.metadata, cache_dir=self.cache_dir)
+            frames.append(next(iter(loader.transform_chunks(chunksize=per_shard)), None))
+        return pd.concat([frame for frame in frames if frame is not None], ignore_index=True)
+
+    def transform_many(self, paths: list, workers=None, output_dir=None, output_format: str = 'csv',
+                       sample_rows: int = 10_000, sample_shards: int = 8) -> Iterator[tuple]:
+        """
+        Transform many shards of the same schema in parallel worker processes.
+
+        Encoding detection runs once, on the first shard. An unfitted pipeline
+        analyzes one sample taken from several shards and reuses that metadata
+        for every shard; a fitted one applies its artifact. Each shard is then
+        transformed by its own copy of the pipeline, so components that learn from
+        their input (unfitted ones) learn per shard, and duplicates are only removed
+        within a shard. Shards are yielded as they finish, not in input order.
+
+        Parameters:
+            paths (list): CSV or Excel shards.
+            workers (int): Worker processes, all cores by default. 1 runs in this process.
+            output_dir (str): Write each shard to `<output_dir>/<name>.<output_format>`
+                instead of returning it, so outputs never travel back between processes.
+            output_format (str): 'csv' or 'parquet' (requires pyarrow).
+            sample_rows (int): Rows analyzed by an unfitted pipeline.
+            sample_shards (int): Shards the sample is taken from.
+
+        Yields:
+            tuple: (path, transformed DataFrame or written file). When all shards are done,
+            `metadata['batch_report']` holds the row counts and cleaning stats of every
+            shard and their totals.
+        """
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+        paths = list(paths)
+        if not paths:
+            return
+        if output_format not in ('csv', 'parquet'):
+            raise ValueError(f"Unknown output_format '{output_format}', expected 'csv' or 'parquet'")
+        if output_dir is not None:
+            os.makedirs(output_dir, exist_ok=True)
+        workers = min(workers or os.cpu_count() or 1, len(paths))
+        logger.info(f"==================Batch processing of {len(paths)} shards with {workers} workers starts===================")
+        encoding = component_class('Loader')(paths[0], {}).encoding
+        if not self.fitted:
+            self._analyze(self._sample(paths, sample_rows, sample_shards))
+        profiler, self.profiler = self.profiler, None
+        try:
+            template = pickle.dumps(self)
+        finally:
+            self.profiler = profiler
+
+        shards = {}
+        if workers == 1:
+            _init_batch_worker(template)
+            try:
+                for path in paths:
+                    path, result, shards[path] = _transform_shard(path, encoding, output_dir, output_format)
+                    logger.info(f"Shard {path} done: {shards[path]['rows_in']} rows in, {shards[path]['rows_out']} rows out")
+                    yield path, result
+            finally:
+                _init_batch_worker(None)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker, initargs=(template,)) as executor:
+                futures = [executor.submit(_transform_shard, path, encoding, output_dir, output_format) for path in paths]
+                try:
+                    for future in as_completed(futures):
+                        path, result, shards[path] = future.result()
+                        logger.info(f"Shard {path} done: {shards[path]['rows_in']} rows in, {shards[path]['rows_out']} rows out")
+                        yield path, result
+                finally:
+                    for future in futures:
+                        future.cancel()
+        report = {
+            'shards': len(shards),
+            'rows_in': sum(shard['rows_in'] for shard in shards.values()),
+            'rows_out': sum(shard['rows_out'] for shard in shards.values()),
+            'cleaning_stats': component_class('Cleaner').merge_stats([shard['cleaning_stats'] for shard in shards.values()]),
+            'per_shard': shards
+        }
+        self.metadata['batch_report'] = report
+        logger.info(f"==================Batch processing ends: {report['rows_in']} rows in, merged cleaning stats {report['cleaning_stats']}===================")
+
     def _default_pipeline(self):
         if 'cleaner' in self.config_parameters:
             self.add_cleaner(**self.config_parameters['cleaner'])
@@ -106,13 +736,21 @@ class Lazy_Prep:
             self.add_imputer(**self.config_parameters['imputer'])
         else:
             self.add_imputer(method_to_all_numeric='Mean', method_to_all_categorical='Mode')
+
+        if 'normalizer' in self.config_parameters:
+            self.add_normalizer(**self.config_parameters['normalizer'])
         logger.info("Default pipeline created with Cleaner, Outlier, Imputer, and TextProcessor components.")
 
 
-    def add_configurations(self, cleaner_config=None, outlier_config=None, imputer_config=None, text_processor_config=None, date_config=None):
+    def add_configurations(self, cleaner_config=None, outlier_config=None, imputer_config=None, text_processor_config=None, date_config=None, analyzer_config=None, compactor_config=None, normalizer_config=None):
         """
         Add configurations for the components in the pipeline.
         """
+        if analyzer_config:
+            self.config_parameters['analyzer'] = analyzer_config
+        if compactor_config:
+            self.config_parameters['compactor'] = compactor_config
+            self.add_compactor(**compactor_config)
         if cleaner_config:
             self.config_parameters['cleaner'] = cleaner_config
         if outlier_config:
@@ -123,6 +761,8 @@ class Lazy_Prep:
             self.config_parameters['text_processor'] = text_processor_config
         if date_config:
             self.config_parameters['date'] = date_config
+        if normalizer_config:
+            self.config_parameters['normalizer'] = normalizer_config
         logger.info(f"Configurations added: {self.config_parameters}")
 
     def load_metadata(self):
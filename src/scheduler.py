@@ -0,0 +1,187 @@
+import os
+import pandas as pd
+from typing import Optional
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from Utilities.logger import setup_logger
+
+logger = setup_logger(log_file='pipeline.log', __name__=__name__)
+
+
+class Task:
+    """
+    One unit of work of a pipeline stage.
+
+    A column task reads the columns `reads` and returns {column: values} for
+    columns in `writes`; it is given a frame holding only `reads`. A barrier
+    task (`reads=None`) is given the whole DataFrame and returns a new one, so
+    it may drop rows or change the columns.
+    """
+
+    def __init__(self, name: str, func, reads: Optional[list] = None, writes: Optional[list] = None):
+        self.name = name
+        self.func = func
+        self.reads = None if reads is None else list(reads)
+        self.writes = [] if writes is None else list(writes)
+        self.deps = set()
+
+    @property
+    def barrier(self) -> bool:
+        return self.reads is None
+
+    def __repr__(self):
+        return f"Task({self.name!r}, reads={self.reads}, writes={self.writes}, deps={sorted(self.deps)})"
+
+
+class TaskGraph:
+    """
+    DAG of tasks over the columns of one DataFrame.
+
+    Dependencies come from column hazards as tasks are added in program order:
+    a task waits for the last writer of every column it reads or writes and for
+    every reader of a column it overwrites. A barrier waits for everything added
+    before it and everything added after it waits for the barrier.
+    """
+
+    def __init__(self):
+        self.tasks = []
+        self._barrier = None
+        self._since_barrier = []
+        self._writer = {}
+        self._readers = {}
+
+    def add(self, task: Task) -> int:
+        index = len(self.tasks)
+        if task.barrier:
+            task.deps = set(self._since_barrier)
+            if self._barrier is not None:
+                task.deps.add(self._barrier)
+            self._barrier, self._since_barrier = index, []
+            self._writer, self._readers = {}, {}
+        else:
+            deps = set() if self._barrier is None else {self._barrier}
+            for col in task.reads + task.writes:                #type: ignore
+                if col in self._writer:
+                    deps.add(self._writer[col])
+            for col in task.writes:
+                deps.update(self._readers.get(col, []))
+            for col in task.reads:                              #type: ignore
+                self._readers.setdefault(col, []).append(index)
+            for col in task.writes:
+                self._writer[col] = index
+                self._readers[col] = []
+            deps.discard(index)
+            task.deps = deps
+            self._since_barrier.append(index)
+        self.tasks.append(task)
+        return index
+
+
+def _run_task(func, frame: pd.DataFrame):
+    return func(frame)
+
+
+class Scheduler:
+    """
+    Runs a pipeline as a DAG of (stage, column group) tasks on a thread or process pool.
+
+    Components that define `tasks(df)` are split into column tasks; a component
+    without it, or whose `tasks` returns None (e.g. not fitted), runs as one
+    barrier task on the whole frame, as do row-dropping stages. Column tasks of
+    consecutive stages overlap whenever their columns allow it. Results are
+    written back on the calling thread, so tasks never share a DataFrame.
+
+    Stages are planned one by one as the run reaches them, against the frame
+    left by the last barrier, so `tasks(df)` should only rely on column names,
+    dtypes and the component's fitted state.
+
+    Parameters:
+    -----------
+    workers : int, optional
+        Size of the pool, all cores by default.
+    backend : str, default='thread'
+        'thread' suits NumPy/pandas work, which releases the GIL; 'process' also
+        parallelizes pure-Python work but pickles every task's columns and component.
+    """
+
+    def __init__(self, workers: Optional[int] = None, backend: str = 'thread'):
+        if backend not in ('thread', 'process'):
+            raise ValueError(f"Unknown backend '{backend}', expected 'thread' or 'process'")
+        self.workers = workers or os.cpu_count() or 1
+        self.backend = backend
+
+    def _executor(self):
+        if self.backend == 'process':
+            return ProcessPoolExecutor(max_workers=self.workers)
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='prep')
+
+    @staticmethod
+    def plan(component, df: pd.DataFrame) -> list:
+        """
+        The tasks of one component, a single barrier if it cannot be split.
+        """
+        name = component.__class__.__name__
+        tasks = component.tasks(df) if hasattr(component, 'tasks') else None
+        if tasks is None:
+            return [Task(name, component.transform)]
+        return [Task(f"{name}[{label}]", func, reads, writes) for label, func, reads, writes in tasks]
+
+    def run(self, df: pd.DataFrame, components: list, barrier=None) -> pd.DataFrame:
+        """
+        Applies `components` to `df` in pipeline order.
+
+        Parameters:
+            barrier (callable): Runs barrier tasks as barrier(name, func, df) -> df,
+                e.g. to profile them. Defaults to calling func(df).
+
+        Returns:
+            pd.DataFrame: The transformed DataFrame.
+        """
+        graph, done, running = TaskGraph(), set(), {}
+        barrier = barrier or (lambda name, func, data: func(data))
+
+        def collect(block: bool):
+            finished, _ = wait(running, return_when=FIRST_COMPLETED) if block else ([f for f in running if f.done()], None)
+            for future in finished:
+                index = running.pop(future)
+                task = graph.tasks[index]
+                result = future.result()
+                undeclared = set(result) - set(task.writes)
+                if undeclared:
+                    raise ValueError(f"Task {task.name} wrote undeclared columns {sorted(undeclared)}")
+                for col, values in result.items():
+                    df[col] = values
+                done.add(index)
+
+        def submit_ready(executor):
+            submitted = set(running.values())
+            for index, task in enumerate(graph.tasks):
+                if index in done or index in submitted or task.barrier or not task.deps <= done:
+                    continue
+                # A private copy of the columns, detached from `df` so tasks may modify it
+                frame = df[task.reads].copy(deep=False)
+                running[executor.submit(_run_task, task.func, frame)] = index
+
+        with self._executor() as executor:
+            try:
+                for component in components:
+                    for task in self.plan(component, df):
+                        index = graph.add(task)
+                        if task.barrier:
+                            while len(done) < index:
+                                submit_ready(executor)
+                                collect(block=True)
+                            logger.info(f"Running barrier {task.name}")
+                            df = barrier(task.name, task.func, df)
+                            done.add(index)
+                        else:
+                            submit_ready(executor)
+                            collect(block=False)
+                while running or len(done) < len(graph.tasks):
+                    submit_ready(executor)
+                    collect(block=True)
+            except BaseException:
+                for future in running:
+                    future.cancel()
+                raise
+        logger.info(f"Scheduled {len(graph.tasks)} tasks on {self.workers} {self.backend} workers")
+        return df
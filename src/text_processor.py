@@ -1,61 +1,289 @@
-import nltk
+import os
 import string
 import pandas as pd
 import numpy as np
-from nltk.tokenize import word_tokenize, sent_tokenize
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
+from functools import lru_cache, partial
+from concurrent.futures import ProcessPoolExecutor
 from Utilities.logger import setup_logger
+from Utilities.nltk_resources import resources
 
 # Setup logger
 logger = setup_logger(log_file='pipeline.log', __name__=__name__)
 
+# Every substring of string.punctuation, so set membership matches the `in string.punctuation` test
+PUNCTUATION = frozenset(string.punctuation[i:j] for i in range(len(string.punctuation) + 1)
+                        for j in range(i, len(string.punctuation) + 1))
+
+_lemmatize = None
+
+
+def _lemma_cache(maxsize: int):
+    """
+    Returns the process-wide memoized lemmatizer, rebuilt if `maxsize` changes.
+    Word frequencies are Zipfian, so a bounded cache answers most lookups.
+    """
+    global _lemmatize
+    from nltk.stem import WordNetLemmatizer
+    if _lemmatize is None or _lemmatize.cache_info().maxsize != maxsize:
+        _lemmatize = lru_cache(maxsize=maxsize)(WordNetLemmatizer().lemmatize)
+    return _lemmatize
+
+
+def _configure_worker(data_dir, allow_download: bool):
+    """
+    Process pool initializer: applies the parent's NLTK settings, which workers
+    started with 'spawn' or 'forkserver' do not inherit.
+    """
+    resources.configure(data_dir=data_dir, allow_download=allow_download)
+
+
+def _preprocess_texts(texts: list, drop_words: frozenset, lemma_cache_size: int) -> list:
+    """
+    Tokenizes, filters and lemmatizes a batch of lowercased, stripped texts.
+    Module level so it can run in a worker process.
+    """
+    from nltk.tokenize import word_tokenize
+    resources.ensure('tokenizer', 'wordnet')
+    lemmatize = _lemma_cache(lemma_cache_size)
+    return [[lemmatize(word) for word in word_tokenize(text) if word not in drop_words] for text in texts]
+
+
 class TextProcessor:
-    def __init__(self, text_data_columns=[], date_time_columns=[], metadata={}):
+    """
+    Lowercases and strips categorical values and tokenizes free-text columns.
+
+    Parameters:
+    -----------
+    text_data_columns : list
+        Columns holding free text; their values become lists of lemmatized tokens
+        without stop words and punctuation.
+    n_jobs : int, default=1
+        Worker processes used to tokenize free-text columns. Work is split by
+        column and by chunks of `chunk_size` distinct values. -1 uses all cores.
+    chunk_size : int, default=10000
+        Distinct texts per task sent to a worker.
+    lemma_cache_size : int, default=100000
+        Size of the per-process LRU cache of lemmatized words.
+    nltk_data_dir : str, optional
+        Local directory with pre-seeded NLTK data, see `Utilities.nltk_resources`.
+        The setting is process-wide.
+    download : bool, default=False
+        Allow missing NLTK resources to be downloaded on first use. Without it
+        the TextProcessor never touches the network.
+    mp_context : multiprocessing context, optional
+        Start method of the worker processes, the platform default otherwise.
+        Workers receive the NLTK settings through their initializer, so every
+        start method sees the same data directory.
+    """
+    def __init__(self, text_data_columns=[], date_time_columns=[], metadata={}, n_jobs: int = 1,
+                 chunk_size: int = 10_000, lemma_cache_size: int = 100_000, nltk_data_dir=None, download: bool = False,
+                 mp_context=None):
         self.metadata = metadata
-        self.lemmatizer = WordNetLemmatizer()
         self.date_time_columns = date_time_columns
         self.text_data_columns = text_data_columns
-        self.stop_words = set(stopwords.words('english'))
+        self._stop_words = None
+        self.n_jobs = (os.cpu_count() or 1) if n_jobs == -1 else max(1, n_jobs)
+        self.chunk_size = chunk_size
+        self.lemma_cache_size = lemma_cache_size
+        self.mp_context = mp_context
+
+        # NLTK data is only looked up when a text column is first tokenized
+        if nltk_data_dir or download:
+            resources.configure(data_dir=nltk_data_dir, allow_download=True if download else None)
+
+    @property
+    def lemmatizer(self):
+        """
+        The WordNet lemmatizer; nltk is imported on first access.
+        """
+        from nltk.stem import WordNetLemmatizer
+        return WordNetLemmatizer()
 
-        if text_data_columns is not None:
-            self._download_resources(self)
+    def download_resources(self):
+        """
+        Downloads the NLTK data the TextProcessor uses into the configured directory.
+        """
+        resources.download()
 
-    def _download_resources(self, text_data_columns):
-        nltk.download('punkt', download_dir='../text_processor_cache')
-        nltk.download('stopwords', download_dir='../text_processor_cache')
-        nltk.download('wordnet', download_dir='../text_processor_cache')
+    @property
+    def stop_words(self):
+        """
+        English stop words, loaded on first use and shared by every TextProcessor in the process.
+        """
+        return resources.stop_words('english') if self._stop_words is None else self._stop_words
 
+    @stop_words.setter
+    def stop_words(self, value):
+        self._stop_words = value
 
+    @property
+    def drop_words(self) -> frozenset:
+        """
+        Stop words and punctuation removed from tokenized text, as one frozen set.
+        """
+        return PUNCTUATION | frozenset(self.stop_words)
 
     def preprocess(self, text, text_data=False):
         """Preprocesses the input text by tokenizing, removing stop words, and lemmatizing."""
         text = text.lower().strip()
 
         if text_data:
-            sentences = sent_tokenize(text)
-            words = word_tokenize(text) 
-            words = [word for word in words if word not in string.punctuation]
-            words = [word for word in words if word not in self.stop_words]
-            words = [self.lemmatizer.lemmatize(word) for word in words]
-            return words
+            return _preprocess_texts([text], self.drop_words, self.lemma_cache_size)[0]
         
         return text
 
+    def _preprocess_many(self, columns: dict) -> dict:
+        """
+        Tokenizes the distinct texts of several columns, {col: [text]} -> {col: [tokens]},
+        in a process pool when n_jobs > 1 and there is more than one chunk of work.
+        """
+        drop_words = self.drop_words
+        tasks = [(col, start, [text.lower().strip() for text in texts[start:start + self.chunk_size]])
+                 for col, texts in columns.items() for start in range(0, len(texts), self.chunk_size)]
+        results = {col: [None] * len(texts) for col, texts in columns.items()}
+        if self.n_jobs == 1 or len(tasks) < 2:
+            for col, start, texts in tasks:
+                results[col][start:start + len(texts)] = _preprocess_texts(texts, drop_words, self.lemma_cache_size)
+            return results
+        workers = min(self.n_jobs, len(tasks))
+        logger.info(f"Tokenizing {len(tasks)} chunks of text with {workers} worker processes")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=self.mp_context, initializer=_configure_worker,
+                                 initargs=(resources.data_dir, resources.allow_download)) as executor:
+            futures = [(col, start, executor.submit(_preprocess_texts, texts, drop_words, self.lemma_cache_size))
+                       for col, start, texts in tasks]
+            for col, start, future in futures:
+                tokens = future.result()
+                results[col][start:start + len(tokens)] = tokens
+        return results
 
-    def transform(self, df):
+    def fit(self, df):
         """
-        Transform function to apply to the DataFrame.
+        TextProcessor has nothing to learn; present for pipeline symmetry.
+        """
+        return self
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    def get_state(self) -> dict:
+        return {'text_data_columns': list(self.text_data_columns), 'date_time_columns': list(self.date_time_columns),
+                'n_jobs': self.n_jobs, 'chunk_size': self.chunk_size, 'lemma_cache_size': self.lemma_cache_size}
+
+    @classmethod
+    def from_state(cls, state: dict, metadata: dict = {}):
+        return cls(text_data_columns=state['text_data_columns'], date_time_columns=state['date_time_columns'], metadata=metadata,
+                   n_jobs=state.get('n_jobs', 1), chunk_size=state.get('chunk_size', 10_000),
+                   lemma_cache_size=state.get('lemma_cache_size', 100_000))
+
+    @staticmethod
+    def _factorize(series: pd.Series):
+        """
+        Returns (codes, uniques) of a column, or None if its values are unhashable
+        (e.g. already tokenized lists).
+        """
+        try:
+            return pd.factorize(series)
+        except TypeError:
+            return None
+
+    @staticmethod
+    def _broadcast(series: pd.Series, codes: np.ndarray, processed: list) -> pd.Series:
+        """
+        Maps processed distinct values back to the rows; missing values keep their original object.
+        """
+        lookup = np.empty(len(processed), dtype=object)
+        for i, value in enumerate(processed):
+            lookup[i] = value
+        values = lookup.take(codes) if len(lookup) else np.empty(len(codes), dtype=object)
+        missing = codes == -1
+        if missing.any():
+            values[missing] = series.to_numpy(dtype=object)[missing]
+        return pd.Series(values, index=series.index, name=series.name)
+
+    def _process_column(self, series: pd.Series) -> pd.Series:
+        """
+        Runs `preprocess` once per distinct value of a categorical column and broadcasts the results back to the rows.
+        Categorical dtypes are kept when the mapping stays one to one.
+        """
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            mapping = {value: self.preprocess(value) if isinstance(value, str) else value for value in series.cat.categories}
+            return series.map(mapping)
+        factorized = self._factorize(series)
+        if factorized is None:
+            return series.apply(lambda x: self.preprocess(x) if isinstance(x, str) else x)
+        codes, uniques = factorized
+        return self._broadcast(series, codes, [self.preprocess(value) if isinstance(value, str) else value for value in uniques])
+
+    def _process_text_columns(self, df, columns: list):
+        """
+        Tokenizes free-text columns. Distinct texts of all columns are batched together
+        so a process pool can split them by column and by chunk.
+        """
+        factorized, texts = {}, {}
+        for col in columns:
+            result = self._factorize(df[col].astype(object))
+            if result is None:
+                df[col] = df[col].apply(lambda x: self.preprocess(x, True) if isinstance(x, str) else x)
+                continue
+            factorized[col] = result
+            texts[col] = [value for value in result[1] if isinstance(value, str)]
+        tokens = self._preprocess_many(texts)
+        for col, (codes, uniques) in factorized.items():
+            processed = iter(tokens[col])
+            df[col] = self._broadcast(df[col], codes, [next(processed) if isinstance(value, str) else value for value in uniques])
+        return df
+
+    def _plan(self, df) -> tuple:
+        """
+        Splits the non-numeric columns of `df` into categorical and free-text
+        columns to process and records the text type of each in the metadata.
         """
         column_details = self.metadata.get('columns', {})
+        categorical_columns, text_columns = [], []
         for col in df.select_dtypes(exclude=[np.number]).columns:
             text_data = col in self.text_data_columns
-            logger.info(f'Proccessing column: {col}')
-            df[col] = df[col].apply(lambda x: self.preprocess(x, text_data) if isinstance(x, str) else x)
+            dtype = df[col].dtype
+            if pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype) or isinstance(dtype, pd.CategoricalDtype):
+                (text_columns if text_data else categorical_columns).append(col)
             if column_details:
                 if text_data:
                     column_details[col]['text_type'] = 'text_data'
                 else:
                     column_details[col]['text_type'] = 'Nominal/Ordinal_Data'
+        return categorical_columns, text_columns
+
+    def _column_task(self, col, frame) -> dict:
+        logger.info(f'Proccessing column: {col}')
+        return {col: self._process_column(frame[col])}
+
+    def _text_task(self, columns: list, frame) -> dict:
+        logger.info(f'Proccessing text columns: {columns}')
+        frame = self._process_text_columns(frame, columns)
+        return {col: frame[col] for col in columns}
+
+    def tasks(self, df) -> list:
+        """
+        Column tasks for the pipeline scheduler: one per categorical column and
+        one for all free-text columns, which share a tokenizing batch.
+        """
+        categorical_columns, text_columns = self._plan(df)
+        tasks = [(col, partial(self._column_task, col), [col], [col]) for col in categorical_columns]
+        if text_columns:
+            tasks.append(('text', partial(self._text_task, text_columns), text_columns, text_columns))
+        return tasks
+
+    def transform(self, df):
+        """
+        Transform function to apply to the DataFrame.
+
+        Every distinct value of a column is processed once, so the cost follows
+        the number of categories rather than the number of rows. Datetime and
+        boolean columns hold no strings and are left untouched.
+        """
+        categorical_columns, text_columns = self._plan(df)
+        for col in categorical_columns:
+            logger.info(f'Proccessing column: {col}')
+            df[col] = self._process_column(df[col])
+        if text_columns:
+            df = self._process_text_columns(df, text_columns)
         return df
-        
\ No newline at end of file
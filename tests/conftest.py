@@ -0,0 +1,9 @@
+import os
+import sys
+
+# Tests import `src.<module>`; the modules under src import each other and
+# Utilities as top-level modules, so both directories go on the path.
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, 'src')):
+    if path not in sys.path:
+        sys.path.insert(0, path)
@@ -1,7 +1,63 @@
 import json
+import itertools
+import numpy as np
 import pandas as pd
+import pytest
 from pathlib import Path
 from src.analyzer import Analyzer
+from Utilities import cache
+from Utilities.cache import AnalysisCache
+
+
+def test_all_nan_numeric_column_is_a_failed_fit():
+    df = pd.DataFrame({'Temperature': [np.nan] * 5, 'Location': ['inland', 'coastal', 'inland', 'mountain', 'inland']})
+    metadata = Analyzer(metadata={}).analyze(df=df)
+    assert metadata['columns']['Temperature']['column_distribution'] == 'Fitter Failed'
+
+
+def test_empty_frame_is_a_failed_fit():
+    df = pd.DataFrame({'Temperature': pd.Series([], dtype=float), 'Humidity': pd.Series([], dtype=float)})
+    metadata = Analyzer(metadata={}).analyze(df=df)
+    assert all(column['column_distribution'] == 'Fitter Failed' for column in metadata['columns'].values())
+
+
+def test_parallel_exact_fit_matches_sequential():
+    pytest.importorskip('fitter')
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'Temperature': rng.normal(size=300), 'Wind Speed': rng.exponential(size=300),
+                       'Precipitation': rng.gamma(2, size=300)})
+    sequential = Analyzer(metadata={}, engine='exact', n_jobs=1, fit_jobs=1).analyze_distributions(df, list(df.columns))
+    parallel = Analyzer(metadata={}, engine='exact', n_jobs=3).analyze_distributions(df, list(df.columns))
+    assert parallel == sequential
+
+
+def test_analysis_cache_hits_within_tolerance_and_refits_on_drift(tmp_path, monkeypatch):
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({'Temperature': rng.normal(20, 5, 1000)})
+    fitted = []
+    fit_samples = Analyzer._fit_samples
+    monkeypatch.setattr(Analyzer, '_fit_samples', lambda self, samples: fitted.append(list(samples)) or fit_samples(self, samples))
+    first = Analyzer(metadata={}, cache_dir=str(tmp_path)).analyze(df.copy())
+    # A new run reads the cache from disk; a slightly shifted column is a hit
+    second = Analyzer(metadata={}, cache_dir=str(tmp_path)).analyze(df + 0.01)
+    assert fitted == [['Temperature'], []] and second == first
+    Analyzer(metadata={}, cache_dir=str(tmp_path)).analyze(df * 3)
+    assert fitted[-1] == ['Temperature']
+
+
+def test_analysis_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    clock = itertools.count()
+    monkeypatch.setattr(cache.time, 'time', lambda: next(clock))
+    store = AnalysisCache(str(tmp_path / 'analysis_cache.json'), max_entries=2)
+    fingerprint = store.fingerprint(np.arange(100.0))
+    store.put('fast|a|float64', fingerprint, {'Distribution': 'norm'})
+    store.put('fast|b|float64', fingerprint, {'Distribution': 'expon'})
+    assert store.get('fast|a|float64', fingerprint) == {'Distribution': 'norm'}
+    store.put('fast|c|float64', fingerprint, {'Distribution': 'gamma'})
+    assert sorted(store.entries) == ['fast|a|float64', 'fast|c|float64']
+    store.save()
+    assert sorted(AnalysisCache(store.path).entries) == ['fast|a|float64', 'fast|c|float64']
+
 
 if __name__ == "__main__":
     metadata = {}
@@ -9,4 +65,4 @@ if __name__ == "__main__":
     data = pd.read_csv(data_path)
     analyzer = Analyzer(metadata=metadata)
     metadata = analyzer.analyze(df=data)
-    print(json.dumps(metadata, indent=4))
\ No newline at end of file
+    print(json.dumps(metadata, indent=4))
@@ -1,5 +1,105 @@
+import numpy as np
 import pandas as pd
+from pandas.testing import assert_frame_equal
 from src.cleaner import Cleaner
+from Utilities.hash_set import SpillingHashSet
+
+
+def _dedup_only(**kwargs) -> Cleaner:
+    # Thresholds of 1 keep every column and row, so only duplicates are removed
+    return Cleaner(metadata={}, column_threshold=1.0, row_threshold=1.0, **kwargs)
+
+
+def _frame(rows=2000, seed=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Humidity': rng.integers(0, 4, rows),
+        'Temperature': rng.choice([0.0, -0.0, 1.5, np.nan], rows),
+        'Location': rng.choice(np.array(['inland', 'coastal', None, np.nan], dtype=object), rows),
+        'Season': pd.Categorical(rng.choice(['Winter', 'Spring', 'Summer'], rows)),
+    })
+
+
+def test_duplicates_match_drop_duplicates():
+    df = _frame()
+    cleaned = _dedup_only().transform(df)
+    assert_frame_equal(cleaned, df.drop_duplicates())
+
+
+def test_stream_matches_drop_duplicates_across_mixed_dtype_chunks():
+    df = _frame()
+    chunks = [df.iloc[start:start + 300] for start in range(0, len(df), 300)]
+    # The same values read as int64 in one chunk and float64 or object in another
+    chunks[1] = chunks[1].astype({'Humidity': 'float64', 'Season': 'object'})
+    cleaner = _dedup_only()
+    cleaner.begin_stream()
+    try:
+        kept = [cleaner.transform(chunk).index for chunk in chunks]
+    finally:
+        cleaner.end_stream()
+    assert list(np.concatenate(kept)) == list(df.drop_duplicates().index)
+    assert cleaner.metadata['cleaning_stats']['duplicates_removed'] == len(df) - len(df.drop_duplicates())
+
+
+def test_stream_dedup_spills_past_budget(tmp_path):
+    df = pd.DataFrame({'Humidity': np.arange(3000) % 1200, 'Location': np.where(np.arange(3000) % 2, 'inland', 'coastal')})
+    cleaner = _dedup_only(dedup_budget=256, spill_dir=str(tmp_path))
+    cleaner.begin_stream()
+    try:
+        kept = [cleaner.transform(df.iloc[start:start + 250]).index for start in range(0, len(df), 250)]
+        assert cleaner._seen.spilled > 0
+    finally:
+        cleaner.end_stream()
+    assert list(np.concatenate(kept)) == list(df.drop_duplicates().index)
+    assert not any(tmp_path.iterdir())
+
+
+def test_spilling_hash_set_matches_python_set(tmp_path):
+    rng = np.random.default_rng(1)
+    hashes = SpillingHashSet(budget_bytes=512, spill_dir=str(tmp_path), partitions=8)
+    seen = set()
+    for _ in range(20):
+        batch = rng.integers(0, 2 ** 63, 100, dtype=np.uint64) | rng.choice(np.array([0, 2 ** 63], dtype=np.uint64), 100)
+        batch[::10] = batch[0]
+        expected = []
+        for value in batch.tolist():
+            expected.append(value in seen)
+            seen.add(value)
+        assert hashes.add(batch).tolist() == expected
+    assert hashes.spilled > 0 and len(hashes) == len(seen)
+    hashes.close()
+    assert len(hashes) == 0
+
+
+def test_spilled_partitions_stay_sorted_and_are_probed_without_reading(tmp_path, monkeypatch):
+    rng = np.random.default_rng(2)
+    hashes = SpillingHashSet(budget_bytes=64, spill_dir=str(tmp_path), partitions=4)
+    chunks = [rng.integers(0, 2 ** 62, 200, dtype=np.uint64) << np.uint64(2) for _ in range(6)]
+    for chunk in chunks:
+        assert not hashes.add(chunk).any()
+    # Lookups binary-search memory maps instead of loading whole partitions
+    monkeypatch.setattr(np, 'fromfile', None)
+    for chunk in chunks:
+        assert hashes.add(chunk).all()
+    for part in np.flatnonzero(hashes._spilled):
+        stored = np.asarray(hashes._stored(int(part)))
+        assert len(stored) == hashes._spilled[part] and (np.diff(stored.astype(np.float64)) >= 0).all()
+        assert len(np.unique(stored)) == len(stored)
+    assert len(hashes) == len(np.unique(np.concatenate(chunks)))
+    hashes.close()
+
+
+def test_fit_transform_builds_the_null_bitmap_once(monkeypatch):
+    df = _frame()
+    df['Empty'] = np.nan
+    calls = []
+    bitmap = Cleaner._null_bitmap
+    monkeypatch.setattr(Cleaner, '_null_bitmap', staticmethod(lambda *args: calls.append(1) or bitmap(*args)))
+    cleaner = Cleaner(metadata={})
+    cleaned = cleaner.fit_transform(df)
+    assert len(calls) == 1
+    assert cleaner.columns_to_drop == ['Empty'] and 'Empty' not in cleaned.columns
+
 
 if __name__ == "__main__":
     # Load the CSV file into a DataFrame
@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
+from src.compactor import Compactor
+
+
+def test_batches_share_the_categories_learned_by_fit():
+    seasons = ['Winter', 'Spring', 'Summer', 'Autumn']
+    compactor = Compactor(metadata={}).fit(pd.DataFrame({'Season': seasons * 25}))
+    first = compactor.transform(pd.DataFrame({'Season': ['Winter', 'Spring'] * 10}))
+    second = compactor.transform(pd.DataFrame({'Season': ['Autumn', None] * 10}))
+    assert first['Season'].dtype == second['Season'].dtype == pd.CategoricalDtype(sorted(seasons))
+    assert isinstance(pd.concat([first, second])['Season'].dtype, pd.CategoricalDtype)
+
+
+def test_batches_that_do_not_fit_keep_their_dtype():
+    fitted = pd.DataFrame({
+        'Humidity': np.arange(100, dtype=np.int64),
+        'Pressure': np.arange(100, dtype=np.float64),
+        'Season': ['Winter', 'Summer'] * 50,
+    })
+    compactor = Compactor(metadata={}).fit(fitted)
+    assert compactor.dtypes['Humidity'] == 'int8' and compactor.dtypes['Pressure'] == 'float32'
+    batch = pd.DataFrame({'Humidity': [1, 1000], 'Pressure': [0.1, 2.0], 'Season': ['Winter', 'Monsoon']})
+    result = compactor.transform(batch.copy())
+    # Out-of-range integers, inexact floats and unseen categories stay as read
+    assert_frame_equal(result, batch)
+    assert compactor.metadata['memory']['dtypes'] == {}
+
+
+def test_memory_record():
+    df = pd.DataFrame({'Humidity': np.arange(1000) % 100, 'Season': ['Winter', 'Summer'] * 500})
+    compactor = Compactor(metadata={})
+    result = compactor.fit_transform(df.copy())
+    memory = compactor.metadata['memory']
+    assert memory['before_bytes'] == df.memory_usage(deep=True).sum()
+    assert memory['after_bytes'] == result.memory_usage(deep=True).sum()
+    assert memory['reduction'] > 5
+    assert memory['dtypes'] == {'Humidity': ['int64', 'int8'], 'Season': ['object', 'category']}
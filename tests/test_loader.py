@@ -1,9 +1,40 @@
+import numpy as np
+import pandas as pd
+from pandas.testing import assert_frame_equal
 from src.loader import Loader
 
+
+def _write_csv(path):
+    df = pd.DataFrame({
+        'Temperature': [14.0, np.nan, 30.0, 38.0],
+        'Humidity': [73, 96, 64, 83],
+        'Cloud Cover': ['partly cloudy', np.nan, 'clear', None],
+        'Location': [np.nan, np.nan, np.nan, 'inland'],
+    })
+    df.to_csv(path, index=False)
+
+
+def test_cached_load_matches_fresh_load(tmp_path):
+    path = tmp_path / 'weather.csv'
+    _write_csv(path)
+    fresh = pd.read_csv(path)
+    cold = Loader(str(path), {}, cache_dir=str(tmp_path / 'cache'))
+    assert not cold.cache_hit
+    cold_df = cold.transform()
+    warm = Loader(str(path), {}, cache_dir=str(tmp_path / 'cache'))
+    assert warm.cache_hit
+    warm_df = warm.transform()
+    assert_frame_equal(cold_df, fresh)
+    assert_frame_equal(warm_df, cold_df)
+    assert warm_df.loc[1, 'Cloud Cover'] is np.nan
+    chunks = list(Loader(str(path), {}, cache_dir=str(tmp_path / 'cache')).transform_chunks(chunksize=3))
+    assert_frame_equal(pd.concat(chunks), fresh)
+
+
 if __name__ == "__main__":
     import os
     path = os.path.join('Data', 'weather_classification_data.csv')
     loader = Loader(path=path)
     df = loader.transform()
     print(df.head())
-    print(loader.metadata)
\ No newline at end of file
+    print(loader.metadata)
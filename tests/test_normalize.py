@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.pipeline import make_pipeline
+from sklearn.preprocessing import MinMaxScaler, PowerTransformer, QuantileTransformer, StandardScaler
+from src.normalize import EPSILON, Normalizer
+
+
+def _reference(method: str, X: np.ndarray) -> np.ndarray:
+    """
+    The sklearn transformers the Normalizer's methods reimplement, fitted and applied on X.
+    """
+    if method == 'minmax':
+        return MinMaxScaler().fit_transform(X)
+    if method == 'standardscaler':
+        return StandardScaler().fit_transform(X)
+    if method == 'yeojohnson_standard':
+        return make_pipeline(PowerTransformer(method='yeo-johnson'), StandardScaler()).fit_transform(X)
+    if method == 'boxcox':
+        return PowerTransformer(method='box-cox', standardize=False).fit_transform(X - np.nanmin(X, axis=0) + EPSILON)
+    if method == 'sqrt_reciprocal':
+        return 1.0 / np.sqrt(X + EPSILON)
+    if method == 'log_quantile':
+        return QuantileTransformer(output_distribution='normal', n_quantiles=min(1000, len(X)), random_state=0).fit_transform(np.log1p(X))
+    if method == 'log_powertransformer':
+        return PowerTransformer(method='yeo-johnson').fit_transform(np.log1p(X))
+    raise ValueError(method)
+
+
+def _skewed(rows=500, seed=0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    X = np.column_stack([rng.lognormal(0, 1, rows), rng.gamma(2, 3, rows), rng.uniform(0.5, 40, rows)])
+    X[rng.random(X.shape) < 0.05] = np.nan
+    return X
+
+
+@pytest.mark.parametrize('float32', [False, True])
+@pytest.mark.parametrize('method', ['minmax', 'standardscaler', 'yeojohnson_standard', 'boxcox',
+                                    'sqrt_reciprocal', 'log_quantile', 'log_powertransformer'])
+def test_methods_match_sklearn(method, float32):
+    X = _skewed()
+    if float32:
+        X = X.astype(np.float32).astype(np.float64)
+    result = Normalizer(float32=float32).apply_transformation(X, method)
+    assert result.dtype == (np.float32 if float32 else np.float64)
+    expected = _reference(method, X)
+    assert np.array_equal(np.isnan(result), np.isnan(X))
+    tolerance = 1e-4 if float32 else 1e-7
+    assert np.allclose(result, expected, rtol=tolerance, atol=tolerance, equal_nan=True)
+
+
+def test_fitted_groups_apply_to_new_rows():
+    X = _skewed()
+    df = pd.DataFrame(X, columns=['Temperature', 'Humidity', 'Wind Speed'])
+    normalizer = Normalizer(metadata={'columns': {}}, normalize_numeric='StandardScaler').fit(df.iloc[:300])
+    result = normalizer.transform(df.iloc[300:].copy())
+    expected = StandardScaler().fit(X[:300]).transform(X[300:])
+    assert np.allclose(result.to_numpy(), expected, equal_nan=True)
+
+
+def _categorical_frame(rows=400, seed=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    location = rng.choice(['inland', 'coastal', 'mountain'], rows).astype(object)
+    location[rng.random(rows) < 0.05] = np.nan
+    return pd.DataFrame({
+        'Temperature': rng.normal(20, 5, rows),
+        'Location': location,
+        'WeatherType': np.where(location == 'coastal', 'Rainy', rng.choice(['Sunny', 'Cloudy'], rows)),
+    })
+
+
+def _normalizer(encoder: str, **kwargs) -> Normalizer:
+    metadata = {'target_column': 'WeatherType', 'columns': {'WeatherType': {'dtype': 'categorical_columns'}}}
+    return Normalizer(metadata=metadata, stratergy={'Location': encoder}, **kwargs)
+
+
+def test_onehot_and_hashing_are_sparse_indicators_with_unseen_as_zeros():
+    df = _categorical_frame()
+    new = pd.DataFrame({'Temperature': [20.0, 21.0], 'Location': ['desert', np.nan], 'WeatherType': ['Sunny', 'Sunny']})
+    for encoder, width in (('onehot', 3), ('hashing', 8)):
+        normalizer = _normalizer(encoder, hash_width=8).fit(df)
+        result = normalizer.transform(df.copy())
+        names = normalizer.encoders[0]['names']
+        assert len(names) == width and 'Location' not in result.columns
+        assert all(isinstance(result[name].dtype, pd.SparseDtype) for name in names)
+        block = result[names].sparse.to_dense().to_numpy()
+        assert np.array_equal(block.sum(axis=1), df['Location'].notna().to_numpy().astype(int))
+        if encoder == 'onehot':
+            assert np.array_equal(block, pd.get_dummies(df['Location'], dtype=int)[['coastal', 'inland', 'mountain']].to_numpy())
+        unseen = normalizer.transform(new.copy())[names].sparse.to_dense().to_numpy()
+        assert unseen[1].sum() == 0
+        assert unseen[0].sum() == (0 if encoder == 'onehot' else 1)
+        X, y, feature_names = normalizer.transform_sparse(df.copy())
+        assert X.shape == (len(df), 1 + width) and feature_names[1:] == names
+        assert np.array_equal(X[:, 1:].toarray(), block)
+
+
+def test_frequency_encoding_with_unseen_categories():
+    df = _categorical_frame()
+    normalizer = _normalizer('frequency').fit(df)
+    result = normalizer.transform(df.copy())
+    expected = df['Location'].map(df['Location'].value_counts() / len(df)).fillna(0)
+    assert np.allclose(result['Location'], expected)
+    new = pd.DataFrame({'Temperature': [20.0], 'Location': ['desert'], 'WeatherType': ['Sunny']})
+    assert normalizer.transform(new)['Location'].tolist() == [0.0]
+
+
+def test_target_encoding_is_out_of_fold_on_training_rows():
+    df = _categorical_frame()
+    # A category per row: in-sample encoding would copy every row's own target
+    df['Location'] = [f"station_{i}" for i in range(len(df))]
+    numeric = df.assign(WeatherType=(df['WeatherType'] == 'Rainy').astype(float))
+    metadata = {'target_column': 'WeatherType', 'columns': {}}
+    leaky = Normalizer(metadata=metadata, stratergy={'Location': 'target'}, cv=1).fit_transform(numeric.copy())
+    encoded = Normalizer(metadata=metadata, stratergy={'Location': 'target'}).fit_transform(numeric.copy())
+    prior = numeric['WeatherType'].mean()
+    assert np.corrcoef(leaky['Location'], numeric['WeatherType'])[0, 1] > 0.9
+    # Every category is unseen in the other folds, so it gets the other folds' mean
+    assert np.allclose(encoded['Location'], prior, atol=0.05)
+
+
+def test_target_encoding_leaves_one_out_when_rows_are_fewer_than_folds(caplog):
+    df = pd.DataFrame({'Location': ['coastal'] * 3, 'WeatherType': [1.0, 0.0, 0.0]})
+    metadata = {'target_column': 'WeatherType', 'columns': {}}
+    encoded = Normalizer(metadata=metadata, stratergy={'Location': 'target'}, cv=5).fit_transform(df.copy())
+    # Each row is encoded from the other two rows only, smoothed towards their mean
+    others = np.array([[0.0, 0.0], [1.0, 0.0], [1.0, 0.0]])
+    expected = (others.sum(axis=1) + 10.0 * others.mean(axis=1)) / (2 + 10.0)
+    assert np.allclose(encoded['Location'], expected)
+    assert 'leaving one row out per fold' in caplog.text
+
+
+def test_target_encoding_per_class_and_fitted_transform():
+    df = _categorical_frame()
+    normalizer = _normalizer('target')
+    result = normalizer.fit_transform(df.copy())
+    names = [f"Location_{label}" for label in ('Cloudy', 'Rainy', 'Sunny')]
+    assert names == normalizer.encoders[0]['names'] and 'Location' not in result.columns
+    assert np.allclose(result[names].sum(axis=1), 1.0)
+    # Fitted transform uses the smoothed means of all fitting rows, unseen categories the prior
+    table = normalizer.encoders[0]['table']
+    coastal = normalizer.encoders[0]['categories'].index('coastal')
+    new = pd.DataFrame({'Temperature': [20.0, 20.0], 'Location': ['coastal', 'desert'], 'WeatherType': ['Rainy', 'Sunny']})
+    encoded = normalizer.transform(new)[names].to_numpy()
+    assert np.allclose(encoded[0], table[coastal])
+    assert np.allclose(encoded[1], normalizer.encoders[0]['default'])
+    assert table[coastal, 1] > 0.9
@@ -1,6 +1,72 @@
+import numpy as np
 import pandas as pd
+import pytest
 from src.outlier import Outlier
 
+METHODS = ['IQR', 'Z-score', 'Percentile', 'Modified Z-score', 'Range-based', 'MAD', 'Log-space IQR']
+
+
+def _sequential_drops(df: pd.DataFrame, methods: dict) -> pd.DataFrame:
+    """
+    The original Outlier: every column in turn drops its outliers, judged on the rows left by the previous ones.
+    """
+    df = df.copy()
+    for col, method in methods.items():
+        x = df[col]
+        median, mad = x.median(), np.median(np.abs(x - x.median()))
+        if method == 'IQR':
+            q1, q3 = x.quantile(0.25), x.quantile(0.75)
+            outliers = (x < q1 - 1.5 * (q3 - q1)) | (x > q3 + 1.5 * (q3 - q1))
+        elif method == 'Z-score':
+            outliers = ((x - x.mean()) / x.std()).abs() > 3
+        elif method == 'Percentile':
+            outliers = (x < x.quantile(0.01)) | (x > x.quantile(0.99))
+        elif method == 'Modified Z-score':
+            outliers = (0.6745 * (x - median) / mad).abs() > 3.5 if mad else x != x
+        elif method == 'Range-based':
+            outliers = (x == x.min()) | (x == x.max())
+        elif method == 'MAD':
+            outliers = (x < median - 3 * mad) | (x > median + 3 * mad)
+        else:
+            q1, q3 = np.log(x).quantile(0.25), np.log(x).quantile(0.75)
+            outliers = (x < np.exp(q1 - 1.5 * (q3 - q1))) | (x > np.exp(q3 + 1.5 * (q3 - q1)))
+        df = df[~outliers]
+    return df
+
+
+def _outlier(mode='drop'):
+    rng = np.random.default_rng(0)
+    # Heavy tails so every method finds outliers, all positive for the log-space IQR
+    df = pd.DataFrame({method: rng.lognormal(0, 1, 2000) for method in METHODS})
+    metadata = {'target_column': None, 'columns': {col: {'dtype': 'numeric_columns'} for col in df.columns}}
+    return df, Outlier(metadata=metadata, method_maps={col: col for col in df.columns}, mode=mode)
+
+
+def test_vectorized_fit_matches_sequential_drops():
+    df, outlier = _outlier()
+    expected = _sequential_drops(df, {col: col for col in df.columns})
+    assert 0 < len(expected) < len(df)
+    pd.testing.assert_frame_equal(outlier.fit_transform(df.copy()), expected)
+    # Fitted bounds give the same rows on the same data
+    pd.testing.assert_frame_equal(outlier.transform(df.copy()), expected)
+
+
+def test_flag_mode_keeps_rows_and_marks_the_dropped_ones():
+    df, outlier = _outlier(mode='flag')
+    expected = _sequential_drops(df, {col: col for col in df.columns})
+    result = outlier.fit_transform(df.copy())
+    pd.testing.assert_frame_equal(result, df)
+    assert outlier.outlier_mask.tolist() == (~df.index.isin(expected.index)).tolist()
+    per_column = outlier.flag(df, per_column=True)
+    assert list(per_column.columns) == METHODS
+    assert per_column.any(axis=1).equals(outlier.outlier_mask)
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        Outlier(mode='clip')
+
+
 if __name__ == "__main__":
     # Load the CSV file into a DataFrame
     # Assuming the CSV file is located in the 'Data' directory
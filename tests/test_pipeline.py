@@ -1,5 +1,354 @@
+import functools
+import importlib
+import pickle
+import numpy as np
+import pytest
+import pandas as pd
 from src.pipeline import Lazy_Prep
 
+
+def _weather(rows=400, seed=0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Temperature': rng.normal(20, 5, rows).round(1),
+        'Humidity': rng.integers(20, 100, rows).astype(float),
+        'Pressure': rng.normal(1010, 8, rows).round(2),
+        'Cloud Cover': rng.choice(['clear', 'cloudy', 'overcast'], rows),
+        'WeatherType': rng.choice(['Sunny', 'Rainy'], rows),
+    })
+
+
+def _weather_with_late_nulls(path, rows=400):
+    df = _weather(rows)
+    # A column that goes null halfway through the file
+    df.loc[rows // 2:, 'Pressure'] = np.nan
+    df.to_csv(path, index=False)
+    return df
+
+
+def _weather_with_duplicates(path, rows=400, duplicates=300):
+    df = _weather(rows)
+    empty = pd.DataFrame(np.nan, index=range(20), columns=df.columns)
+    df = pd.concat([df, df.sample(duplicates, replace=True, random_state=1), empty], ignore_index=True)
+    df = df.sample(frac=1, random_state=2).reset_index(drop=True)
+    df.to_csv(path, index=False)
+    return df
+
+
+def test_transform_stream_keeps_schema(tmp_path):
+    path = tmp_path / 'weather.csv'
+    _weather_with_late_nulls(path)
+    prep = Lazy_Prep(str(path), target_column='WeatherType')
+    chunks = list(prep.transform_stream(chunksize=100))
+    assert len(chunks) == 4
+    assert all(list(chunk.columns) == list(chunks[0].columns) for chunk in chunks)
+    assert 'Pressure' in chunks[0].columns
+    assert prep.fitted
+
+
+
+def test_saved_artifact_reloads_to_the_same_transform(tmp_path):
+    path = tmp_path / 'weather.csv'
+    _weather_with_late_nulls(path)
+    prep = Lazy_Prep(str(path), target_column='WeatherType')
+    prep.add_compactor()
+    prep.add_normalizer()
+    prep.fit()
+    prep.save(str(tmp_path / 'prep.pkl'))
+    loaded = Lazy_Prep.load(str(tmp_path / 'prep.pkl'))
+    assert loaded.fitted and loaded.input_columns == prep.input_columns
+    assert [type(component) for component in loaded.pipeline] == [type(component) for component in prep.pipeline]
+    new = _weather(seed=1)
+    new.loc[::9, 'Humidity'] = np.nan
+    pd.testing.assert_frame_equal(loaded.transform(new.copy()), prep.transform(new.copy()))
+
+
+def test_artifact_version_mismatch_is_rejected(tmp_path):
+    path = tmp_path / 'weather.csv'
+    _weather(rows=100).to_csv(path, index=False)
+    prep = Lazy_Prep(str(path), target_column='WeatherType')
+    # Transforming without fit learns from the data but leaves nothing to save
+    prep.transform()
+    assert not prep.fitted
+    with pytest.raises(ValueError, match='not fitted'):
+        prep.save(str(tmp_path / 'prep.pkl'))
+    prep.fit()
+    artifact = prep.get_artifact()
+    artifact['version'] += 1
+    with open(tmp_path / 'prep.pkl', 'wb') as file:
+        pickle.dump(artifact, file)
+    with pytest.raises(ValueError, match='Unsupported artifact version'):
+        Lazy_Prep.load(str(tmp_path / 'prep.pkl'))
+
+
+@pytest.mark.parametrize('backend', ['thread', 'process'])
+def test_scheduled_transform_matches_sequential(tmp_path, backend, caplog):
+    path = tmp_path / 'weather.csv'
+    _weather_with_late_nulls(path)
+    prep = Lazy_Prep(str(path), target_column='WeatherType')
+    prep.add_normalizer()
+    prep.fit()
+    new = _weather(seed=1)
+    new.loc[::9, 'Humidity'] = np.nan
+    expected = prep.transform(new.copy())
+    prep.set_scheduler(workers=2, backend=backend)
+    pd.testing.assert_frame_equal(prep.transform(new.copy()), expected)
+    # Column tasks ran besides the one barrier per row-dropping stage
+    scheduled = [record.message for record in caplog.records if record.message.startswith('Scheduled')]
+    assert int(scheduled[-1].split()[1]) > len(prep.pipeline)
+
+
+class _FailingStage:
+    # Module level, so the process backend can pickle its task
+    def transform(self, df):
+        return df
+
+    def tasks(self, df):
+        return [('fail', self.fail, ['Humidity'], ['Humidity'])]
+
+    def fail(self, frame):
+        raise RuntimeError('task failed')
+
+
+@pytest.mark.parametrize('backend', ['thread', 'process'])
+def test_scheduled_task_failure_is_raised(tmp_path, backend):
+    path = tmp_path / 'weather.csv'
+    _weather(rows=100).to_csv(path, index=False)
+    prep = Lazy_Prep(str(path), target_column='WeatherType')
+    prep.fit()
+    prep.pipeline.append(_FailingStage())
+    prep.set_scheduler(workers=2, backend=backend)
+    with pytest.raises(RuntimeError, match='task failed'):
+        prep.transform(_weather(seed=1))
+
+
+def test_profiler_records_every_stage_and_calls_hooks(tmp_path):
+    import pstats
+    import tracemalloc
+    path = tmp_path / 'weather.csv'
+    _weather(rows=100).to_csv(path, index=False)
+    prep = Lazy_Prep(str(path), target_column='WeatherType')
+    seen = []
+    prep.enable_profiling(hooks=[seen.append], cprofile_path=str(tmp_path / 'run.prof'))
+    df = prep.transform()
+    profile = prep.metadata['profile']
+    records = profile['stages']
+    assert profile['run'] == 'transform' and seen == records
+    assert [record['component'] for record in records] == ['Loader', 'Analyzer'] + [component.__class__.__name__ for component in prep.pipeline]
+    assert (records[0]['rows_out'], records[0]['columns_out']) == (100, 5)
+    assert (records[-1]['rows_out'], records[-1]['columns_out']) == df.shape
+    assert all(record['peak_memory'] is not None and record['wall_time'] >= 0 for record in records)
+    assert profile['summary']['Cleaner.transform']['calls'] == 1
+    assert pstats.Stats(str(tmp_path / 'run.prof')).total_calls > 0
+    assert not tracemalloc.is_tracing()
+
+
+def test_importing_the_pipeline_loads_no_heavy_dependencies():
+    from benchmarks.import_time import HEAVY_MODULES, measure
+    result = measure('pipeline', repeat=1)
+    assert 'sklearn' in HEAVY_MODULES and result['heavy_modules_loaded'] == []
+
+
+def test_lazy_mode_matches_eager_and_respects_the_memory_budget(tmp_path):
+    from Utilities.memory import MemoryBudgetExceeded, resident_bytes, spill
+    path = tmp_path / 'weather.csv'
+    _weather_with_late_nulls(path)
+    prep = Lazy_Prep(str(path), target_column='WeatherType')
+    prep.fit()
+    new = _weather(seed=1)
+    new.loc[::9, 'Humidity'] = np.nan
+    original = new.copy()
+    expected = prep.transform(new.copy())
+    prep.set_memory_mode(lazy=True)
+    pd.testing.assert_frame_equal(prep.transform(new), expected)
+    # The caller's frame is only read
+    pd.testing.assert_frame_equal(new, original)
+    # Room for the text columns and half of the numbers
+    numbers = resident_bytes(new) - resident_bytes(spill(new, str(tmp_path)))
+    budget = resident_bytes(new) - numbers // 2
+    prep.set_memory_mode(lazy=True, memory_budget=budget)
+    with pytest.raises(MemoryBudgetExceeded):
+        prep.transform(new)
+    prep.set_memory_mode(lazy=True, memory_budget=budget, on_budget='spill', spill_dir=str(tmp_path))
+    pd.testing.assert_frame_equal(prep.transform(new), expected)
+
+
+def test_transform_many_matches_per_shard_transform_and_reports_totals(tmp_path):
+    path = tmp_path / 'weather.csv'
+    _weather_with_late_nulls(path)
+    prep = Lazy_Prep(str(path), target_column='WeatherType')
+    prep.fit()
+    shards = [str(tmp_path / f'shard{seed}.csv') for seed in range(3)]
+    for seed, shard in enumerate(shards):
+        df = _weather(rows=150, seed=seed + 1)
+        # Duplicates and empty rows give every shard its own cleaning stats
+        empty = pd.DataFrame(np.nan, index=range(seed + 2), columns=df.columns)
+        pd.concat([df, df.head(seed * 5), empty], ignore_index=True).to_csv(shard, index=False)
+    results = dict(prep.transform_many(shards, workers=2))
+    assert sorted(results) == sorted(shards)
+    stats = []
+    for shard in shards:
+        prep.metadata['cleaning_stats'] = {'columns_dropped': set(), 'rows_dropped': 0, 'duplicates_removed': 0}
+        pd.testing.assert_frame_equal(results[shard], prep.transform(pd.read_csv(shard)))
+        stats.append(dict(prep.metadata['cleaning_stats'], columns_dropped=list(prep.metadata['cleaning_stats']['columns_dropped'])))
+    report = prep.metadata['batch_report']
+    assert report['shards'] == 3
+    assert report['rows_in'] == sum(len(pd.read_csv(shard)) for shard in shards)
+    assert report['rows_out'] == sum(len(result) for result in results.values())
+    assert [report['per_shard'][shard]['cleaning_stats'] for shard in shards] == stats
+    assert report['cleaning_stats']['rows_dropped'] == sum(entry['rows_dropped'] for entry in stats) > 0
+    assert report['cleaning_stats']['duplicates_removed'] == sum(entry['duplicates_removed'] for entry in stats) > 0
+
+
+def test_compiled_parity_when_all_rows_are_dropped(tmp_path):
+    path = tmp_path / 'weather.csv'
+    df = _weather_with_late_nulls(path)
+    prep = Lazy_Prep(str(path), target_column='WeatherType')
+    prep.add_normalizer()
+    prep.fit()
+    compiled = prep.compile()
+    columns = list(compiled.input_columns)
+    empty = {col: None for col in columns}
+    kept = {col: value for col, value in df.iloc[0].items() if col in columns}
+    for records in ([empty, empty], [empty, kept]):
+        expected = [row for row in map(compiled.transform_record, records) if row is not None]
+        assert compiled.transform_records(records) == expected
+        X = np.array([[record[col] for col in columns] for record in records], dtype=object)
+        assert compiled.transform_array(X).shape == (len(expected), len(compiled.output_columns))
+    assert compiled.transform_records([empty]) == []
+    assert compiled.transform_array(np.array([[None] * len(columns)], dtype=object)).shape == (0, len(compiled.output_columns))
+
+
+def test_compiled_caches_are_bounded_and_return_copies(tmp_path):
+    path = tmp_path / 'weather.csv'
+    df = _weather_with_late_nulls(path)
+    prep = Lazy_Prep(str(path), target_column='WeatherType')
+    prep.add_normalizer(normalize_categoric='hashing', hash_width=8)
+    prep.fit()
+    compiled = prep.compile(memo_size=2)
+    records = [{col: value for col, value in row.items() if col in compiled.input_columns}
+               for row in df.to_dict('records')]
+    for record in records[:50]:
+        record['Cloud Cover'] = f"{record['Cloud Cover']} {len(record)}"
+    expected = [row for row in map(compiled.transform_record, records[:50]) if row is not None]
+    assert compiled.transform_records(records[:50]) == expected
+    caches = [op[2] for op in compiled.ops if op[0] == 'text'] + [op[3] for op in compiled.ops if op[0] == 'encode']
+    assert caches and all(cache.cache_info().maxsize == 2 and cache.cache_info().currsize <= 2 for cache in caches)
+    # Token lists handed out by the cache belong to the caller
+    process = functools.lru_cache(maxsize=2)(lambda value: ['shared'])
+    compiled._text(process, 'text').append('changed')
+    assert compiled._text(process, 'text') == ['shared'] and process.cache_info().hits == 1
+
+
+def test_fit_stream_counts_cleaning_stats_once(tmp_path):
+    path = tmp_path / 'weather.csv'
+    _weather_with_duplicates(path)
+    in_memory = Lazy_Prep(str(path), target_column='WeatherType')
+    in_memory.transform()
+    expected = in_memory.metadata['cleaning_stats']
+    assert expected['duplicates_removed'] == 300 and expected['rows_dropped'] == 20
+    streamed = Lazy_Prep(str(path), target_column='WeatherType', config=True)
+    streamed.add_cleaner()
+    streamed.add_outlier_detection()
+    streamed.add_imputer(fallback='mean')
+    assert streamed.fit_stream(chunksize=150) == ['Outlier', 'Imputer']
+    stats = streamed.metadata['cleaning_stats']
+    assert stats['duplicates_removed'] == expected['duplicates_removed']
+    assert stats['rows_dropped'] == expected['rows_dropped']
+
+
+
+def _count_reads(monkeypatch) -> list:
+    loader = importlib.import_module('loader').Loader
+    reads, transform_chunks = [], loader.transform_chunks
+
+    def counted(self, *args, **kwargs):
+        reads.append(self.path)
+        return transform_chunks(self, *args, **kwargs)
+    monkeypatch.setattr(loader, 'transform_chunks', counted)
+    return reads
+
+
+def test_fit_stream_shares_a_pass_when_upstream_leaves_data_unchanged(tmp_path, monkeypatch):
+    path = tmp_path / 'weather.csv'
+    df = _weather_with_duplicates(path)
+    prep = Lazy_Prep(str(path), target_column='WeatherType', config=True)
+    prep.add_cleaner()
+    prep.add_outlier_detection(mode='flag')
+    prep.add_imputer(method_to_all_numeric='Mean', method_map={col: 'Mean' for col in ('Temperature', 'Humidity', 'Pressure')})
+    reads = _count_reads(monkeypatch)
+    assert prep.fit_stream(chunksize=150) == ['Outlier', 'Imputer']
+    assert len(reads) == 1 and prep.fitted
+    # Flagging leaves the rows, so the Imputer learned the means of the whole cleaned file
+    cleaned = df.dropna(subset=['WeatherType']).drop_duplicates()
+    means = prep.pipeline[2].steps[0]['values']
+    assert np.allclose([means[col] for col in ('Temperature', 'Humidity', 'Pressure')],
+                       cleaned[['Temperature', 'Humidity', 'Pressure']].mean())
+    assert prep.metadata['cleaning_stats']['duplicates_removed'] == 300
+
+
+def test_fit_stream_waits_for_rows_dropped_upstream_and_fits_the_rest(tmp_path, monkeypatch):
+    path = tmp_path / 'weather.csv'
+    _weather_with_late_nulls(path)
+    prep = Lazy_Prep(str(path), target_column='WeatherType')
+    prep.add_normalizer()
+    reads = _count_reads(monkeypatch)
+    assert prep.fit_stream(chunksize=100) == ['Outlier', 'Imputer']
+    # One pass per component dropping rows, then the first chunk to fit the Normalizer
+    assert len(reads) == 3 and prep.fitted
+    chunks = list(prep.transform_stream(chunksize=100))
+    assert all(list(chunk.columns) == list(chunks[0].columns) for chunk in chunks)
+    assert not any(chunk.isna().any().any() for chunk in chunks)
+
+
+def test_fit_stream_refuses_model_imputation_unless_a_fallback_is_chosen(tmp_path):
+    path = tmp_path / 'weather.csv'
+    _weather_with_duplicates(path)
+    strict = Lazy_Prep(str(path), target_column='WeatherType', config=True)
+    strict.add_imputer(method_map={'Humidity': 'KNNImputer'})
+    with pytest.raises(ValueError, match='KNNImputer'):
+        strict.fit_stream(chunksize=150)
+    lenient = Lazy_Prep(str(path), target_column='WeatherType', config=True)
+    lenient.add_imputer(method_map={'Humidity': 'KNNImputer'}, fallback='mean')
+    lenient.fit_stream(chunksize=150)
+    assert lenient.metadata['imputation_fallbacks']['Humidity'] == {'method': 'KNNImputer', 'fallback': 'Mean'}
+
+
+def test_imputer_fits_one_model_per_method_group(monkeypatch):
+    from sklearn.impute import KNNImputer
+    from src.imputer import Imputer
+    df = _weather()
+    df.loc[::7, 'Humidity'] = np.nan
+    df.loc[::5, 'Pressure'] = np.nan
+    df.loc[::11, 'Temperature'] = np.nan
+    fits, fit = [], KNNImputer.fit
+    monkeypatch.setattr(KNNImputer, 'fit', lambda self, X, y=None: fits.append(list(X.columns)) or fit(self, X, y))
+    imputer = Imputer(metadata={}, method_maps={'Humidity': 'KNNImputer', 'Pressure': 'KNN Imputation', 'Temperature': 'Mean'})
+    filled = imputer.fit_transform(df.copy())
+    # Groups run in order of first appearance, each one model fit for all its columns
+    assert [step['label'] for step in imputer.steps] == ['Mean', 'KNNImputer']
+    assert imputer.steps[1]['cols'] == ['Humidity', 'Pressure'] and len(fits) == 1
+    numeric = df[['Temperature', 'Humidity', 'Pressure']].fillna({'Temperature': df['Temperature'].mean()})
+    expected = pd.DataFrame(KNNImputer().fit_transform(numeric), columns=numeric.columns, index=df.index)
+    expected['Temperature'] = numeric['Temperature']
+    pd.testing.assert_frame_equal(filled[list(numeric.columns)], expected)
+
+
+def test_imputer_fit_transform_applies_each_step_once(monkeypatch):
+    from src.imputer import Imputer
+    df = _weather()
+    df.loc[::7, 'Humidity'] = np.nan
+    df.loc[::5, 'Pressure'] = np.nan
+    imputer = Imputer(metadata={}, method_maps={'Humidity': 'KNNImputer', 'Pressure': 'Mean'})
+    applied, apply_step = [], Imputer._apply_step
+    monkeypatch.setattr(Imputer, '_apply_step', lambda self, frame, step: applied.append(step['label']) or apply_step(self, frame, step))
+    filled = imputer.fit_transform(df.copy())
+    assert sorted(applied) == ['KNNImputer', 'Mean']
+    assert not filled[['Humidity', 'Pressure']].isna().any().any()
+    applied.clear()
+    assert filled.equals(imputer.transform(df.copy()))
+
+
 if __name__ == "__main__":  
     import os
     import json
@@ -10,4 +359,4 @@ if __name__ == "__main__":
     print(df.head())
     
     metadata = pipeline.load_metadata()
-    print(metadata)
\ No newline at end of file
+    print(metadata)
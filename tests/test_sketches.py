@@ -0,0 +1,117 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import mstats
+from Utilities.sketches import hash_values, RunningMoments, ReservoirSample, KLLSketch, HyperLogLog, MisraGries
+
+
+def _parts(values, count: int = 3) -> list:
+    if isinstance(values, pd.Series):
+        return [values.iloc[rows] for rows in np.array_split(np.arange(len(values)), count)]
+    return np.array_split(values, count)
+
+
+def _rank_error(values: np.ndarray, estimates, q) -> float:
+    """
+    Largest distance between the target ranks q and the true ranks of the estimates.
+    """
+    ordered = np.sort(values)
+    low = np.searchsorted(ordered, estimates, side='left') / len(ordered)
+    high = np.searchsorted(ordered, estimates, side='right') / len(ordered)
+    return float(np.max(np.maximum(low - q, 0) + np.maximum(q - high, 0)))
+
+
+def test_running_moments_merge_is_associative_and_exact():
+    rng = np.random.default_rng(0)
+    values = rng.normal(5, 2, 3000)
+    values[rng.random(3000) < 0.1] = np.nan
+    a, b, c = _parts(values)
+    left = RunningMoments().update(a).merge(RunningMoments().update(b)).merge(RunningMoments().update(c))
+    right = RunningMoments().update(a).merge(RunningMoments().update(b).merge(RunningMoments().update(c)))
+    finite = values[~np.isnan(values)]
+    for moments in (left, right):
+        assert moments.count == len(finite) and moments.nulls == int(np.isnan(values).sum())
+        assert np.isclose(moments.mean, finite.mean()) and np.isclose(moments.variance(), finite.var(ddof=1))
+        assert (moments.min, moments.max) == (finite.min(), finite.max())
+
+
+def test_kll_exact_path_matches_numpy_and_winsorize():
+    rng = np.random.default_rng(1)
+    values = rng.lognormal(0, 1, 1000)
+    sketch = KLLSketch(k=2000, seed=0)
+    for part in _parts(values, 4):
+        sketch.update(part)
+    assert sketch.exact
+    q = np.array([0.0, 0.01, 0.25, 0.5, 0.75, 0.99, 1.0])
+    assert np.allclose(sketch.quantile(q), np.quantile(values, q))
+    median = np.median(values)
+    assert np.isclose(sketch.deviation_quantile(median), np.median(np.abs(values - median)))
+    assert np.isclose(sketch.winsorized_mean(0.05), mstats.winsorize(values, limits=(0.05, 0.05)).mean())
+
+
+def test_kll_rank_error_and_merge():
+    rng = np.random.default_rng(2)
+    values = rng.normal(0, 1, 60_000)
+    q = np.linspace(0.01, 0.99, 99)
+    parts = [KLLSketch(k=200, seed=i).update(part) for i, part in enumerate(_parts(values))]
+    single = KLLSketch(k=200, seed=0).update(values)
+    left = KLLSketch(k=200, seed=0).merge(parts[0]).merge(parts[1]).merge(parts[2])
+    right = KLLSketch(k=200, seed=0).merge(parts[0]).merge(KLLSketch(k=200, seed=1).merge(parts[1]).merge(parts[2]))
+    for sketch in (single, left, right):
+        assert not sketch.exact
+        assert sketch.count == len(values) and (sketch.min, sketch.max) == (values.min(), values.max())
+        assert _rank_error(values, sketch.quantile(q), q) < 0.02
+        assert len(sketch) < 2000
+
+
+def test_reservoir_merge_is_uniform_over_both_streams():
+    shares = []
+    for seed in range(20):
+        zeros = ReservoirSample(size=500, seed=seed).update(np.zeros(3000))
+        ones = ReservoirSample(size=500, seed=seed + 100).update(np.ones(1000))
+        twos = ReservoirSample(size=500, seed=seed + 200).update(np.full(1000, 2.0))
+        merged = zeros.merge(ones.merge(twos))
+        assert merged.count == 5000 and len(merged.values) == 500
+        shares.append([np.mean(merged.values == value) for value in (0.0, 1.0, 2.0)])
+    assert np.allclose(np.mean(shares, axis=0), [0.6, 0.2, 0.2], atol=0.02)
+
+
+def test_reservoir_keeps_everything_below_its_size():
+    sample = ReservoirSample(size=100, seed=0).update([1.0, np.nan, 2.0]).merge(ReservoirSample(size=100).update([3.0]))
+    assert sorted(sample.values) == [1.0, 2.0, 3.0] and sample.count == 3
+
+
+def test_hyperloglog_exact_then_within_error_bound():
+    small = HyperLogLog(precision=12).update(hash_values(pd.Series(np.arange(500) % 300)))
+    assert small.estimate() == 300
+    values = pd.Series(np.arange(200_000, dtype=np.float64))
+    parts = [HyperLogLog(precision=12).update(hash_values(part)) for part in _parts(values)]
+    single = HyperLogLog(precision=12).update(hash_values(values))
+    left = HyperLogLog(precision=12).merge(parts[0]).merge(parts[1]).merge(parts[2])
+    right = HyperLogLog(precision=12).merge(parts[2]).merge(HyperLogLog(precision=12).merge(parts[1]).merge(parts[0]))
+    assert np.array_equal(single.registers, left.registers) and np.array_equal(left.registers, right.registers)
+    # Three times the standard error of 1.04 / sqrt(2 ** 12)
+    assert abs(single.estimate() - len(values)) / len(values) < 3 * 1.04 / 64
+    with pytest.raises(ValueError):
+        single.merge(HyperLogLog(precision=10))
+
+
+def test_misra_gries_heavy_hitters_against_exact_counts():
+    rng = np.random.default_rng(3)
+    values = pd.Series(rng.zipf(1.5, 30_000) % 5000)
+    exact = values.value_counts()
+    k = 32
+    parts = [MisraGries(k).update(part) for part in _parts(values)]
+    single = MisraGries(k).update(values)
+    left = MisraGries(k).merge(parts[0]).merge(parts[1]).merge(parts[2])
+    right = MisraGries(k).merge(parts[0]).merge(MisraGries(k).merge(parts[1]).merge(parts[2]))
+    bound = len(values) / (k + 1)
+    for sketch in (single, left, right):
+        assert sketch.count == len(values) and len(sketch.counters) <= k
+        counts = dict(sketch.top())
+        for value, count in exact.items():
+            estimate = counts.get(value, 0)
+            assert count - bound <= estimate <= count
+            if count > bound:
+                assert value in counts
+        assert sketch.top(1)[0][0] == values.mode()[0]
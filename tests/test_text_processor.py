@@ -1,8 +1,118 @@
+import os
+import shutil
+import multiprocessing
 import pandas as pd
+import pytest
+from src import text_processor
 from src.text_processor import TextProcessor
+from Utilities.nltk_resources import DATA_DIR_ENV, NLTKResources, resources
+
+
+def _nltk_data_root() -> str:
+    """
+    Directory of the locally installed NLTK data, or skip the test.
+    """
+    nltk = pytest.importorskip('nltk')
+    try:
+        root = os.path.dirname(os.path.dirname(str(nltk.data.find('corpora/stopwords'))))
+        nltk.data.find('corpora/wordnet')
+        nltk.data.find('tokenizers/punkt_tab/english/')
+    except LookupError:
+        pytest.skip('NLTK data is not installed')
+    return root
+
+
+def _seeded_nltk_data(tmp_path) -> str:
+    """
+    Copy of the local NLTK data, so a test can hide every default location.
+    """
+    return shutil.copytree(_nltk_data_root(), str(tmp_path / 'seeded'))
+
+
+def test_each_distinct_value_is_processed_once(monkeypatch):
+    calls = []
+    preprocess = TextProcessor.preprocess
+    monkeypatch.setattr(TextProcessor, 'preprocess', lambda self, text, text_data=False: calls.append(text) or preprocess(self, text, text_data))
+    df = pd.DataFrame({
+        'Location': [' Inland', 'coastal ', None, ' Inland', float('nan')] * 40,
+        'Season': pd.Categorical(['Winter', 'SUMMER', 'Winter', None, 'Spring'] * 40),
+    })
+    result = TextProcessor().transform(df.copy())
+    assert sorted(calls) == sorted([' Inland', 'coastal ', 'SUMMER', 'Spring', 'Winter'])
+    # Missing values keep their original object
+    assert result['Location'].equals(df['Location'].apply(lambda x: x.lower().strip() if isinstance(x, str) else x))
+    assert isinstance(result['Season'].dtype, pd.CategoricalDtype)
+    assert result['Season'].isna().equals(df['Season'].isna())
+    assert result['Season'].dropna().tolist()[:4] == ['winter', 'summer', 'winter', 'spring']
+
+
+def test_lemmas_are_cached_across_texts():
+    _nltk_data_root()
+    processor = TextProcessor(text_data_columns=['Notes'], lemma_cache_size=64)
+    df = pd.DataFrame({'Notes': ['the cats were running', 'cats and dogs', 'running dogs']})
+    tokens = processor.transform(df.copy())['Notes'].tolist()
+    assert tokens == [text_processor._preprocess_texts([text], processor.drop_words, 64)[0] for text in df['Notes']]
+    info = text_processor._lemma_cache(64).cache_info()
+    assert info.maxsize == 64 and info.hits >= 3 and info.currsize <= 64
+
+
+def test_spawned_workers_use_the_configured_nltk_data_dir(tmp_path, monkeypatch):
+    import nltk
+    data_dir = _seeded_nltk_data(tmp_path)
+    # Spawned workers build their NLTK search path from a HOME without data
+    monkeypatch.setenv('HOME', str(tmp_path))
+    monkeypatch.delenv(DATA_DIR_ENV, raising=False)
+    monkeypatch.delenv('NLTK_DATA', raising=False)
+    monkeypatch.setattr(nltk.data, 'path', list(nltk.data.path))
+    monkeypatch.setattr(resources, 'data_dir', resources.data_dir)
+    df = pd.DataFrame({'Notes': [f"The {word} cats were running" for word in ('grey', 'black', 'white', 'small')] * 2})
+    expected = TextProcessor(text_data_columns=['Notes']).transform(df.copy())
+    processor = TextProcessor(text_data_columns=['Notes'], n_jobs=2, chunk_size=1, nltk_data_dir=data_dir,
+                              mp_context=multiprocessing.get_context('spawn'))
+    assert processor.transform(df.copy())['Notes'].tolist() == expected['Notes'].tolist()
+
+
+def test_nltk_resources_resolve_offline(tmp_path, monkeypatch):
+    import nltk
+    data_dir = _seeded_nltk_data(tmp_path)
+    monkeypatch.setattr(nltk.data, 'path', [])
+    monkeypatch.setattr(nltk, 'download', lambda *args, **kwargs: pytest.fail('NLTK tried to download'))
+    monkeypatch.delenv(DATA_DIR_ENV, raising=False)
+    with pytest.raises(LookupError, match='was not found locally'):
+        NLTKResources().ensure('stopwords')
+    # A seeded directory, given directly or through the environment, is enough
+    assert 'the' in NLTKResources(data_dir=data_dir).stop_words('english')
+    monkeypatch.setenv(DATA_DIR_ENV, data_dir)
+    NLTKResources().ensure('tokenizer', 'stopwords', 'wordnet')
+
+
+def test_nltk_resources_download_only_when_allowed(tmp_path, monkeypatch):
+    import nltk
+    seeded = _seeded_nltk_data(tmp_path)
+    data_dir = str(tmp_path / 'downloaded')
+    monkeypatch.setattr(nltk.data, 'path', [])
+    downloads = []
+
+    def download(package, download_dir=None, quiet=False):
+        downloads.append(package)
+        shutil.copytree(os.path.join(seeded, 'corpora', package), os.path.join(download_dir, 'corpora', package))
+        return True
+    monkeypatch.setattr(nltk, 'download', download)
+    manager = NLTKResources(data_dir=data_dir, allow_download=True)
+    manager.ensure('stopwords')
+    manager.ensure('stopwords')
+    assert downloads == ['stopwords']
+
+
+def test_text_processor_construction_loads_no_nltk_data(monkeypatch):
+    monkeypatch.setattr(resources, 'ensure', lambda *names: pytest.fail(f'{names} loaded at construction'))
+    processor = TextProcessor(text_data_columns=['Notes'])
+    # Columns without free text never need NLTK data either
+    processor.transform(pd.DataFrame({'Location': ['Inland', 'coastal']}))
+
 
 if __name__ == "__main__":
     processor = TextProcessor()
     df = pd.read_csv('Data/weather_classification_data.csv')
     processed_data = processor.transform(df, {})
-    print(processed_data.head())
\ No newline at end of file
+    print(processed_data.head())